@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import Industry, Ticker
+from .models import (
+    AnalysisSnapshot,
+    Industry,
+    Ticker,
+    TickerRequestCount,
+    Watchlist,
+)
 
 
 @admin.register(Industry)
@@ -12,3 +18,23 @@ class TickerAdmin(admin.ModelAdmin):
     list_display = ("code", "name", "industry")
     list_filter = ("industry",)
     search_fields = ("code", "name")
+
+
+@admin.register(TickerRequestCount)
+class TickerRequestCountAdmin(admin.ModelAdmin):
+    list_display = ("code", "date", "count")
+    list_filter = ("date",)
+    search_fields = ("code",)
+
+
+@admin.register(AnalysisSnapshot)
+class AnalysisSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("code", "computed_at", "refresh_started_at")
+    search_fields = ("code",)
+    exclude = ("chart_data",)
+
+
+@admin.register(Watchlist)
+class WatchlistAdmin(admin.ModelAdmin):
+    list_display = ("name", "key", "updated_at")
+    search_fields = ("name", "key")
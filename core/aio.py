@@ -0,0 +1,175 @@
+"""Building blocks of the async (ASGI) serving path.
+
+Upstream I/O runs natively on the event loop: Yahoo Finance bars come from
+the chart API through one pooled ``curl_cffi`` session per loop, capped at
+``UPSTREAM_MAX_CONNECTIONS`` connections. Work that is CPU bound or only
+has a blocking client (feature building, LightGBM, charts, yfinance
+statements) is handed to :func:`run_blocking`, a pool of
+``ASYNC_BLOCKING_THREADS`` threads, so it never stalls the loop.
+"""
+import asyncio
+import functools
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from asgiref.sync import sync_to_async
+from curl_cffi.requests import AsyncSession
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .market_calendar import cache_timeout
+from .market_data import PRICE_COLUMNS
+from .single_flight import asingle_flight
+
+logger = logging.getLogger(__name__)
+
+YAHOO_API_ENDPOINT = "https://query2.finance.yahoo.com"
+# Intervals whose bars are labelled by date, like ``yf.download`` does
+DAILY_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")
+
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSession]" = (
+    weakref.WeakKeyDictionary()
+)
+_executor: ThreadPoolExecutor | None = None
+
+
+def _released(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Nothing ends a request on pool threads, so drop database
+        # connections past CONN_MAX_AGE (or broken ones) here
+        close_old_connections()
+
+
+def run_blocking(func, *args, **kwargs):
+    """Return an awaitable running ``func`` in the blocking-work pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_BLOCKING_THREADS,
+            thread_name_prefix="async-blocking",
+        )
+    return sync_to_async(_released, thread_sensitive=False, executor=_executor)(
+        func, *args, **kwargs
+    )
+
+
+async def aiterate(chunks):
+    """Yield the items of the blocking iterable ``chunks`` from the pool.
+
+    Django's ASGI handler would otherwise read a sync iterator of a
+    streaming response into a list before sending any of it.
+    """
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await run_blocking(next, chunks, done)) is not done:
+        yield chunk
+
+
+def blocking_view(view):
+    """Serve the sync ``view`` from the blocking-work pool.
+
+    Django runs sync views under ASGI on one thread per process
+    (``thread_sensitive=True``), so a slow one would queue every other sync
+    view and ORM call behind it. Template and DRF responses are rendered in
+    the pool too.
+    """
+
+    def run(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, "render", None)):
+            response.render()
+        return response
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_blocking(run, request, *args, **kwargs)
+
+    return wrapper
+
+
+def http_session() -> AsyncSession:
+    """Return the connection-pooling HTTP session of the running loop."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None:
+        session = _sessions[loop] = AsyncSession(
+            max_clients=settings.UPSTREAM_MAX_CONNECTIONS,
+            timeout=settings.UPSTREAM_TIMEOUT_SECONDS,
+            impersonate="chrome",
+        )
+    return session
+
+
+def _chart_frame(payload: dict, interval: str) -> pd.DataFrame:
+    """Convert a chart API response to the OHLCV frame ``yf.download`` returns."""
+    result = (payload.get("chart") or {}).get("result") or []
+    if not result or not result[0].get("timestamp"):
+        return pd.DataFrame()
+    result = result[0]
+    quote = result["indicators"]["quote"][0]
+    index = pd.to_datetime(result["timestamp"], unit="s", utc=True)
+    timezone = result.get("meta", {}).get("exchangeTimezoneName")
+    if timezone:
+        index = index.tz_convert(timezone)
+    if interval in DAILY_INTERVALS:
+        index = index.tz_localize(None).normalize()
+    df = pd.DataFrame(
+        {
+            "Open": quote.get("open"),
+            "High": quote.get("high"),
+            "Low": quote.get("low"),
+            "Close": quote.get("close"),
+            "Volume": quote.get("volume"),
+        },
+        index=pd.Index(index, name="Date"),
+        dtype="float64",
+    )
+    adjclose = result["indicators"].get("adjclose")
+    df.insert(4, "Adj Close", adjclose[0]["adjclose"] if adjclose else df["Close"])
+    df = df.dropna(how="all", subset=["Open", "High", "Low", "Close"])
+    return df.loc[~df.index.duplicated(keep="last"), PRICE_COLUMNS]
+
+
+async def chart_history(
+    symbol: str, period: str, interval: str = "1d"
+) -> pd.DataFrame:
+    """Return ``symbol``'s bars for ``period``; empty if the request failed."""
+    try:
+        response = await http_session().get(
+            f"{settings.YAHOO_API_ENDPOINT or YAHOO_API_ENDPOINT}"
+            f"/v8/finance/chart/{symbol}",
+            params={
+                "range": period,
+                "interval": interval,
+                "includeAdjustedClose": "true",
+                "events": "div,splits",
+            },
+        )
+        response.raise_for_status()
+        return _chart_frame(response.json(), interval)
+    except Exception:
+        logger.warning("Chart request for %s failed", symbol, exc_info=True)
+        return pd.DataFrame()
+
+
+async def daily_prices(ticker_symbol: str, period: str) -> pd.DataFrame:
+    """Async :func:`core.analysis.daily_prices`, sharing its cache entries.
+
+    A history fetched here is found by the synchronous stages afterwards,
+    and concurrent requests for one history share one upstream call.
+    """
+    key = f"daily_prices:{ticker_symbol}:{period}"
+    df = await cache.aget(key)
+    if df is None:
+        df = await asingle_flight(
+            f"chart:{ticker_symbol}:{period}:1d",
+            lambda: chart_history(ticker_symbol, period),
+        )
+        if not df.empty:
+            await cache.aset(key, df, cache_timeout(settings.PRICE_CACHE_SECONDS))
+    return df.copy()
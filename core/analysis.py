@@ -1,16 +1,41 @@
-import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from io import BytesIO
 
-import matplotlib.pyplot as plt
-import mplfinance as mpf
 import pandas as pd
 import ta
 import yfinance as yf
 import numpy as np
-from lightgbm import LGBMClassifier
+from django.conf import settings
+from django.core.cache import cache
+import lightgbm as lgb
 from sklearn.model_selection import TimeSeriesSplit
 
+from .charts import render_candlestick_chart, render_line_chart
+from .downsample import (
+    CANDLE_LABELS,
+    DEFAULT_CHART_RANGE,
+    RANGE_OFFSETS,
+    candle_bars,
+    lttb_frame,
+)
+from .features import (
+    DEFAULT_HORIZONS,
+    FEATURE_COLUMNS,
+    add_targets,
+    build_feature_frame,
+    compact_prices,
+)
+from .market_calendar import cache_timeout
+from .market_data import PRICE_COLUMNS, download, price_frame, yahoo_ticker
+from .model_store import predict_with_ticker_model
+from .panel_model import predict_with_panel_model
+from .rendering import render_latest_table, render_prediction_table
+from .results import CandlestickResult, LatestData, PredictionResult
+from .single_flight import single_flight
+from .tickers import normalize_code, symbol_for
+from .tuning import MODEL_PARAMS, booster_params, tuned_params_for
+
 TICKER_NAMES = {
     "7203": "トヨタ自動車",
     "7203.T": "トヨタ自動車",
@@ -25,15 +50,6 @@ TICKER_NAMES = {
 }
 
 
-# Shared header names for prediction tables
-PREDICTION_COLUMNS = [
-    "予測日数",
-    "予想方向",
-    "上昇確率",
-    "期待リターン",
-]
-
-
 def _get_first_non_empty(tkr: yf.Ticker, attrs: list[str]) -> pd.DataFrame:
     """Return the first non-empty DataFrame among ticker attributes."""
     for attr in attrs:
@@ -55,10 +71,33 @@ def _fetch_fin_stmt(tkr: yf.Ticker, attrs: list[str]) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+def daily_prices(ticker_symbol: str, period: str) -> pd.DataFrame:
+    """Return the daily OHLCV history for ``period``.
+
+    The download is cached for ``PRICE_CACHE_SECONDS`` while prices can
+    move and otherwise until the next TSE session opens.
+    """
+    key = f"daily_prices:{ticker_symbol}:{period}"
+    df = cache.get(key)
+    if df is None:
+        df = price_frame(
+            download(ticker_symbol, period=period, interval="1d", auto_adjust=False)
+        )
+        if not df.empty:
+            cache.set(key, df, cache_timeout(settings.PRICE_CACHE_SECONDS))
+    return df.copy()
+
+
 def _load_fundamentals(ticker_symbol: str) -> pd.DataFrame:
     """Return EPS, PE, PB data indexed by announcement date."""
+    return single_flight(
+        f"fundamentals:{ticker_symbol}", lambda: _fetch_fundamentals(ticker_symbol)
+    )
+
+
+def _fetch_fundamentals(ticker_symbol: str) -> pd.DataFrame:
     try:
-        tkr = yf.Ticker(ticker_symbol)
+        tkr = yahoo_ticker(ticker_symbol)
         info = tkr.info
         eps_q = None
         if getattr(tkr, "quarterly_earnings", None) is not None:
@@ -81,7 +120,7 @@ def _load_fundamentals(ticker_symbol: str) -> pd.DataFrame:
 
         start_date = eps_q.index.min() - timedelta(days=2)
         end_date = eps_q.index.max() + timedelta(days=2)
-        price_data = yf.download(
+        price_data = download(
             ticker_symbol,
             start=start_date,
             end=end_date,
@@ -141,67 +180,99 @@ def _load_fundamentals(ticker_symbol: str) -> pd.DataFrame:
 
 def get_company_name(ticker: str) -> str:
     """Return truncated company name if available."""
-    ticker_symbol = f"{ticker}.T" if not ticker.endswith(".T") else ticker
+    ticker_symbol = symbol_for(ticker)
     name = TICKER_NAMES.get(ticker) or TICKER_NAMES.get(ticker_symbol)
     if not name:
         try:
-            info = yf.Ticker(ticker_symbol).info
+            info = yahoo_ticker(ticker_symbol).info
             name = info.get("shortName") or info.get("longName") or ticker_symbol
         except Exception:
             name = ticker_symbol
     return str(name)[:9]
 
 
+def load_key_financials(ticker_symbol: str, period: str) -> pd.DataFrame | None:
+    """Return revenue, operating and net income for recent periods.
+
+    Returns ``None`` when no statement is available and an empty frame when
+    none of the key line items could be found.
+    """
+    tkr = yahoo_ticker(ticker_symbol)
+    if period == "quarterly":
+        attrs = [
+            "quarterly_income_stmt",
+            "quarterly_financials",
+            "quarterly_balance_sheet",
+        ]
+        limit = 4
+    else:
+        attrs = ["income_stmt", "financials", "balance_sheet"]
+        limit = 3
+
+    df = single_flight(
+        f"statements:{ticker_symbol}:{period}", lambda: _fetch_fin_stmt(tkr, attrs)
+    )
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return None
+
+    df = df.T
+
+    revenue_candidates = ["Total Revenue", "Operating Revenue", "Revenue"]
+    op_income_candidates = [
+        "Operating Income",
+        "Total Operating Income As Reported",
+        "Operating Profit",
+        "OpIncome",
+    ]
+    net_income_candidates = [
+        "Net Income",
+        "Net Income Common Stockholders",
+        "NetIncome",
+    ]
+
+    detected_cols = []
+    for candidates in [
+        revenue_candidates,
+        op_income_candidates,
+        net_income_candidates,
+    ]:
+        for col in candidates:
+            if col in df.columns:
+                detected_cols.append(col)
+                break
+
+    return df[detected_cols].head(limit)
+
+
+def financial_records(ticker_symbol: str, period: str) -> list[dict]:
+    """Return key financials as JSON-friendly records, newest first."""
+    try:
+        df = load_key_financials(ticker_symbol, period)
+    except Exception:
+        return []
+    if df is None or df.empty:
+        return []
+    df = df.astype(float).replace([np.inf, -np.inf], np.nan)
+    records = []
+    for idx, row in df.iterrows():
+        record = {"period": str(pd.Timestamp(idx).date())}
+        for col, val in row.items():
+            record[col] = None if pd.isna(val) else float(val)
+        records.append(record)
+    return records
+
+
 def _load_and_format_financials(ticker_symbol: str, period: str) -> str:
     """Return HTML table for quarterly or annual financials."""
     title = "Quarterly Financials" if period == "quarterly" else "Annual Financials"
     try:
-        tkr = yf.Ticker(ticker_symbol)
-        if period == "quarterly":
-            attrs = [
-                "quarterly_income_stmt",
-                "quarterly_financials",
-                "quarterly_balance_sheet",
-            ]
-            limit = 4
-        else:
-            attrs = ["income_stmt", "financials", "balance_sheet"]
-            limit = 3
-
-        df = _fetch_fin_stmt(tkr, attrs)
-        if not isinstance(df, pd.DataFrame) or df.empty:
+        df_display = load_key_financials(ticker_symbol, period)
+        if df_display is None:
             return f"<h3>{title}</h3><p>Data not available.</p>"
-
-        df = df.T
-
-        revenue_candidates = ["Total Revenue", "Operating Revenue", "Revenue"]
-        op_income_candidates = [
-            "Operating Income",
-            "Total Operating Income As Reported",
-            "Operating Profit",
-            "OpIncome",
-        ]
-        net_income_candidates = [
-            "Net Income",
-            "Net Income Common Stockholders",
-            "NetIncome",
-        ]
-
-        detected_cols = []
-        for candidates in [
-            revenue_candidates,
-            op_income_candidates,
-            net_income_candidates,
-        ]:
-            for col in candidates:
-                if col in df.columns:
-                    detected_cols.append(col)
-                    break
-
-        if not detected_cols:
+        if df_display.empty:
             return f"<h3>{title}</h3><p>Key financial data not found.</p>"
 
-        df_display = df[detected_cols].head(limit)
+        df_display = df_display.copy()
 
         def fmt_value(val: float) -> str:
             if pd.isna(val):
@@ -219,31 +290,31 @@ def _load_and_format_financials(ticker_symbol: str, period: str) -> str:
         return f"<h3>{title}</h3><p>Error loading data: {e}</p>"
 
 
-def analyze_stock(ticker: str):
-    """Fetch data and return base64 chart image and HTML table."""
-    ticker_symbol = f"{ticker}.T" if not ticker.endswith('.T') else ticker
-    df = yf.download(ticker_symbol, period="1y", interval="1d", auto_adjust=False)
+def analyze_stock(ticker: str, chart_range: str = "1y"):
+    """Fetch data and return base64 chart image and HTML table.
+
+    The chart keeps at most ``CHART_MAX_POINTS`` points of ``chart_range``.
+    """
+    ticker_symbol = symbol_for(ticker)
+    df = daily_prices(ticker_symbol, chart_range)
     if df.empty:
         return None, None
 
     df["MA5"] = df["Close"].rolling(window=5).mean()
     df["MA25"] = df["Close"].rolling(window=25).mean()
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(df.index, df["Close"], label="Close")
-    plt.plot(df.index, df["MA5"], label="MA5")
-    plt.plot(df.index, df["MA25"], label="MA25")
-    plt.legend()
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.title(f"{ticker_symbol} Close Price")
-    plt.tight_layout()
-
-    buf = BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    chart_data = base64.b64encode(buf.getvalue()).decode("utf-8")
+    plot_df = lttb_frame(df, "Close", settings.CHART_MAX_POINTS)
+    chart_data = render_line_chart(
+        plot_df.index,
+        [
+            ("Close", plot_df["Close"]),
+            ("MA5", plot_df["MA5"]),
+            ("MA25", plot_df["MA25"]),
+        ],
+        title=f"{ticker_symbol} Close Price",
+        xlabel="Date",
+        ylabel="Price",
+    )
 
     table_html = (
         df.tail(5)[["Close", "MA5", "MA25"]]
@@ -257,27 +328,47 @@ def analyze_stock(ticker: str):
 
 
 def analyze_stock_candlestick(ticker: str):
-    """Generate candlestick chart with volume, MACD, and RSI."""
-    ticker_symbol = f"{ticker}.T" if not ticker.endswith('.T') else ticker
+    """Generate candlestick chart with volume, MACD, and RSI.
+
+    Returns ``(chart_data, latest_table_html, warning)``; use
+    :func:`run_candlestick_analysis` to get the structured result instead.
+    """
+    result = run_candlestick_analysis(ticker)
+    table_html = render_latest_table(result.latest) if result.latest else None
+    return result.chart_data, table_html, result.warning
+
+
+def run_candlestick_analysis(
+    ticker: str,
+    thumbnail: bool = False,
+    prices=None,
+    chart_range: str = DEFAULT_CHART_RANGE,
+) -> CandlestickResult:
+    """Return candlestick chart and latest data as a :class:`CandlestickResult`.
+
+    ``thumbnail`` renders the chart at ``CHART_THUMBNAIL_DPI``.
+    ``chart_range`` is one of :data:`CHART_RANGES`; ranges too long for
+    ``CHART_MAX_CANDLES`` daily candles are drawn with weekly, monthly or
+    quarterly ones. ``prices`` may carry an already downloaded daily
+    history; ranges it covers are cut from it instead of downloading them.
+    """
+    ticker_symbol = symbol_for(ticker)
     try:
-        stock_data = yf.download(
-            ticker_symbol,
-            period="6mo",
-            interval="1d",
-            auto_adjust=False,
-        )
-        stock_data.columns = [
-            "Open",
-            "High",
-            "Low",
-            "Close",
-            "Adj Close",
-            "Volume",
-        ]
+        if prices is not None and chart_range in RANGE_OFFSETS:
+            start = prices.index[-1] - RANGE_OFFSETS[chart_range]
+            stock_data = prices.loc[prices.index >= start, PRICE_COLUMNS].copy()
+        else:
+            stock_data = daily_prices(ticker_symbol, chart_range)[PRICE_COLUMNS]
     except Exception:
-        return None, None, "データ取得に失敗しました"
+        return CandlestickResult(ticker, None, None, "データ取得に失敗しました")
     if stock_data.empty:
-        return None, None, "データ取得に失敗しました"
+        return CandlestickResult(
+            ticker, None, None, "データ取得に失敗しました", no_data=True
+        )
+    if settings.MEMORY_LEAN:
+        stock_data = compact_prices(
+            stock_data, ["Open", "High", "Low", "Close", "Volume"]
+        )
 
     close_series = stock_data["Close"].squeeze()
     stock_data["MACD"] = ta.trend.macd(close_series)
@@ -305,70 +396,49 @@ def analyze_stock_candlestick(ticker: str):
         .dropna()
         .astype(float)
     )
-    plot_df.dropna(inplace=True)
-
-    apds = [
-        mpf.make_addplot(stock_data["MACD"], panel=2, color="blue", ylabel="MACD"),
-        mpf.make_addplot(stock_data["RSI"], panel=3, color="purple", ylabel="RSI"),
-    ]
+    plot_df, freq = candle_bars(plot_df, settings.CHART_MAX_CANDLES)
+    if freq == "D":
+        macd = stock_data["MACD"].reindex(plot_df.index)
+        rsi = stock_data["RSI"].reindex(plot_df.index)
+    else:
+        # Indicators of aggregated candles follow those candles' closes
+        macd = ta.trend.macd(plot_df["Close"])
+        rsi = ta.momentum.rsi(plot_df["Close"])
 
     try:
-        fig, ax = mpf.plot(
+        chart_data = render_candlestick_chart(
             plot_df,
-            type="candle",
-            mav=(),
-            volume=True,
-            addplot=apds,
-            title=f"{ticker_symbol} Daily Candlestick, MACD & RSI",
-            style="yahoo",
-            returnfig=True,
-            figsize=(20, 12),
-            panel_ratios=(3, 1, 1, 1),
+            macd,
+            rsi,
+            title=f"{ticker_symbol} {CANDLE_LABELS[freq]} Candlestick, MACD & RSI",
+            thumbnail=thumbnail,
         )
     except Exception:
-        return None, None, "チャート生成に失敗しました"
-
-    fig.subplots_adjust(hspace=0.15)
-    for axis in fig.axes:
-        ymin = axis.get_ylim()[0]
-        axis.axhline(y=ymin, color="black", lw=0.5)
-
-    buf = BytesIO()
-    fig.savefig(buf, format="png")
-    plt.close(fig)
-    buf.seek(0)
-    chart_data = base64.b64encode(buf.getvalue()).decode("utf-8")
+        return CandlestickResult(ticker, None, None, "チャート生成に失敗しました")
 
     tbl_cols = ["Close", "MACD", "RSI", "eps", "pe"]
-    table_df = stock_data.tail(5)[tbl_cols].round(0)
-    table_df = table_df.applymap(lambda x: "-" if pd.isna(x) else int(x))
-    table_html = table_df.reset_index().rename(columns={"index": "date"}).to_html(
-        classes="table table-striped", index=False
+    tail = stock_data.tail(5)[tbl_cols]
+    latest = LatestData(
+        dates=tuple(str(d.date()) for d in pd.to_datetime(tail.index)),
+        columns=tuple(tbl_cols),
+        values=tail.to_numpy(dtype=np.float64, na_value=np.nan),
     )
-
-    return chart_data, table_html, None
+    return CandlestickResult(ticker, chart_data, latest)
 
 
-def generate_stock_plot(ticker: str):
+def generate_stock_plot(ticker: str, chart_range: str = "3mo"):
     """Return base64 encoded line plot for given ticker."""
-    ticker_symbol = f"{ticker}.T" if not ticker.endswith('.T') else ticker
-    df = yf.download(ticker_symbol, period="3mo", interval="1d", auto_adjust=False)
+    ticker_symbol = symbol_for(ticker)
+    df = daily_prices(ticker_symbol, chart_range)
     if df.empty:
         return None
 
     df["MA20"] = df["Close"].rolling(window=20).mean()
 
-    plt.figure(figsize=(10, 5))
-    plt.plot(df.index, df["Close"], label="Close")
-    plt.plot(df.index, df["MA20"], label="MA20")
-    plt.legend()
-    plt.tight_layout()
-
-    buf = BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
+    df = lttb_frame(df, "Close", settings.CHART_MAX_POINTS)
+    return render_line_chart(
+        df.index, [("Close", df["Close"]), ("MA20", df["MA20"])]
+    )
 
 
 def predict_next_move(ticker: str):
@@ -377,167 +447,131 @@ def predict_next_move(ticker: str):
     return table_html
 
 
-def predict_future_moves(ticker: str, horizons=None):
-    """Predict stock direction for multiple days ahead with expected return."""
-    ticker_symbol = f"{ticker}.T" if not ticker.endswith(".T") else ticker
-    df = yf.download(ticker_symbol, period="2y", interval="1d", auto_adjust=False)
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    if len(df) < 30:
+def predict_future_moves(ticker: str, horizons=None, prices=None):
+    """Predict stock direction for multiple days ahead with expected return.
+
+    Returns ``(table_html, None)``; use :func:`run_predictions` to get the
+    structured result instead.
+    """
+    result = run_predictions(ticker, horizons, prices)
+    if result is None:
         return (None, None)
+    return (render_prediction_table(result), None)
 
-    fund = _load_fundamentals(ticker_symbol)
-    if isinstance(df.index, pd.MultiIndex):
-        df.index = df.index.get_level_values(0)
-    if isinstance(fund.index, pd.MultiIndex):
-        fund.index = fund.index.get_level_values(0)
-
-    df.index = pd.to_datetime(df.index)
-    fund.index = pd.to_datetime(fund.index)
-
-    df.index.name = "date"
-    fund.index.name = "date"
-    df = df.reset_index()
-    fund = fund.reset_index()
-    df = df.merge(fund, how="left", on="date")
-    for col in ["eps", "pe", "pb"]:
-        if col not in df.columns:
-            df[col] = 0
-    df.set_index("date", inplace=True)
-    if fund.empty:
-        df[["eps", "pe", "pb"]] = 0
-        df[["eps", "pe", "pb"]].fillna(0, inplace=True)
-    else:
-        df[["eps", "pe", "pb"]] = df[["eps", "pe", "pb"]].ffill()
-
-    # テクニカル指標の計算
-    df["Return"] = df["Close"].pct_change()
-    for i in range(1, 6):
-        df[f"lag_{i}"] = df["Return"].shift(i)
-
-    df["rsi"] = ta.momentum.RSIIndicator(close=df["Close"]).rsi()
-    macd_indicator = ta.trend.MACD(close=df["Close"])
-    df["macd"] = macd_indicator.macd()
-    df["macd_signal"] = macd_indicator.macd_signal()
-    df["macd_diff"] = macd_indicator.macd_diff()
-    stoch_indicator = ta.momentum.StochasticOscillator(
-        high=df["High"], low=df["Low"], close=df["Close"]
-    )
-    df["stoch"] = stoch_indicator.stoch()
-    df["stoch_signal"] = stoch_indicator.stoch_signal()
-    df["atr"] = ta.volatility.AverageTrueRange(
-        high=df["High"], low=df["Low"], close=df["Close"]
-    ).average_true_range()
 
-    # \u2605\u2605\u2605\u2605\u2605 ここからが最重要の修正点 \u2605\u2605\u2605\u2605\u2605
+def run_predictions(
+    ticker: str, horizons=None, prices=None, fundamentals=None
+) -> PredictionResult | None:
+    """Return a :class:`PredictionResult`, or ``None`` without enough data.
 
-    # 1. 目的変数と将来リターンを先に計算し、欠損値をまとめて処理
+    ``prices`` may carry an already downloaded 2-year daily history to skip
+    the download, e.g. from a batched multi-ticker fetch, and
+    ``fundamentals`` the frame :func:`_load_fundamentals` returned for it.
+    """
+    ticker_symbol = symbol_for(ticker)
+    if prices is not None:
+        df = prices.copy()
+    else:
+        df = daily_prices(ticker_symbol, "2y")
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if len(df) < 30:
+        return None
+
+    if fundamentals is None:
+        fundamentals = _load_fundamentals(ticker_symbol)
+    df = build_feature_frame(df, fundamentals, lean=settings.MEMORY_LEAN)
     if horizons is None:
-        horizons = [1, 7, 28]
-    for h in horizons:
-        df[f"target_{h}"] = (df["Close"].shift(-h) > df["Close"]).astype(int)
-        df[f"future_return_{h}"] = df["Close"].pct_change(periods=h).shift(-h)
+        horizons = DEFAULT_HORIZONS
 
-    # 2. 特徴量と目的変数が揃っている行だけを最終的な学習データとする
-    feature_cols = [f"lag_{i}" for i in range(1, 6)] + [
-        "eps",
-        "pe",
-        "pb",
-        "rsi",
-        "macd",
-        "macd_signal",
-        "macd_diff",
-        "stoch",
-        "stoch_signal",
-        "atr",
+    stored_predictions = None
+    if settings.PREDICTION_MODEL == "panel":
+        stored_predictions = predict_with_panel_model(
+            normalize_code(ticker_symbol), df, horizons
+        )
+    elif settings.PREDICTION_MODEL == "stored":
+        stored_predictions = predict_with_ticker_model(
+            normalize_code(ticker_symbol), df, horizons
+        )
+    estimates = [
+        (p["horizon"], p["prob_up"], p["up_return"], p["down_return"])
+        for p in stored_predictions or []
     ]
-    target_cols = [f"target_{h}" for h in horizons]
-    return_cols = [f"future_return_{h}" for h in horizons]
-
-    df_clean = df[feature_cols + target_cols + return_cols].dropna()
-
-    X = df_clean[feature_cols]
-    X.columns = [str(c) for c in X.columns]
-
-    results = []
-    tscv = TimeSeriesSplit(n_splits=5)
 
-    for h in horizons:
-        y_h = df_clean[f"target_{h}"]
-        returns_h = df_clean[f"future_return_{h}"]
-
-        if len(X) <= tscv.n_splits:
-            continue
-
-        model = None
-        final_train_index = None
-        for train_index, _ in tscv.split(X):
-            model = LGBMClassifier(
-                random_state=0,
-                learning_rate=0.05,
-                n_estimators=200,
-                num_leaves=31,
-                max_depth=-1,
-                reg_alpha=0.1,
-                reg_lambda=0.1,
-                n_jobs=-1,
-            )
-            model.fit(X.iloc[train_index], y_h.iloc[train_index])
-            final_train_index = train_index
+    if not estimates:
+        estimates = _train_and_predict(
+            df, horizons, normalize_code(ticker_symbol)
+        )
+    return PredictionResult.from_estimates(ticker, estimates)
 
-        if model is None or final_train_index is None:
-            continue
 
-        prob_up = model.predict_proba(X.iloc[[-1]])[0, 1]
-        prediction = "UP" if prob_up >= 0.5 else "DOWN"
+def _horizon_threads(n_horizons: int) -> tuple[int, int]:
+    """Return ``(parallel horizons, LightGBM threads per horizon)``."""
+    n_jobs = settings.LIGHTGBM_REQUEST_N_JOBS
+    cores = (os.cpu_count() or 1) if n_jobs <= 0 else n_jobs
+    workers = max(1, min(n_horizons, cores))
+    return workers, max(1, cores // workers)
 
-        # 期待リターンの計算ロジックを再構築
-        train_pred = model.predict(X.iloc[final_train_index])
-        y_train = y_h.iloc[final_train_index]
-        returns_train = returns_h.iloc[final_train_index]
 
-        up_mask = (train_pred == 1) & (y_train == 1)
-        down_mask = (train_pred == 0) & (y_train == 0)
+def _train_and_predict(
+    df: pd.DataFrame, horizons: list[int], code: str | None = None
+) -> list[tuple]:
+    """Return ``(horizon, prob_up, up_return, down_return)`` per horizon.
 
-        up_return = returns_train[up_mask].mean()
-        down_return = returns_train[down_mask].mean()
+    One classifier is trained per horizon on this ticker's history, using
+    the parameters and tree count saved by ``tune_models`` when available.
+    The features are binned once into a LightGBM ``Dataset``; each horizon
+    trains on a view of it with its own label, concurrently when cores allow.
+    """
+    # 1. 目的変数と将来リターンを先に計算し、欠損値をまとめて処理
+    df = add_targets(df, horizons)
 
-        expected_return = up_return if prediction == "UP" else down_return
-        if pd.isna(expected_return):
-            expected_return = 0.0
+    # 2. 特徴量と目的変数が揃っている行だけを最終的な学習データとする
+    target_cols = [f"target_{h}" for h in horizons]
+    return_cols = [f"future_return_{h}" for h in horizons]
+    df_clean = df[FEATURE_COLUMNS + target_cols + return_cols].dropna()
 
-        results.append(
-            {
-                PREDICTION_COLUMNS[0]: h,
-                PREDICTION_COLUMNS[1]: prediction,
-                PREDICTION_COLUMNS[2]: round(prob_up * 100),
-                PREDICTION_COLUMNS[3]: expected_return,
-            }
+    tscv = TimeSeriesSplit(n_splits=5)
+    if len(df_clean) <= tscv.n_splits:
+        return []
+
+    # Only the model of the last (largest) fold is used for prediction
+    *_, (train_index, _) = tscv.split(df_clean)
+    X = df_clean[FEATURE_COLUMNS].to_numpy()
+    X_train = X[train_index]
+    binned = lgb.Dataset(
+        X_train,
+        label=np.zeros(len(train_index)),
+        params={"feature_pre_filter": False, "verbose": -1},
+        free_raw_data=False,
+    ).construct()
+    workers, threads = _horizon_threads(len(horizons))
+
+    def fit(h):
+        y_train = df_clean[f"target_{h}"].to_numpy()[train_index]
+        returns_train = df_clean[f"future_return_{h}"].to_numpy()[train_index]
+        params = {**MODEL_PARAMS, **tuned_params_for(code, h)}
+
+        # ラベルだけ差し替えてビン分割済みのデータを再利用する
+        train_set = binned.subset(np.arange(len(train_index))).construct()
+        train_set.set_label(y_train)
+        booster = lgb.train(
+            booster_params(params, threads),
+            train_set,
+            num_boost_round=params["n_estimators"],
         )
 
-    if not results:
-        return (None, None)
+        prob_up = booster.predict(X[-1:])[0]
 
-    table = pd.DataFrame(results)
-    prob_col = PREDICTION_COLUMNS[2]
-
-    def color_scale(val: float) -> str:
-        if val == 50:
-            return ""
-        if val > 50:
-            alpha = min((val - 50) / 50, 1)
-            return f"background-color: rgba(0, 255, 0, {alpha:.2f})"
-        alpha = min((50 - val) / 50, 1)
-        return f"background-color: rgba(255, 0, 0, {alpha:.2f})"
-
-    styled_table = (
-        table.style.applymap(color_scale, subset=[prob_col])
-        .format({prob_col: "{:.0f}%", PREDICTION_COLUMNS[3]: lambda x: f"{x:+.2f}%"})
-        .hide(axis="index")
-        .set_table_attributes('class="table table-striped"')
-    )
-
-    return (
-        styled_table.to_html(),
-        None,
-    )
+        # 期待リターンの計算ロジックを再構築
+        train_pred = (booster.predict(X_train) > 0.5).astype(int)
+        up_mask = (train_pred == 1) & (y_train == 1)
+        down_mask = (train_pred == 0) & (y_train == 0)
+        up_return = returns_train[up_mask].mean() if up_mask.any() else np.nan
+        down_return = returns_train[down_mask].mean() if down_mask.any() else np.nan
+        return (h, prob_up, up_return, down_return)
+
+    if workers == 1:
+        return [fit(h) for h in horizons]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fit, horizons))
@@ -0,0 +1,146 @@
+"""Payloads and cache validators for the versioned JSON analysis API.
+
+The price-derived sections (latest bars, predictions, chart) only change
+when a new bar is published or the prediction model changes, so they are
+cached under an ETag derived from exactly those two values, and a matching
+``If-None-Match`` is answered without recomputation. The financials and the
+Gemini report come from other inputs and are built per response, so the
+ETag is weak: bodies sharing it are equivalent, not byte-identical.
+"""
+import hashlib
+
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .analysis import (
+    financial_records,
+    get_company_name,
+    run_candlestick_analysis,
+    run_predictions,
+)
+from .downsample import DEFAULT_CHART_RANGE
+from .gemini_analyzer import generate_analyst_report
+from .market_calendar import cache_timeout
+from .market_data import download
+from .model_store import load_ticker_model
+from .panel_model import load_panel_model
+from .tickers import symbol_for
+from .tuning import tuned_at
+
+API_VERSION = 1
+ANALYSIS_FIELDS = ("latest", "predictions", "financials", "report", "chart")
+DEFAULT_FIELDS = ("latest", "predictions", "financials", "report")
+# Sections fixed by the bar date and model version, cached under the ETag
+CACHED_FIELDS = ("latest", "predictions", "chart")
+
+
+def last_bar_date(ticker_symbol: str) -> str | None:
+    """Return the date of the most recent daily bar.
+
+    Cached briefly while prices can move and otherwise until the next
+    session opens.
+    """
+    key = f"last_bar:{ticker_symbol}"
+    value = cache.get(key)
+    if value is None:
+        df = download(
+            ticker_symbol,
+            period="5d",
+            interval="1d",
+            auto_adjust=False,
+            progress=False,
+        )
+        value = "" if df.empty else str(pd.Timestamp(df.index[-1]).date())
+        cache.set(key, value, cache_timeout(settings.LAST_BAR_CACHE_SECONDS))
+    return value or None
+
+
+def model_version(ticker: str) -> str:
+    """Return a token that changes whenever ``ticker``'s predictions could change.
+
+    It covers the panel artifact's training time, the stored per-ticker
+    artifact's last update and the tuned-params file's tuning time.
+    """
+    version = f"{settings.ANALYSIS_MODEL_VERSION}:{settings.PREDICTION_MODEL}"
+    if settings.PREDICTION_MODEL == "panel":
+        artifact = load_panel_model()
+        if artifact is not None:
+            version += f":{artifact['trained_at']}"
+        return version
+    if settings.PREDICTION_MODEL == "stored":
+        artifact = load_ticker_model(ticker)
+        if artifact is not None:
+            version += f":{artifact.get('updated_at', '')}"
+    return f"{version}:{tuned_at() or ''}"
+
+
+def analysis_etag(
+    ticker: str, bar_date: str, version: str, fields: list[str]
+) -> str:
+    """Return a weak ETag for one ticker, bar date, model and field set."""
+    raw = "|".join([str(API_VERSION), ticker, bar_date, version, ",".join(fields)])
+    return 'W/"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def analysis_sections(
+    ticker: str,
+    fields: list[str],
+    thumbnail: bool = False,
+    chart_range: str = DEFAULT_CHART_RANGE,
+) -> dict:
+    """Compute the :data:`CACHED_FIELDS` sections needed for ``fields``.
+
+    The report is written from the latest bars and the predictions, so
+    both are computed when ``fields`` has it. ``thumbnail`` renders the
+    chart at the low thumbnail DPI and ``chart_range`` sets its range.
+    """
+    fields = set(fields)
+    sections = {}
+    if {"latest", "chart", "report"} & fields:
+        candle = run_candlestick_analysis(
+            ticker, thumbnail=thumbnail, chart_range=chart_range
+        )
+        sections["latest"] = candle.latest.records() if candle.latest else []
+        sections["warning"] = candle.warning
+        if "chart" in fields:
+            sections["chart"] = candle.chart_data
+    if {"predictions", "report"} & fields:
+        prediction = run_predictions(ticker)
+        sections["predictions"] = prediction.records() if prediction else []
+    return sections
+
+
+def build_analysis_payload(
+    ticker: str, fields: list[str], bar_date: str, version: str, sections: dict
+) -> dict:
+    """Return the response body from :func:`analysis_sections` ``sections``.
+
+    The financials and the report are computed here, for every response.
+    """
+    payload = {
+        "api_version": API_VERSION,
+        "ticker": ticker,
+        "last_bar_date": bar_date,
+        "model_version": version,
+    }
+    if "latest" in fields:
+        payload["latest"] = sections["latest"]
+        payload["warning"] = sections["warning"]
+    if "chart" in fields:
+        payload["chart"] = sections["chart"]
+    if "predictions" in fields:
+        payload["predictions"] = sections["predictions"]
+    if "financials" in fields:
+        ticker_symbol = symbol_for(ticker)
+        payload["financials"] = {
+            "quarterly": financial_records(ticker_symbol, "quarterly"),
+            "annual": financial_records(ticker_symbol, "annual"),
+        }
+    if "report" in fields:
+        company_name = get_company_name(ticker)
+        payload["company_name"] = company_name
+        payload["report"] = generate_analyst_report(
+            company_name, ticker, sections["latest"], sections["predictions"]
+        ) or None
+    return payload
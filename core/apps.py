@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.conf import settings
+
+        if settings.YAHOO_API_ENDPOINT:
+            from .market_data import route_yahoo_to
+
+            route_yahoo_to(settings.YAHOO_API_ENDPOINT)
@@ -0,0 +1,39 @@
+"""Files written offline and read on the request path.
+
+Model, tuning and index artifacts are written atomically (a temporary file
+then ``os.replace``) so serving workers never read a partial file, and
+loaded through a per-process cache keyed by path that reloads a file when
+its modification time changes.
+"""
+import os
+import threading
+from pathlib import Path
+
+import joblib
+
+_lock = threading.Lock()
+_cache: dict[str, tuple[float, object]] = {}
+
+
+def save_artifact(path: str | Path, obj, dump=joblib.dump) -> str:
+    """Write ``obj`` to ``path`` with ``dump(obj, filename)`` and return the path."""
+    path = str(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_cached_artifact(path: str | Path, load=joblib.load):
+    """Return ``load(path)``, cached until the file changes; ``None`` if missing."""
+    path = str(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _cache[path] = (mtime, load(path))
+        return cached[1]
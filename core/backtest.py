@@ -0,0 +1,206 @@
+"""Walk-forward backtests of the UP/DOWN prediction signals.
+
+Models are refitted once per block of ``step`` bars on an expanding window
+and predict the whole block in one call. Strategy metrics are then computed
+for the full history at once with NumPy.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+
+from .features import FEATURE_COLUMNS, add_targets, build_feature_frame
+from .market_data import download_histories
+from .models import Ticker
+from .tickers import normalize_code, symbol_for
+from .tuning import MODEL_PARAMS
+
+METRIC_COLUMNS = [
+    "signals",
+    "trades",
+    "hit_rate",
+    "total_return",
+    "mean_return",
+    "turnover",
+    "max_drawdown",
+]
+
+
+def load_price_store(directory: str | Path, codes: list[str] | None = None):
+    """Return ``{code: OHLCV DataFrame}`` from ``<code>.csv`` files.
+
+    Files use the same layout as ``core/tests/fixtures/sample_prices.csv``.
+    """
+    directory = Path(directory)
+    paths = sorted(directory.glob("*.csv"))
+    if codes:
+        wanted = set(codes)
+        paths = [p for p in paths if p.stem in wanted]
+    return {p.stem: load_price_csv(p) for p in paths}
+
+
+def load_price_csv(path: str | Path) -> pd.DataFrame:
+    """Read one OHLCV CSV indexed by date."""
+    return pd.read_csv(path, index_col=0, parse_dates=True).sort_index()
+
+
+def load_universe(options: dict) -> dict[str, tuple[pd.DataFrame, bool]]:
+    """Return ``{code: (prices, fetch_fundamentals)}`` for a model command.
+
+    ``options`` are the parsed ``codes``, ``csv``, ``prices_dir``,
+    ``period``, ``chunk_size`` and ``skip_fundamentals`` arguments shared
+    by ``backtest``, ``tune_models`` and ``update_models``. Without codes
+    every ticker in the table is loaded. Offline files never fetch
+    fundamentals; otherwise histories are downloaded ``chunk_size`` tickers
+    at a time.
+    """
+    codes = options["codes"]
+    if options["csv"]:
+        code = codes[0] if codes else "csv"
+        return {code: (load_price_csv(options["csv"]), False)}
+    if options["prices_dir"]:
+        store = load_price_store(options["prices_dir"], codes)
+        return {code: (df, False) for code, df in store.items()}
+
+    if codes:
+        codes = [normalize_code(code) for code in codes]
+    else:
+        codes = list(Ticker.objects.order_by("code").values_list("code", flat=True))
+    fetch = not options["skip_fundamentals"]
+    universe = {}
+    chunk_size = options["chunk_size"]
+    for start in range(0, len(codes), chunk_size):
+        chunk = codes[start:start + chunk_size]
+        histories = download_histories(
+            [symbol_for(code) for code in chunk], options["period"]
+        )
+        for code in chunk:
+            if symbol_for(code) in histories:
+                universe[code] = (histories[symbol_for(code)], fetch)
+    return universe
+
+
+def prepare_dataset(prices: pd.DataFrame, horizons: list[int]) -> pd.DataFrame:
+    """Return features and targets for a price history, without fundamentals."""
+    df = build_feature_frame(prices.copy(), pd.DataFrame())
+    df = add_targets(df, horizons)
+    return df.dropna(subset=FEATURE_COLUMNS)
+
+
+def walk_forward_probabilities(
+    X: np.ndarray,
+    y: np.ndarray,
+    horizon: int,
+    min_train: int,
+    step: int,
+    model_params: dict | None = None,
+) -> np.ndarray:
+    """Return out-of-sample P(UP) for every row, NaN where no model exists.
+
+    A row's label needs ``horizon`` future bars, so a model predicting from
+    row ``t`` may only be trained on rows before ``t - horizon``.
+    """
+    params = {**MODEL_PARAMS, "verbose": -1, **(model_params or {})}
+    n = len(X)
+    prob = np.full(n, np.nan)
+    for start in range(min_train, n, step):
+        train_end = start - horizon
+        if train_end < 2 or np.unique(y[:train_end]).size < 2:
+            continue
+        model = LGBMClassifier(**params)
+        model.fit(X[:train_end], y[:train_end])
+        prob[start:start + step] = model.predict_proba(X[start:start + step])[:, 1]
+    return prob
+
+
+def signal_metrics(
+    prob: np.ndarray,
+    future_return: np.ndarray,
+    horizon: int,
+    allow_short: bool = True,
+) -> dict:
+    """Return hit rate, returns, turnover and drawdown for one signal series.
+
+    Positions are held for ``horizon`` bars, so trades are taken on every
+    ``horizon``-th scored row to keep holding periods from overlapping.
+    """
+    scored = np.flatnonzero(~np.isnan(prob) & ~np.isnan(future_return))
+    if scored.size == 0:
+        empty = {col: np.nan for col in METRIC_COLUMNS}
+        empty.update(signals=0, trades=0)
+        return empty
+
+    up = prob[scored] >= 0.5
+    realised_up = future_return[scored] > 0
+    hit_rate = np.mean(up == realised_up)
+
+    trades = scored[::horizon]
+    position = np.where(prob[trades] >= 0.5, 1.0, -1.0 if allow_short else 0.0)
+    strategy = position * future_return[trades]
+    equity = np.cumprod(1.0 + strategy)
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    turnover = np.abs(np.diff(np.concatenate([[0.0], position]))).mean()
+
+    return {
+        "signals": int(scored.size),
+        "trades": int(trades.size),
+        "hit_rate": float(hit_rate),
+        "total_return": float(equity[-1] - 1.0),
+        "mean_return": float(strategy.mean()),
+        "turnover": float(turnover),
+        "max_drawdown": float((equity / peak - 1.0).min()),
+    }
+
+
+def backtest_ticker(
+    prices: pd.DataFrame,
+    horizons: list[int],
+    min_train: int = 250,
+    step: int = 20,
+    allow_short: bool = True,
+) -> pd.DataFrame:
+    """Return one metrics row per horizon for a single price history."""
+    df = prepare_dataset(prices, horizons)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    rows = []
+    for h in horizons:
+        y = df[f"target_{h}"].to_numpy()
+        future_return = df[f"future_return_{h}"].to_numpy(dtype=np.float64)
+        prob = walk_forward_probabilities(X, y, h, min_train, step)
+        rows.append(
+            {"horizon": h, **signal_metrics(prob, future_return, h, allow_short)}
+        )
+    return pd.DataFrame(rows, columns=["horizon"] + METRIC_COLUMNS)
+
+
+def backtest_universe(
+    universe: dict[str, pd.DataFrame],
+    horizons: list[int],
+    min_train: int = 250,
+    step: int = 20,
+    allow_short: bool = True,
+) -> pd.DataFrame:
+    """Return per-ticker metrics plus signal-weighted ``ALL`` rows."""
+    frames = []
+    for code, prices in universe.items():
+        result = backtest_ticker(prices, horizons, min_train, step, allow_short)
+        result.insert(0, "ticker", code)
+        frames.append(result)
+    if not frames:
+        return pd.DataFrame(columns=["ticker", "horizon"] + METRIC_COLUMNS)
+    results = pd.concat(frames, ignore_index=True)
+
+    scored = results[results["trades"] > 0]
+    if not scored.empty:
+        summary = []
+        for h, group in scored.groupby("horizon"):
+            w = group["signals"]
+            row = {"ticker": "ALL", "horizon": h}
+            row["signals"] = int(w.sum())
+            row["trades"] = int(group["trades"].sum())
+            for col in METRIC_COLUMNS[2:]:
+                row[col] = float(np.average(group[col], weights=w))
+            summary.append(row)
+        results = pd.concat([results, pd.DataFrame(summary)], ignore_index=True)
+    return results
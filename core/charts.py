@@ -0,0 +1,213 @@
+"""Chart rendering on reusable, pre-laid-out figure templates.
+
+Building a matplotlib figure (axes, styles, layout) costs far more than
+drawing into one, so each thread keeps one template per chart type and
+only swaps the line and candle data before saving. Everything uses the
+object-oriented Agg API; no global ``pyplot`` state is touched.
+"""
+import base64
+import threading
+from io import BytesIO
+
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+# Colours of the mplfinance "yahoo" style used before
+UP_COLOR = "#00b060"
+DOWN_COLOR = "#fe3032"
+CANDLE_WIDTH = 0.6
+
+_local = threading.local()
+
+
+def _to_base64_png(fig: Figure, dpi: int) -> str:
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi)
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def chart_dpi(thumbnail: bool = False) -> int:
+    """Return the output DPI for a full-size chart or a thumbnail."""
+    return settings.CHART_THUMBNAIL_DPI if thumbnail else settings.CHART_DPI
+
+
+class LineChart:
+    """Date-indexed line chart with any number of labelled series."""
+
+    def __init__(self, figsize=(10, 5)):
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.fig.subplots_adjust(left=0.08, right=0.98, top=0.92, bottom=0.1)
+        self.lines = []
+        self.hline = self.ax.axhline(0, color="gray", lw=0.5, visible=False)
+        self._labels = None
+
+    def _line(self, i: int):
+        while len(self.lines) <= i:
+            (line,) = self.ax.plot([], [])
+            self.lines.append(line)
+        return self.lines[i]
+
+    def update(
+        self, dates, series, title="", xlabel="", ylabel="", hline=None
+    ) -> None:
+        """Replace the data; ``series`` is a list of ``(label, values)``."""
+        dates = pd.DatetimeIndex(dates)
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        x = mdates.date2num(dates.to_pydatetime())
+        for i, (label, values) in enumerate(series):
+            line = self._line(i)
+            line.set_data(x, np.asarray(values, dtype=float).reshape(-1))
+            line.set_label(label)
+            line.set_visible(True)
+        for line in self.lines[len(series):]:
+            line.set_visible(False)
+            line.set_data([], [])
+        labels = [label for label, _ in series]
+        if labels != self._labels:
+            self.ax.legend(handles=self.lines[: len(series)], loc="best")
+            self._labels = labels
+
+        self.hline.set_visible(hline is not None)
+        if hline is not None:
+            self.hline.set_ydata([hline, hline])
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+
+    def render(self, dpi: int) -> str:
+        return _to_base64_png(self.fig, dpi)
+
+
+class CandlestickChart:
+    """Candles with volume, MACD and RSI panels on a shared bar axis."""
+
+    def __init__(self, figsize=(20, 12)):
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        grid = self.fig.add_gridspec(
+            4, 1, height_ratios=(3, 1, 1, 1), hspace=0.15,
+            left=0.05, right=0.97, top=0.94, bottom=0.05,
+        )
+        self.ax_price = self.fig.add_subplot(grid[0])
+        self.ax_volume = self.fig.add_subplot(grid[1], sharex=self.ax_price)
+        self.ax_macd = self.fig.add_subplot(grid[2], sharex=self.ax_price)
+        self.ax_rsi = self.fig.add_subplot(grid[3], sharex=self.ax_price)
+        self.axes = [self.ax_price, self.ax_volume, self.ax_macd, self.ax_rsi]
+
+        self.wicks = LineCollection([], linewidths=1)
+        self.bodies = PolyCollection([], linewidths=0.5)
+        self.volume = PolyCollection([], linewidths=0)
+        self.ax_price.add_collection(self.wicks)
+        self.ax_price.add_collection(self.bodies)
+        self.ax_volume.add_collection(self.volume)
+        (self.macd_line,) = self.ax_macd.plot([], [], color="blue")
+        (self.rsi_line,) = self.ax_rsi.plot([], [], color="purple")
+
+        for ax, label in zip(self.axes, ["Price", "Volume", "MACD", "RSI"]):
+            ax.set_ylabel(label)
+            ax.grid(True, alpha=0.3)
+        for ax in self.axes[:-1]:
+            ax.tick_params(labelbottom=False)
+        self.ax_rsi.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
+        self.ax_rsi.xaxis.set_major_formatter(FuncFormatter(self._format_bar))
+        self.title = self.fig.suptitle("")
+        self._dates = pd.DatetimeIndex([])
+        self._date_format = "%b %d"
+
+    def _format_bar(self, value, _pos) -> str:
+        i = int(round(value))
+        if 0 <= i < len(self._dates):
+            return self._dates[i].strftime(self._date_format)
+        return ""
+
+    def update(self, prices: pd.DataFrame, macd, rsi, title: str) -> None:
+        """Replace the bars; ``prices`` holds Open/High/Low/Close/Volume."""
+        o, h, low, c, v = (
+            prices[col].to_numpy(dtype=float)
+            for col in ["Open", "High", "Low", "Close", "Volume"]
+        )
+        n = len(c)
+        x = np.arange(n, dtype=float)
+        half = CANDLE_WIDTH / 2
+        colors = np.where(c >= o, UP_COLOR, DOWN_COLOR)
+
+        self.wicks.set_segments(np.stack([np.c_[x, low], np.c_[x, h]], axis=1))
+        self.wicks.set_color(colors)
+        self.bodies.set_verts(_bar_verts(x, half, o, c))
+        self.bodies.set_facecolor(colors)
+        self.bodies.set_edgecolor(colors)
+        self.volume.set_verts(_bar_verts(x, half, np.zeros(n), v))
+        self.volume.set_facecolor(colors)
+        self.macd_line.set_data(x, np.asarray(macd, dtype=float))
+        self.rsi_line.set_data(x, np.asarray(rsi, dtype=float))
+
+        self.ax_price.set_xlim(-1, n)
+        if n:
+            pad = (np.nanmax(h) - np.nanmin(low)) * 0.05 or 1.0
+            self.ax_price.set_ylim(np.nanmin(low) - pad, np.nanmax(h) + pad)
+            self.ax_volume.set_ylim(0, (np.nanmax(v) or 1.0) * 1.1)
+        for ax in (self.ax_macd, self.ax_rsi):
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+        self._dates = pd.DatetimeIndex(prices.index)
+        # Multi-year charts (weekly or longer candles) need the year
+        long_span = n > 1 and (self._dates[-1] - self._dates[0]).days > 400
+        self._date_format = "%Y-%m" if long_span else "%b %d"
+        self.title.set_text(title)
+
+    def render(self, dpi: int) -> str:
+        return _to_base64_png(self.fig, dpi)
+
+
+def _bar_verts(x, half, start, end) -> np.ndarray:
+    """Return ``(n, 4, 2)`` rectangle vertices from ``start`` to ``end``."""
+    return np.stack(
+        [
+            np.c_[x - half, start],
+            np.c_[x - half, end],
+            np.c_[x + half, end],
+            np.c_[x + half, start],
+        ],
+        axis=1,
+    )
+
+
+def _template(name: str, factory):
+    templates = getattr(_local, "templates", None)
+    if templates is None:
+        templates = _local.templates = {}
+    if name not in templates:
+        templates[name] = factory()
+    return templates[name]
+
+
+def render_line_chart(
+    dates, series, title="", xlabel="", ylabel="", hline=None, thumbnail=False
+) -> str:
+    """Return a base64 PNG line chart drawn on this thread's template."""
+    chart = _template("line", LineChart)
+    chart.update(dates, series, title, xlabel, ylabel, hline)
+    return chart.render(chart_dpi(thumbnail))
+
+
+def render_candlestick_chart(
+    prices: pd.DataFrame, macd, rsi, title: str, thumbnail=False
+) -> str:
+    """Return a base64 PNG candlestick chart with volume, MACD and RSI."""
+    chart = _template("candlestick", CandlestickChart)
+    chart.update(prices, macd, rsi, title)
+    return chart.render(chart_dpi(thumbnail))
@@ -0,0 +1,118 @@
+"""Side-by-side comparison of an arbitrary list of tickers."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .analysis import (
+    _load_and_format_financials,
+    get_company_name,
+    run_predictions,
+)
+from .charts import render_line_chart
+from .market_data import download_histories
+from .sectors import build_close_matrix
+from .tickers import symbol_for
+
+COMPARE_PERIOD = "2y"
+CHART_BARS = 250
+
+
+def normalized_performance(matrix: np.ndarray) -> np.ndarray:
+    """Rebase every column to 100 at its first valid close."""
+    if len(matrix) == 0:
+        return matrix
+    valid = ~np.isnan(matrix)
+    first = matrix[valid.argmax(axis=0), np.arange(matrix.shape[1])]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return matrix / first * 100.0
+
+
+def correlation_matrix(returns: np.ndarray) -> np.ndarray:
+    """Return the pairwise-complete correlation matrix of return columns.
+
+    All pairs are computed at once from masked sums, so gaps in one ticker
+    only drop the affected rows for the pairs that involve it.
+    """
+    mask = (~np.isnan(returns)).astype(float)
+    x = np.where(mask > 0, returns, 0.0)
+    n = mask.T @ mask
+    sum_x = x.T @ mask
+    sum_xx = (x * x).T @ mask
+    sum_xy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var = sum_xx - sum_x**2 / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < 3] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _render_performance_chart(dates, perf: np.ndarray, labels: list[str]) -> str:
+    """Return a base64 PNG of rebased performance lines."""
+    return render_line_chart(
+        dates,
+        [(label, perf[:, i]) for i, label in enumerate(labels)],
+        ylabel="Performance (start = 100)",
+        hline=100,
+    )
+
+
+def _ticker_details(code: str, prices: pd.DataFrame | None) -> dict:
+    """Run the per-ticker heavy stages for one ticker."""
+    prediction = None
+    if prices is not None:
+        prediction = run_predictions(code, prices=prices)
+    return {
+        "ticker": code,
+        "company_name": get_company_name(code),
+        "predictions": prediction.records() if prediction else [],
+        "quarterly_table": _load_and_format_financials(
+            symbol_for(code), "quarterly"
+        ),
+    }
+
+
+def compare_tickers(codes: list[str], max_workers: int = 4) -> dict:
+    """Return chart, summary rows and correlation matrix for ``codes``.
+
+    Prices come from one batched download; predictions reuse those prices
+    and run concurrently with the financial statement fetches.
+    """
+    symbols = [symbol_for(code) for code in codes]
+    histories = download_histories(symbols, COMPARE_PERIOD)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_ticker_details, code, histories.get(symbol))
+            for code, symbol in zip(codes, symbols)
+        ]
+        chart_data = None
+        closes = pd.DataFrame(columns=symbols)
+        if histories:
+            closes = pd.concat(
+                {s: histories[s]["Close"] for s in symbols if s in histories},
+                axis=1,
+            ).reindex(columns=symbols)
+            closes = closes.iloc[-CHART_BARS:]
+        matrix = build_close_matrix(closes).reshape(-1, len(symbols))
+        perf = normalized_performance(matrix)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = matrix[1:] / matrix[:-1] - 1.0
+        corr = correlation_matrix(returns)
+        if len(matrix):
+            chart_data = _render_performance_chart(closes.index, perf, codes)
+        details = [f.result() for f in futures]
+
+    for i, row in enumerate(details):
+        row["last_close"] = matrix[-1, i] if len(matrix) else np.nan
+        row["performance"] = perf[-1, i] - 100.0 if len(perf) else np.nan
+    correlation = [
+        {"ticker": code, "values": [None if np.isnan(v) else v for v in corr[i]]}
+        for i, code in enumerate(codes)
+    ]
+    return {
+        "chart_data": chart_data,
+        "rows": details,
+        "correlation": correlation,
+    }
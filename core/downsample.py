@@ -0,0 +1,104 @@
+"""Downsampling long price histories to a fixed chart budget.
+
+Line charts keep at most ``CHART_MAX_POINTS`` points chosen with
+Largest-Triangle-Three-Buckets (LTTB), which preserves the peaks and
+troughs a plain stride would skip. Candlestick charts switch from daily to
+weekly, monthly or quarterly bars until at most ``CHART_MAX_CANDLES``
+remain, so drawing and encoding a chart costs about the same for any
+range.
+"""
+import numpy as np
+import pandas as pd
+
+# Selectable chart ranges, as yfinance periods
+CHART_RANGES = ("3mo", "6mo", "1y", "2y", "5y", "10y", "max")
+DEFAULT_CHART_RANGE = "6mo"
+# Ranges that can be cut from the 2-year history the page already loads
+RANGE_OFFSETS = {
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+}
+# Candle sizes tried in order, as pandas period frequencies
+CANDLE_FREQUENCIES = ("D", "W", "M", "Q")
+CANDLE_LABELS = {"D": "Daily", "W": "Weekly", "M": "Monthly", "Q": "Quarterly"}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Return the indices of ``threshold`` points that keep the line's shape.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the mean of the next bucket. NaNs in ``y``
+    are never chosen when a bucket has a finite value.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.isfinite(y)
+    y_filled = np.where(finite, y, np.nanmean(y) if finite.any() else 0.0)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y_filled[next_start:next_stop].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y_filled[start:stop] - y_filled[previous])
+            - (x[previous] - x[start:stop]) * (avg_y - y_filled[previous])
+        )
+        area[~finite[start:stop]] = -1.0
+        previous = start + int(np.argmax(area))
+        indices[i + 1] = previous
+    return indices
+
+
+def lttb_frame(df: pd.DataFrame, column: str, threshold: int) -> pd.DataFrame:
+    """Return the rows of ``df`` picked by LTTB on ``column``.
+
+    The other columns (e.g. moving averages) are sampled at the same rows
+    so every line shares one date axis.
+    """
+    if isinstance(df.index, pd.DatetimeIndex):
+        x = df.index.asi8
+    else:
+        x = np.arange(len(df))
+    values = df[column]
+    if isinstance(values, pd.DataFrame):
+        values = values.iloc[:, 0]
+    return df.iloc[lttb_indices(x, values.to_numpy(dtype=float), threshold)]
+
+
+def aggregate_ohlc(prices: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Return OHLCV bars aggregated to pandas period ``freq`` (e.g. ``"W"``).
+
+    Each bar is labelled with the date of its last daily bar.
+    """
+    if freq == "D" or prices.empty:
+        return prices
+    index = pd.DatetimeIndex(prices.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    periods = index.to_period(freq)
+    bars = prices.groupby(periods).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    )
+    last_dates = pd.Series(prices.index, index=periods).groupby(level=0).last()
+    bars.index = pd.DatetimeIndex(last_dates.to_numpy(), name=prices.index.name)
+    return bars
+
+
+def candle_bars(prices: pd.DataFrame, max_candles: int) -> tuple[pd.DataFrame, str]:
+    """Return ``(bars, freq)`` with the finest candle size fitting the budget."""
+    for freq in CANDLE_FREQUENCIES:
+        bars = aggregate_ohlc(prices, freq)
+        if len(bars) <= max_candles:
+            return bars, freq
+    return bars, freq
@@ -0,0 +1,222 @@
+"""Bulk export of predictions, indicators and fundamentals for the universe.
+
+:func:`export_frames` works through the tickers ``chunk_size`` at a time
+(one batched price download per chunk) and yields one DataFrame per chunk,
+so only a chunk's histories are held in memory. :func:`csv_chunks` and
+:func:`parquet_chunks` turn those frames into bytes as they arrive.
+``python manage.py export_universe`` writes them to :func:`export_path`,
+and the ``/api/v1/export/`` endpoint only serves that file, so a request
+never starts a universe-wide computation; :func:`read_export` filters it
+by industry :data:`READ_CHUNK_ROWS` rows at a time.
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .analysis import _load_fundamentals, run_predictions
+from .features import DEFAULT_HORIZONS, build_feature_frame
+from .market_data import download_histories
+from .models import Ticker
+from .tickers import symbol_for
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "parquet")
+INDICATOR_COLUMNS = [
+    "close",
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_diff",
+    "stoch",
+    "stoch_signal",
+    "atr",
+]
+FUNDAMENTAL_COLUMNS = ["eps", "pe", "pb"]
+TEXT_COLUMNS = ("code", "name", "industry", "date")
+EXPORT_COLUMNS = (
+    ["code", "name", "industry", "date"]
+    + INDICATOR_COLUMNS
+    + FUNDAMENTAL_COLUMNS
+    + [f"{col}_{h}d" for h in DEFAULT_HORIZONS for col in ("prob_up", "exp_return")]
+)
+# Rows read at a time when an industry is filtered out of a written export
+READ_CHUNK_ROWS = 10_000
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def universe(industry_id: int | None = None) -> list[tuple[str, str, str]]:
+    """Return ``(code, name, industry)`` of every ticker, ordered by code."""
+    tickers = Ticker.objects.order_by("code")
+    if industry_id is not None:
+        tickers = tickers.filter(industry_id=industry_id)
+    return list(tickers.values_list("code", "name", "industry__name"))
+
+
+def export_path(fmt: str) -> Path:
+    """Return where ``export_universe`` writes the ``fmt`` export by default."""
+    return Path(settings.EXPORT_DIR) / f"universe.{fmt}"
+
+
+def export_row(
+    code: str, name: str, industry: str, prices: pd.DataFrame
+) -> dict | None:
+    """Return the latest indicators, fundamentals and predictions of ``code``.
+
+    Errors are logged and return ``None`` so one ticker cannot cut the
+    export short.
+    """
+    try:
+        return _export_row(code, name, industry, prices)
+    except Exception:
+        logger.exception("Export of %s failed", code)
+        return None
+
+
+def _export_row(code: str, name: str, industry: str, prices: pd.DataFrame) -> dict:
+    row = dict.fromkeys(EXPORT_COLUMNS, np.nan)
+    row.update(code=code, name=name, industry=industry)
+    fundamentals = _load_fundamentals(symbol_for(code))
+    features = build_feature_frame(prices, fundamentals)
+    latest = features.iloc[-1]
+    row["date"] = str(features.index[-1].date())
+    row["close"] = latest["Close"]
+    for col in INDICATOR_COLUMNS[1:] + FUNDAMENTAL_COLUMNS:
+        row[col] = latest[col]
+
+    result = run_predictions(code, prices=prices, fundamentals=fundamentals)
+    if result is not None:
+        for h, prob_up, expected in zip(
+            result.horizons, result.prob_up, result.expected_return
+        ):
+            if h in DEFAULT_HORIZONS:
+                row[f"prob_up_{h}d"] = prob_up
+                row[f"exp_return_{h}d"] = expected
+    return row
+
+
+def export_frames(
+    tickers: list[tuple[str, str, str]],
+    chunk_size: int = 200,
+    workers: int = 4,
+    period: str = "2y",
+) -> Iterator[pd.DataFrame]:
+    """Yield one frame of :data:`EXPORT_COLUMNS` per chunk of ``tickers``.
+
+    Tickers without 30 days of prices or whose row fails are skipped; a
+    chunk that yields no rows produces no frame.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(tickers), chunk_size):
+            chunk = tickers[start:start + chunk_size]
+            histories = download_histories(
+                [symbol_for(code) for code, _, _ in chunk], period
+            )
+            jobs = [
+                (code, name, industry, histories[symbol_for(code)])
+                for code, name, industry in chunk
+                if len(histories.get(symbol_for(code), ())) >= 30
+            ]
+            del histories
+            rows = [
+                row
+                for row in pool.map(lambda job: export_row(*job), jobs)
+                if row is not None
+            ]
+            if rows:
+                yield pd.DataFrame(rows, columns=EXPORT_COLUMNS)
+
+
+def csv_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Yield a CSV header, then the rows of each frame as it arrives."""
+    yield (",".join(EXPORT_COLUMNS) + "\n").encode()
+    for frame in frames:
+        yield frame.to_csv(index=False, header=False).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_schema():
+    return pa.schema(
+        [
+            (c, pa.string() if c in TEXT_COLUMNS else pa.float64())
+            for c in EXPORT_COLUMNS
+        ]
+    )
+
+
+def parquet_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Yield a Parquet file one row group (one frame) at a time."""
+    if pq is None:
+        raise RuntimeError("Parquet export requires pyarrow.")
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for frame in frames:
+            writer.write_table(
+                pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            )
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_chunks(fmt: str, frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    return parquet_chunks(frames) if fmt == "parquet" else csv_chunks(frames)
+
+
+def read_export(fmt: str, industry: str) -> Iterator[bytes]:
+    """Return the rows of ``industry`` in the written ``fmt`` export as chunks.
+
+    The file is opened here, so ``FileNotFoundError`` is raised before the
+    first chunk until ``export_universe`` has written it.
+    """
+    path = export_path(fmt)
+    if fmt == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=READ_CHUNK_ROWS)
+        frames = (batch.to_pandas() for batch in batches)
+    else:
+        frames = pd.read_csv(
+            path,
+            dtype=dict.fromkeys(TEXT_COLUMNS, str),
+            float_precision="round_trip",
+            chunksize=READ_CHUNK_ROWS,
+        )
+    selected = (frame[frame["industry"] == industry] for frame in frames)
+    return export_chunks(fmt, (frame for frame in selected if len(frame)))
@@ -0,0 +1,104 @@
+"""Feature engineering shared by the prediction models."""
+import numpy as np
+import pandas as pd
+import ta
+
+DEFAULT_HORIZONS = [1, 7, 28]
+
+FEATURE_COLUMNS = [f"lag_{i}" for i in range(1, 6)] + [
+    "eps",
+    "pe",
+    "pb",
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_diff",
+    "stoch",
+    "stoch_signal",
+    "atr",
+]
+
+# Price columns the indicators need; Open, Volume and Adj Close are unused
+FEATURE_PRICE_COLUMNS = ["High", "Low", "Close"]
+
+
+def compact_prices(df: pd.DataFrame, columns=None) -> pd.DataFrame:
+    """Return only ``columns`` of a price frame, as float32 (Volume as int64)."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    columns = [c for c in (columns or FEATURE_PRICE_COLUMNS) if c in df.columns]
+    dtypes = {c: np.int64 if c == "Volume" else np.float32 for c in columns}
+    out = df[columns]
+    if "Volume" in dtypes:
+        out = out.fillna({"Volume": 0})
+    return out.astype(dtypes)
+
+
+def build_feature_frame(
+    df: pd.DataFrame, fund: pd.DataFrame, lean: bool = False
+) -> pd.DataFrame:
+    """Merge fundamentals into daily prices and add technical indicators.
+
+    With ``lean`` the prices are cut down to float32 High/Low/Close first and
+    only ``Close`` plus :data:`FEATURE_COLUMNS` are returned, as float32.
+    """
+    if lean:
+        df = compact_prices(df)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if isinstance(df.index, pd.MultiIndex):
+        df.index = df.index.get_level_values(0)
+    fund = fund.copy()  # may be shared with other threads; df is the caller's
+    if isinstance(fund.index, pd.MultiIndex):
+        fund.index = fund.index.get_level_values(0)
+
+    df.index = pd.to_datetime(df.index)
+    fund.index = pd.to_datetime(fund.index)
+
+    df.index.name = "date"
+    fund.index.name = "date"
+    df = df.reset_index()
+    fund = fund.reset_index()
+    if lean and not fund.empty:
+        fund = fund[["date"] + [c for c in ["eps", "pe", "pb"] if c in fund.columns]]
+    df = df.merge(fund, how="left", on="date")
+    for col in ["eps", "pe", "pb"]:
+        if col not in df.columns:
+            df[col] = 0
+    df.set_index("date", inplace=True)
+    if fund.empty:
+        df[["eps", "pe", "pb"]] = 0
+    else:
+        df[["eps", "pe", "pb"]] = df[["eps", "pe", "pb"]].ffill()
+
+    # テクニカル指標の計算
+    df["Return"] = df["Close"].pct_change()
+    for i in range(1, 6):
+        df[f"lag_{i}"] = df["Return"].shift(i)
+
+    df["rsi"] = ta.momentum.RSIIndicator(close=df["Close"]).rsi()
+    macd_indicator = ta.trend.MACD(close=df["Close"])
+    df["macd"] = macd_indicator.macd()
+    df["macd_signal"] = macd_indicator.macd_signal()
+    df["macd_diff"] = macd_indicator.macd_diff()
+    stoch_indicator = ta.momentum.StochasticOscillator(
+        high=df["High"], low=df["Low"], close=df["Close"]
+    )
+    df["stoch"] = stoch_indicator.stoch()
+    df["stoch_signal"] = stoch_indicator.stoch_signal()
+    df["atr"] = ta.volatility.AverageTrueRange(
+        high=df["High"], low=df["Low"], close=df["Close"]
+    ).average_true_range()
+    if lean:
+        df = df[["Close"] + FEATURE_COLUMNS].astype(np.float32)
+    return df
+
+
+def add_targets(df: pd.DataFrame, horizons: list[int]) -> pd.DataFrame:
+    """Add direction labels and realised forward returns for each horizon."""
+    for h in horizons:
+        df[f"target_{h}"] = (df["Close"].shift(-h) > df["Close"]).astype(np.int8)
+        df[f"future_return_{h}"] = (
+            df["Close"].pct_change(periods=h).shift(-h).astype(df["Close"].dtype)
+        )
+    return df
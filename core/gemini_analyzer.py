@@ -3,8 +3,17 @@ import google.generativeai as genai
 import logging
 
 api_key = os.environ.get("GEMINI_API_KEY")
+# Alternative REST endpoint, e.g. the load-test stand-in (core.stub_upstream)
+api_endpoint = os.environ.get("GEMINI_API_ENDPOINT")
 if api_key:
-    genai.configure(api_key=api_key)
+    if api_endpoint:
+        genai.configure(
+            api_key=api_key,
+            transport="rest",
+            client_options={"api_endpoint": api_endpoint},
+        )
+    else:
+        genai.configure(api_key=api_key)
     _model = genai.GenerativeModel("gemini-1.5-flash")
     _generation_config = genai.types.GenerationConfig(temperature=0.2)
 else:
@@ -15,18 +24,13 @@ else:
     _generation_config = None
 
 
-def generate_analyst_report(
-    ticker_name: str,
-    ticker_code: str,
-    latest_data_dict: list[dict],
-    predictions_dict: list[dict],
-) -> str:
-    """Return an investment report generated by Gemini."""
-    if not api_key or os.environ.get("PYTEST_CURRENT_TEST") or _model is None:
-        return "Gemini API key is not configured."
+def _gemini_disabled() -> bool:
+    return not api_key or bool(os.environ.get("PYTEST_CURRENT_TEST")) or _model is None
+
 
+def _report_prompt(latest_data_dict: list[dict], predictions_dict: list[dict]) -> str:
     # シンプル化：生データだけをプロンプトに渡して分析を依頼
-    prompt = f"""
+    return f"""
 次の株価データと予測データをもとに、日本語で簡潔な投資判断レポートをMarkdown形式で作成してください。
 
 【最新データ】
@@ -35,9 +39,54 @@ def generate_analyst_report(
 【モデル予測】
 {predictions_dict}
 """
+
+
+def generate_analyst_report(
+    ticker_name: str,
+    ticker_code: str,
+    latest_data_dict: list[dict],
+    predictions_dict: list[dict],
+) -> str:
+    """Return an investment report generated by Gemini."""
+    if _gemini_disabled():
+        return "Gemini API key is not configured."
+
+    prompt = _report_prompt(latest_data_dict, predictions_dict)
     try:
         resp = _model.generate_content(prompt, generation_config=_generation_config)
         return resp.text
     except Exception as e:
         logging.error(f"Gemini call failed: {e}", exc_info=True)
         return ""
+
+
+async def generate_analyst_report_async(
+    ticker_name: str,
+    ticker_code: str,
+    latest_data_dict: list[dict],
+    predictions_dict: list[dict],
+) -> str:
+    """Async :func:`generate_analyst_report` on Gemini's pooled aio channel."""
+    if _gemini_disabled():
+        return "Gemini API key is not configured."
+
+    if api_endpoint:
+        # The SDK's REST transport has no async client
+        from .aio import run_blocking
+
+        return await run_blocking(
+            generate_analyst_report,
+            ticker_name,
+            ticker_code,
+            latest_data_dict,
+            predictions_dict,
+        )
+    prompt = _report_prompt(latest_data_dict, predictions_dict)
+    try:
+        resp = await _model.generate_content_async(
+            prompt, generation_config=_generation_config
+        )
+        return resp.text
+    except Exception as e:
+        logging.error(f"Gemini call failed: {e}", exc_info=True)
+        return ""
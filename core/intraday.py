@@ -0,0 +1,254 @@
+"""Intraday bars kept in per-worker ring buffers.
+
+Each (symbol, interval) pair owns a fixed-size :class:`BarBuffer`. New bars
+are appended as they arrive and MA, MACD and RSI are advanced one bar at a
+time, so serving the latest chart or table never re-downloads the session.
+Indicator definitions match the ``ta`` package used for daily bars.
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .charts import render_line_chart
+from .market_calendar import TOKYO, data_can_change
+from .market_data import download
+
+INTRADAY_INTERVALS = {"1m": 60, "5m": 300}
+
+MA_WINDOWS = (5, 25)
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_WINDOW = 14
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+INDICATOR_FIELDS = tuple(f"ma{w}" for w in MA_WINDOWS) + (
+    "macd",
+    "macd_signal",
+    "rsi",
+)
+
+
+@dataclass(frozen=True)
+class IndicatorState:
+    """Running values needed to advance the indicators by one bar."""
+
+    count: int = 0
+    prev_close: float = np.nan
+    ma_sums: tuple = (0.0,) * len(MA_WINDOWS)
+    ema_fast: float = np.nan
+    ema_slow: float = np.nan
+    signal: float = np.nan
+    signal_count: int = 0
+    avg_gain: float = np.nan
+    avg_loss: float = np.nan
+
+
+def _ema(prev: float, value: float, alpha: float) -> float:
+    return value if np.isnan(prev) else alpha * value + (1 - alpha) * prev
+
+
+def advance(state: IndicatorState, close: float, leaving: tuple) -> tuple:
+    """Return ``(new_state, indicator_values)`` after one more close.
+
+    ``leaving`` holds, per MA window, the close that drops out of the window
+    (NaN while the window is still filling).
+    """
+    count = state.count + 1
+    ma_sums = tuple(
+        s + close - (0.0 if np.isnan(old) else old)
+        for s, old in zip(state.ma_sums, leaving)
+    )
+    mas = [s / w if count >= w else np.nan for s, w in zip(ma_sums, MA_WINDOWS)]
+
+    ema_fast = _ema(state.ema_fast, close, 2 / (MACD_FAST + 1))
+    ema_slow = _ema(state.ema_slow, close, 2 / (MACD_SLOW + 1))
+    macd = ema_fast - ema_slow if count >= MACD_SLOW else np.nan
+    signal, signal_count = state.signal, state.signal_count
+    if not np.isnan(macd):
+        signal = _ema(signal, macd, 2 / (MACD_SIGNAL + 1))
+        signal_count += 1
+    macd_signal = signal if signal_count >= MACD_SIGNAL else np.nan
+
+    # Like ``ta``, the first bar contributes a zero gain and loss
+    diff = 0.0 if np.isnan(state.prev_close) else close - state.prev_close
+    avg_gain = _ema(state.avg_gain, max(diff, 0.0), 1 / RSI_WINDOW)
+    avg_loss = _ema(state.avg_loss, max(-diff, 0.0), 1 / RSI_WINDOW)
+    rsi = np.nan
+    if count >= RSI_WINDOW:
+        rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+    new_state = replace(
+        state,
+        count=count,
+        prev_close=close,
+        ma_sums=ma_sums,
+        ema_fast=ema_fast,
+        ema_slow=ema_slow,
+        signal=signal,
+        signal_count=signal_count,
+        avg_gain=avg_gain,
+        avg_loss=avg_loss,
+    )
+    return new_state, (*mas, macd, macd_signal, rsi)
+
+
+class BarBuffer:
+    """Fixed-capacity ring buffer of bars and their indicators."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.data = np.full((capacity, len(BAR_FIELDS) + len(INDICATOR_FIELDS)), np.nan)
+        self.size = 0
+        self.head = 0  # slot of the oldest bar
+        self._state = IndicatorState()
+        self._state_before_last = IndicatorState()
+        self._recent_closes = []  # enough closes to roll the widest MA window
+        self.lock = threading.Lock()
+
+    @property
+    def last_timestamp(self) -> int | None:
+        if self.size == 0:
+            return None
+        return int(self.timestamps[(self.head + self.size - 1) % self.capacity])
+
+    def _leaving(self, closes: list[float]) -> tuple:
+        return tuple(
+            closes[-w - 1] if len(closes) > w else np.nan for w in MA_WINDOWS
+        )
+
+    def push(self, ts: int, bar: tuple) -> None:
+        """Append a bar, or replace the last one if ``ts`` is unchanged."""
+        last = self.last_timestamp
+        if last is not None and ts < last:
+            return
+        close = bar[BAR_FIELDS.index("close")]
+        if last is not None and ts == last:
+            self._recent_closes[-1] = close
+            slot = (self.head + self.size - 1) % self.capacity
+            state = self._state_before_last
+        else:
+            self._recent_closes.append(close)
+            del self._recent_closes[: -max(MA_WINDOWS) - 1]
+            if self.size < self.capacity:
+                slot = (self.head + self.size) % self.capacity
+                self.size += 1
+            else:
+                slot = self.head
+                self.head = (self.head + 1) % self.capacity
+            state = self._state
+            self._state_before_last = state
+
+        self._state, indicators = advance(
+            state, close, self._leaving(self._recent_closes)
+        )
+        self.timestamps[slot] = ts
+        self.data[slot] = (*bar, *indicators)
+
+    def extend(self, frame: pd.DataFrame) -> int:
+        """Push every row of an OHLCV frame; return how many were newer."""
+        before = self.last_timestamp
+        stamps = pd.to_datetime(frame.index).asi8 // 1_000_000_000
+        values = frame[["Open", "High", "Low", "Close", "Volume"]].to_numpy(float)
+        for ts, row in zip(stamps, values):
+            if not np.isnan(row[3]):
+                self.push(int(ts), tuple(row))
+        return int(np.sum(stamps > (before if before is not None else -1)))
+
+    def snapshot(self, bars: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(timestamps, data)`` for the newest ``bars`` in order."""
+        n = self.size if bars is None else min(bars, self.size)
+        order = (self.head + np.arange(self.size - n, self.size)) % self.capacity
+        return self.timestamps[order], self.data[order]
+
+
+_buffers: dict[tuple[str, str], BarBuffer] = {}
+_last_refresh: dict[tuple[str, str], float] = {}
+_registry_lock = threading.Lock()
+
+
+def get_buffer(symbol: str, interval: str) -> BarBuffer:
+    """Return this worker's buffer for ``symbol``, creating it if needed."""
+    key = (symbol, interval)
+    with _registry_lock:
+        if key not in _buffers:
+            _buffers[key] = BarBuffer(settings.INTRADAY_BUFFER_BARS)
+        return _buffers[key]
+
+
+def refresh(symbol: str, interval: str, now: datetime | None = None) -> BarBuffer:
+    """Pull only bars newer than the buffer's last one, at most once a bar.
+
+    An empty buffer is seeded with the recent sessions so the indicators
+    are warm; once the session's quotes have settled an already filled
+    buffer is served as is.
+    """
+    buffer = get_buffer(symbol, interval)
+    key = (symbol, interval)
+    with buffer.lock:
+        last = buffer.last_timestamp
+        if last is not None:
+            if not data_can_change(now):
+                return buffer
+            elapsed = time.monotonic() - _last_refresh.get(key, 0)
+            if elapsed < INTRADAY_INTERVALS[interval]:
+                return buffer
+            kwargs = {"start": pd.Timestamp(last, unit="s", tz="UTC")}
+        else:
+            kwargs = {"period": "5d"}
+        df = download(
+            symbol, interval=interval, auto_adjust=False, progress=False, **kwargs
+        )
+        _last_refresh[key] = time.monotonic()
+        if df is not None and not df.empty:
+            if isinstance(df.columns, pd.MultiIndex):
+                df.columns = df.columns.get_level_values(0)
+            buffer.extend(df)
+    return buffer
+
+
+def buffer_payload(buffer: BarBuffer, bars: int) -> dict:
+    """Return the newest bars and indicators as column-oriented JSON."""
+    with buffer.lock:
+        stamps, data = buffer.snapshot(bars)
+    columns = {"t": stamps.tolist()}
+    for i, name in enumerate(BAR_FIELDS + INDICATOR_FIELDS):
+        col = np.round(data[:, i], 4)
+        columns[name] = [None if np.isnan(v) else float(v) for v in col]
+    return columns
+
+
+def latest_records(buffer: BarBuffer, rows: int = 5) -> list[dict]:
+    """Return the newest bars as table records with Tokyo timestamps."""
+    with buffer.lock:
+        stamps, data = buffer.snapshot(rows)
+    times = pd.to_datetime(stamps, unit="s", utc=True).tz_convert(TOKYO)
+    fields = ("close", "volume") + INDICATOR_FIELDS
+    index = [(BAR_FIELDS + INDICATOR_FIELDS).index(f) for f in fields]
+    return [
+        {
+            "time": t.strftime("%Y-%m-%d %H:%M"),
+            **{f: None if np.isnan(v) else round(float(v), 2)
+               for f, v in zip(fields, row[index])},
+        }
+        for t, row in zip(times, data)
+    ]
+
+
+def render_intraday_chart(
+    buffer: BarBuffer, bars: int, title: str, thumbnail: bool = False
+) -> str | None:
+    """Return a base64 PNG of close and moving averages from the buffer."""
+    with buffer.lock:
+        stamps, data = buffer.snapshot(bars)
+    if len(stamps) == 0:
+        return None
+    dates = pd.to_datetime(stamps, unit="s", utc=True).tz_convert(TOKYO)
+    names = BAR_FIELDS + INDICATOR_FIELDS
+    series = [("Close", data[:, names.index("close")])] + [
+        (f"MA{w}", data[:, names.index(f"ma{w}")]) for w in MA_WINDOWS
+    ]
+    return render_line_chart(dates, series, title=title, thumbnail=thumbnail)
@@ -0,0 +1,95 @@
+"""Concurrent HTTP load driver behind ``python manage.py load_test``.
+
+:func:`run_load` sends a fixed number of requests per endpoint at a given
+concurrency and reports throughput and latency percentiles. Tickers are
+rotated so both cold and cached paths are exercised.
+"""
+import asyncio
+import time
+from itertools import cycle
+
+import numpy as np
+import pandas as pd
+from curl_cffi.requests import AsyncSession
+from django.urls import reverse
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def endpoint_paths(name: str, codes: list[str]) -> list[str]:
+    """Return one request path per ticker for endpoint ``name``."""
+    main = reverse("main_analysis")
+    templates = {
+        "main": lambda code: f"{main}?ticker1={code}&stream=0",
+        "main-stream": lambda code: f"{main}?ticker1={code}&stream=1",
+        "api-analysis": lambda code: reverse("api-analysis", args=[code]),
+        "ticker-search": lambda code: f"{reverse('api-ticker-search')}?q={code}",
+        "industries": lambda code: reverse("api-industries"),
+    }
+    return [templates[name](code) for code in codes]
+
+
+ENDPOINTS = ("main", "main-stream", "api-analysis", "ticker-search", "industries")
+
+
+async def _drive(
+    base_url: str, paths: list[str], requests: int, concurrency: int, timeout: float
+) -> tuple[np.ndarray, int, float]:
+    """Return latencies in ms, the error count and the wall time in seconds."""
+    latencies = []
+    errors = 0
+    queue = cycle(paths)
+    remaining = requests
+
+    async def worker(session):
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            path = next(queue)
+            start = time.perf_counter()
+            try:
+                response = await session.get(base_url + path, timeout=timeout)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    async with AsyncSession(max_clients=concurrency) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return np.array(latencies), errors, wall
+
+
+def run_load(
+    base_url: str,
+    endpoints: list[str],
+    codes: list[str],
+    requests: int,
+    concurrency: int,
+    timeout: float = 120.0,
+) -> pd.DataFrame:
+    """Load each endpoint in turn and return one row of statistics per endpoint."""
+    rows = []
+    for name in endpoints:
+        latencies, errors, wall = asyncio.run(
+            _drive(
+                base_url.rstrip("/"),
+                endpoint_paths(name, codes),
+                requests,
+                concurrency,
+                timeout,
+            )
+        )
+        row = {
+            "endpoint": name,
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": len(latencies) / wall if wall else float("nan"),
+        }
+        for p, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+            row[f"p{p}_ms"] = value
+        row["max_ms"] = latencies.max()
+        rows.append(row)
+    return pd.DataFrame(rows)
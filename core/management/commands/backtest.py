@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backtest import backtest_universe, load_universe
+from core.features import DEFAULT_HORIZONS
+
+
+class Command(BaseCommand):
+    help = "Walk-forward backtest of the UP/DOWN prediction signals"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codes", nargs="*", help="Ticker codes, e.g. 7203 (default: all)"
+        )
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument(
+            "--prices-dir", help="Directory of <code>.csv OHLCV files (offline)"
+        )
+        source.add_argument("--csv", help="Single OHLCV CSV file (offline)")
+        parser.add_argument("--period", default="5y")
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument(
+            "--horizons", type=int, nargs="+", default=DEFAULT_HORIZONS
+        )
+        parser.add_argument("--min-train", type=int, default=250)
+        parser.add_argument(
+            "--step", type=int, default=20, help="Bars between model refits"
+        )
+        parser.add_argument(
+            "--long-only", action="store_true", help="Stay flat on DOWN signals"
+        )
+        parser.add_argument("--output", help="Write the metrics table to CSV")
+
+    def handle(self, *args, **options):
+        # The backtest models use price features only
+        loaded = load_universe({**options, "skip_fundamentals": True})
+        if not loaded:
+            raise CommandError("No price data found.")
+
+        results = backtest_universe(
+            {code: prices for code, (prices, _) in loaded.items()},
+            options["horizons"],
+            min_train=options["min_train"],
+            step=options["step"],
+            allow_short=not options["long_only"],
+        )
+        if options["output"]:
+            results.to_csv(options["output"], index=False)
+        self.stdout.write(results.round(4).to_string(index=False))
@@ -0,0 +1,78 @@
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.market_data import download_histories
+from core.models import Ticker
+from core.similarity import build_similarity_index, save_similarity_index
+from core.tickers import symbol_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the similar-stocks index: each ticker's most return-correlated "
+        "peers within its industry and across the market"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", default=settings.SIMILARITY_PERIOD)
+        parser.add_argument("--k", type=int, default=settings.SIMILAR_TICKERS_K)
+        parser.add_argument(
+            "--min-days", type=int, default=settings.SIMILARITY_MIN_DAYS
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Number of tickers per batched price download",
+        )
+        parser.add_argument(
+            "--block-size",
+            type=int,
+            default=512,
+            help="Tickers per block of the correlation product",
+        )
+        parser.add_argument("--output", default=None)
+
+    def handle(self, *args, **options):
+        tickers = list(
+            Ticker.objects.order_by("code").values_list("code", "industry_id", "name")
+        )
+        if not tickers:
+            self.stderr.write("No tickers found. Run load_tickers first.")
+            return
+        industries = {code: industry for code, industry, _ in tickers}
+        names = {code: name for code, _, name in tickers}
+
+        closes = {}
+        chunk_size = options["chunk_size"]
+        for start in range(0, len(tickers), chunk_size):
+            codes = [code for code, _, _ in tickers[start:start + chunk_size]]
+            histories = download_histories(
+                [symbol_for(code) for code in codes], options["period"]
+            )
+            for code in codes:
+                df = histories.get(symbol_for(code))
+                if df is not None and "Close" in df:
+                    closes[code] = df["Close"].astype("float64")
+            self.stdout.write(
+                f"Downloaded {len(closes)} / {start + len(codes)} tickers"
+            )
+
+        if not closes:
+            self.stderr.write("No price data available.")
+            return
+        artifact = build_similarity_index(
+            pd.DataFrame(closes).sort_index(),
+            industries,
+            names,
+            options["k"],
+            options["min_days"],
+            options["block_size"],
+        )
+        path = save_similarity_index(artifact, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Similarity index built for {len(artifact['peers'])} tickers: {path}"
+            )
+        )
@@ -0,0 +1,83 @@
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import (
+    EXPORT_FORMATS,
+    export_chunks,
+    export_frames,
+    export_path,
+    parquet_available,
+    universe,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the latest predictions, indicators and fundamentals of every "
+        "ticker as CSV or Parquet, chunk by chunk; /api/v1/export/ serves the "
+        "file written to EXPORT_DIR"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output",
+            nargs="?",
+            default=None,
+            help="Output file, or - for stdout (default: EXPORT_DIR/universe.<format>)",
+        )
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default=None)
+        parser.add_argument("--industry", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument("--workers", type=int, default=None)
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        fmt = options["format"] or (
+            "parquet" if output and output.endswith(".parquet") else "csv"
+        )
+        if output is None:
+            output = str(export_path(fmt))
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        if fmt == "parquet" and not parquet_available():
+            raise CommandError("Parquet export requires pyarrow.")
+        tickers = universe(options["industry"])
+        if not tickers:
+            raise CommandError("No tickers found. Run load_tickers first.")
+
+        rows = 0
+
+        def counted(frames):
+            nonlocal rows
+            for frame in frames:
+                rows += len(frame)
+                yield frame
+
+        frames = export_frames(
+            tickers,
+            options["chunk_size"] or settings.EXPORT_CHUNK_SIZE,
+            options["workers"] or settings.EXPORT_WORKERS,
+        )
+        # Files are replaced atomically so the endpoint never serves half of one
+        tmp_path = f"{output}.tmp"
+        stream = sys.stdout.buffer if output == "-" else open(tmp_path, "wb")
+        try:
+            for chunk in export_chunks(fmt, counted(frames)):
+                stream.write(chunk)
+                stream.flush()
+        except BaseException:
+            if stream is not sys.stdout.buffer:
+                stream.close()
+                os.remove(tmp_path)
+            raise
+        if stream is not sys.stdout.buffer:
+            stream.close()
+            os.replace(tmp_path, output)
+        if output != "-":
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Exported {rows} of {len(tickers)} tickers to {output}"
+                )
+            )
@@ -0,0 +1,124 @@
+import os
+import subprocess
+import sys
+import time
+
+from curl_cffi import requests as curl_requests
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import ENDPOINTS, run_load
+from core.stub_upstream import start_stub_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the app against a local Yahoo Finance/Gemini stand-in and "
+        "report requests per second and latency percentiles per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS)
+        )
+        parser.add_argument(
+            "--tickers", nargs="+", default=["7203", "6758", "9984", "8306", "6861"]
+        )
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per endpoint"
+        )
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=200,
+            help="Artificial latency of every stand-in response",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1, help="uvicorn worker processes"
+        )
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--target",
+            help="Drive an already running server instead of starting one",
+        )
+        parser.add_argument(
+            "--stub-only",
+            action="store_true",
+            help="Only run the stand-in (on --stub-port) until interrupted",
+        )
+        parser.add_argument("--stub-port", type=int, default=0)
+        parser.add_argument("--output", help="Write the results table to CSV")
+
+    def handle(self, *args, **options):
+        stub, stub_url = start_stub_server(
+            options["latency_ms"] / 1000, port=options["stub_port"]
+        )
+        if options["stub_only"]:
+            self.stdout.write(
+                f"Stand-in listening on {stub_url}; start the app with "
+                f"YAHOO_API_ENDPOINT={stub_url} GEMINI_API_ENDPOINT={stub_url} "
+                "GEMINI_API_KEY=stub"
+            )
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                return
+
+        server = None
+        base_url = options["target"]
+        if base_url is None:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            server = self._start_server(stub_url, options)
+        try:
+            self._wait_until_up(base_url, server)
+            results = run_load(
+                base_url,
+                options["endpoints"],
+                options["tickers"],
+                options["requests"],
+                options["concurrency"],
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            stub.shutdown()
+
+        if options["output"]:
+            results.to_csv(options["output"], index=False)
+        self.stdout.write(results.round(1).to_string(index=False))
+
+    def _start_server(self, stub_url, options):
+        env = {
+            **os.environ,
+            "YAHOO_API_ENDPOINT": stub_url,
+            "GEMINI_API_ENDPOINT": stub_url,
+            "GEMINI_API_KEY": "stub",
+        }
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "myapp.asgi:application",
+            "--port",
+            str(options["port"]),
+            "--workers",
+            str(options["workers"]),
+            "--log-level",
+            "warning",
+        ]
+        return subprocess.Popen(command, env=env)
+
+    def _wait_until_up(self, base_url, server, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise CommandError("The app server exited during startup.")
+            try:
+                if curl_requests.get(f"{base_url}/health/", timeout=2).ok:
+                    return
+            except curl_requests.RequestsError:
+                pass
+            time.sleep(0.5)
+        raise CommandError(f"{base_url} did not come up within {timeout}s.")
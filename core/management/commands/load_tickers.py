@@ -5,6 +5,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from core.models import Industry, Ticker
+from core.tickers import reset_ticker_table
 
 
 class Command(BaseCommand):
@@ -24,4 +25,5 @@ class Command(BaseCommand):
                 code=code,
                 defaults={"name": name, "industry": industry},
             )
+        reset_ticker_table()
         self.stdout.write(self.style.SUCCESS("Tickers loaded"))
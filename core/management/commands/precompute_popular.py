@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analysis import _load_fundamentals
+from core.features import DEFAULT_HORIZONS
+from core.market_calendar import data_can_change
+from core.market_data import download_histories
+from core.model_store import refresh_ticker_model
+from core.popularity import popular_tickers
+from core.snapshots import save_snapshot
+from core.tickers import normalize_code, symbol_for
+from core.views import fetch_data
+
+
+def _precompute(code, prices):
+    """Refresh the stored model if used, then compute the full page."""
+    if settings.PREDICTION_MODEL == "stored":
+        refresh_ticker_model(
+            code, prices, _load_fundamentals(symbol_for(code)), DEFAULT_HORIZONS
+        )
+    data = fetch_data(code, prices)
+    if not data.get("chart_data"):
+        raise RuntimeError(data.get("warning") or "no chart")
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute prices, models, charts and Gemini reports for the most "
+        "requested tickers so the next session's first views hit a snapshot"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codes", nargs="*", help="Ticker codes (default: most requested)"
+        )
+        parser.add_argument(
+            "--top", type=int, default=None, help="Number of tickers to warm"
+        )
+        parser.add_argument(
+            "--days", type=int, default=None, help="Popularity window in days"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Parallel worker threads"
+        )
+        parser.add_argument("--chunk-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if data_can_change():
+            raise CommandError(
+                "Prices are still moving; run this after the close has settled."
+            )
+        codes = [normalize_code(c) for c in options["codes"]] or popular_tickers(
+            options["top"] or settings.PRECOMPUTE_TOP_N, options["days"]
+        )
+        if not codes:
+            raise CommandError("No requested tickers to precompute.")
+
+        chunk_size = options["chunk_size"]
+        workers = options["workers"] or settings.PRECOMPUTE_WORKERS
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for start in range(0, len(codes), chunk_size):
+                chunk = codes[start:start + chunk_size]
+                histories = download_histories([symbol_for(c) for c in chunk], "2y")
+                for code in chunk:
+                    prices = histories.get(symbol_for(code))
+                    if prices is None or len(prices) < 30:
+                        self.stderr.write(f"{code}: not enough price data")
+                        continue
+                    futures[pool.submit(_precompute, code, prices)] = code
+
+            for future in as_completed(futures):
+                code = futures[future]
+                try:
+                    data = future.result()
+                except Exception as exc:
+                    self.stderr.write(f"{code}: {exc}")
+                    continue
+                # Written from this thread so workers never hold a connection
+                save_snapshot(code, data)
+                done += 1
+                self.stdout.write(f"{code}: precomputed")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Precomputed {done} of {len(codes)} tickers")
+        )
@@ -0,0 +1,77 @@
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from core.analysis import _load_fundamentals
+from core.features import DEFAULT_HORIZONS, add_targets, build_feature_frame
+from core.market_data import download_histories
+from core.models import Ticker
+from core.panel_model import save_panel_model, stack_panel, train_panel_model
+from core.tickers import symbol_for
+
+
+class Command(BaseCommand):
+    help = "Train the cross-sectional panel model on the whole Ticker universe"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", default="2y")
+        parser.add_argument(
+            "--horizons",
+            type=int,
+            nargs="+",
+            default=DEFAULT_HORIZONS,
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Number of tickers per batched price download",
+        )
+        parser.add_argument(
+            "--skip-fundamentals",
+            action="store_true",
+            help="Use zero EPS/PE/PB instead of fetching fundamentals per ticker",
+        )
+        parser.add_argument("--output", default=None)
+
+    def handle(self, *args, **options):
+        horizons = options["horizons"]
+        tickers = list(
+            Ticker.objects.order_by("code").values_list("code", "industry_id")
+        )
+        if not tickers:
+            self.stderr.write("No tickers found. Run load_tickers first.")
+            return
+        ticker_ids = {code: i for i, (code, _) in enumerate(tickers)}
+        sector_ids = dict(tickers)
+
+        frames = {}
+        chunk_size = options["chunk_size"]
+        for start in range(0, len(tickers), chunk_size):
+            codes = [code for code, _ in tickers[start:start + chunk_size]]
+            histories = download_histories(
+                [symbol_for(code) for code in codes], options["period"]
+            )
+            for code in codes:
+                df = histories.get(symbol_for(code))
+                if df is None or len(df) < 30:
+                    continue
+                if options["skip_fundamentals"]:
+                    fund = pd.DataFrame()
+                else:
+                    fund = _load_fundamentals(symbol_for(code))
+                # The panel is float32 anyway, so keep every frame lean
+                frames[code] = add_targets(
+                    build_feature_frame(df, fund, lean=True), horizons
+                )
+            self.stdout.write(f"Prepared {len(frames)} / {start + len(codes)} tickers")
+
+        panel = stack_panel(frames, ticker_ids, sector_ids, horizons)
+        if panel.empty:
+            self.stderr.write("No training rows available.")
+            return
+
+        artifact = train_panel_model(panel, horizons, ticker_ids, sector_ids)
+        path = save_panel_model(artifact, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Panel model trained on {len(panel)} rows: {path}")
+        )
@@ -0,0 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analysis import _load_fundamentals
+from core.backtest import load_universe
+from core.features import (
+    DEFAULT_HORIZONS,
+    FEATURE_COLUMNS,
+    add_targets,
+    build_feature_frame,
+)
+from core.model_store import labeled_rows
+from core.tuning import MODEL_PARAMS, save_tuned_params, tune_series
+from core.tickers import symbol_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Tune LightGBM parameters and tree counts per ticker and horizon with "
+        "time-series cross-validation and early stopping"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codes", nargs="*", help="Ticker codes (default: whole Ticker table)"
+        )
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument(
+            "--prices-dir", help="Directory of <code>.csv OHLCV files (offline)"
+        )
+        source.add_argument("--csv", help="Single OHLCV CSV file (offline)")
+        parser.add_argument("--period", default="2y")
+        parser.add_argument(
+            "--horizons", type=int, nargs="+", default=DEFAULT_HORIZONS
+        )
+        parser.add_argument("--splits", type=int, default=5)
+        parser.add_argument(
+            "--max-trees", type=int, default=500, help="Upper bound on trees"
+        )
+        parser.add_argument(
+            "--early-stopping",
+            type=int,
+            default=20,
+            help="Rounds without validation improvement before stopping",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Parallel tuning processes"
+        )
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument(
+            "--skip-fundamentals",
+            action="store_true",
+            help="Use zero EPS/PE/PB instead of fetching fundamentals per ticker",
+        )
+        parser.add_argument("--output", default=None)
+
+    def handle(self, *args, **options):
+        horizons = options["horizons"]
+        universe = load_universe(options)
+        if not universe:
+            raise CommandError("No price data found.")
+
+        # One LightGBM thread per job; the pool provides the parallelism
+        base_params = {**MODEL_PARAMS, "n_jobs": 1}
+        results = {}
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = {}
+            for code, (prices, fetch) in universe.items():
+                if len(prices) < 30:
+                    continue
+                fund = _load_fundamentals(symbol_for(code)) if fetch else pd.DataFrame()
+                df = add_targets(
+                    build_feature_frame(prices.copy(), fund, lean=True), horizons
+                )
+                for h in horizons:
+                    # The last h rows have no label yet; dropping on the
+                    # forward return keeps them out of the validation folds
+                    data = labeled_rows(df, h)
+                    if len(data) <= options["splits"] + h:
+                        continue
+                    future = pool.submit(
+                        tune_series,
+                        data[FEATURE_COLUMNS].to_numpy(),
+                        data[f"target_{h}"].to_numpy(),
+                        h,
+                        base_params,
+                        n_splits=options["splits"],
+                        max_trees=options["max_trees"],
+                        stopping_rounds=options["early_stopping"],
+                    )
+                    futures[future] = (code, h)
+
+            for future in as_completed(futures):
+                code, h = futures[future]
+                best = future.result()
+                if best is None:
+                    continue
+                results.setdefault(code, {})[h] = best
+                self.stdout.write(
+                    f"{code} h={h}: {best['n_estimators']} trees "
+                    f"{best['params']} logloss={best['cv_logloss']:.4f}"
+                )
+
+        if not results:
+            raise CommandError("Not enough data to tune any ticker.")
+        path = save_tuned_params(results, options["output"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved tuned parameters for {len(results)} tickers to {path}"
+            )
+        )
@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analysis import _load_fundamentals
+from core.backtest import load_universe
+from core.features import DEFAULT_HORIZONS
+from core.model_store import refresh_ticker_model
+from core.tickers import symbol_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the stored per-ticker models up to date: continue boosting on "
+        "newly labeled rows, rebuilding on schedule or when drift is detected"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codes", nargs="*", help="Ticker codes (default: whole Ticker table)"
+        )
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument(
+            "--prices-dir", help="Directory of <code>.csv OHLCV files (offline)"
+        )
+        source.add_argument("--csv", help="Single OHLCV CSV file (offline)")
+        parser.add_argument("--period", default="2y")
+        parser.add_argument(
+            "--horizons", type=int, nargs="+", default=DEFAULT_HORIZONS
+        )
+        parser.add_argument(
+            "--full", action="store_true", help="Rebuild every model from scratch"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Parallel update processes"
+        )
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument(
+            "--skip-fundamentals",
+            action="store_true",
+            help="Use zero EPS/PE/PB instead of fetching fundamentals per ticker",
+        )
+
+    def handle(self, *args, **options):
+        horizons = options["horizons"]
+        universe = load_universe(options)
+        if not universe:
+            raise CommandError("No price data found.")
+
+        counts = {}
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = {}
+            for code, (prices, fetch) in universe.items():
+                if len(prices) < 30:
+                    continue
+                fund = _load_fundamentals(symbol_for(code)) if fetch else pd.DataFrame()
+                future = pool.submit(
+                    refresh_ticker_model, code, prices, fund, horizons, options["full"]
+                )
+                futures[future] = code
+
+            for future in as_completed(futures):
+                code = futures[future]
+                actions = future.result()
+                for action in actions.values():
+                    counts[action] = counts.get(action, 0) + 1
+                summary = " ".join(f"h={h}:{a}" for h, a in actions.items())
+                self.stdout.write(f"{code} {summary}")
+
+        if not counts:
+            raise CommandError("Not enough data to update any ticker.")
+        summary = ", ".join(f"{n} {action}" for action, n in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f"Updated models: {summary}"))
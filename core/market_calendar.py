@@ -0,0 +1,188 @@
+"""Tokyo Stock Exchange calendar: sessions, holidays and data-change times.
+
+Daily prices can only change while a session is open, plus the delay with
+which quotes reach Yahoo Finance. :func:`next_data_change` returns the next
+moment new data can appear, and :func:`cache_timeout` turns it into a cache
+lifetime, so nothing is refetched on nights, weekends or holidays.
+
+Japanese national holidays are derived from the Public Holiday Act rules
+(equinox formula valid 1980-2099), and the exchange is also closed from
+31 December to 3 January. One-off closures and morning-only sessions can be
+configured with ``TSE_EXTRA_HOLIDAYS`` and ``TSE_HALF_DAYS``.
+"""
+from datetime import date, datetime, time as dtime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+TOKYO = ZoneInfo("Asia/Tokyo")
+# Morning and afternoon sessions (the afternoon closes at 15:30 since
+# November 2024)
+TSE_SESSIONS = [(dtime(9, 0), dtime(11, 30)), (dtime(12, 30), dtime(15, 30))]
+
+# Holidays moved for the Tokyo Olympics
+_MOVED_HOLIDAYS = {
+    2020: {(7, 23): "海の日", (7, 24): "スポーツの日", (8, 10): "山の日"},
+    2021: {(7, 22): "海の日", (7, 23): "スポーツの日", (8, 8): "山の日"},
+}
+# One-off holidays for the 2019 imperial succession
+_SPECIAL_HOLIDAYS = {
+    2019: {
+        (4, 30): "国民の休日",
+        (5, 1): "即位の日",
+        (5, 2): "国民の休日",
+        (10, 22): "即位礼正殿の儀",
+    },
+}
+
+
+def _nth_monday(year: int, month: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(7 - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _equinox_day(year: int, base: float) -> int:
+    return int(base + 0.242194 * (year - 1980) - (year - 1980) // 4)
+
+
+@lru_cache(maxsize=None)
+def national_holidays(year: int) -> dict[date, str]:
+    """Return Japan's national holidays for ``year``, including substitutes."""
+    days = {
+        date(year, 1, 1): "元日",
+        _nth_monday(year, 1, 2): "成人の日",
+        date(year, 2, 11): "建国記念の日",
+        date(year, 3, _equinox_day(year, 20.8431)): "春分の日",
+        date(year, 4, 29): "昭和の日",
+        date(year, 5, 3): "憲法記念日",
+        date(year, 5, 4): "みどりの日",
+        date(year, 5, 5): "こどもの日",
+        _nth_monday(year, 7, 3): "海の日",
+        date(year, 8, 11): "山の日",
+        _nth_monday(year, 9, 3): "敬老の日",
+        date(year, 9, _equinox_day(year, 23.2488)): "秋分の日",
+        _nth_monday(year, 10, 2): "スポーツの日",
+        date(year, 11, 3): "文化の日",
+        date(year, 11, 23): "勤労感謝の日",
+    }
+    if year >= 2020:
+        days[date(year, 2, 23)] = "天皇誕生日"
+    elif year <= 2018:
+        days[date(year, 12, 23)] = "天皇誕生日"
+    moved = _MOVED_HOLIDAYS.get(year, {})
+    days = {d: n for d, n in days.items() if n not in moved.values()}
+    for (month, day), name in {**moved, **_SPECIAL_HOLIDAYS.get(year, {})}.items():
+        days[date(year, month, day)] = name
+
+    # A weekday between two holidays is a holiday too (国民の休日)
+    for day in sorted(days):
+        between = day + timedelta(days=1)
+        if between not in days and between + timedelta(days=1) in days:
+            if between.weekday() != 6:
+                days[between] = "国民の休日"
+    # A holiday on a Sunday moves to the next day that is not a holiday
+    for day in sorted(days):
+        if day.weekday() == 6:
+            substitute = day + timedelta(days=1)
+            while substitute in days:
+                substitute += timedelta(days=1)
+            days[substitute] = "振替休日"
+    return days
+
+
+def _configured_dates(name: str) -> set[date]:
+    return {date.fromisoformat(str(d)) for d in getattr(settings, name, [])}
+
+
+def is_trading_day(day: date) -> bool:
+    """Return True when the exchange opens on ``day``."""
+    if day.weekday() >= 5 or (day.month, day.day) in ((12, 31), (1, 2), (1, 3)):
+        return False
+    if day in national_holidays(day.year):
+        return False
+    return day not in _configured_dates("TSE_EXTRA_HOLIDAYS")
+
+
+def sessions(day: date) -> list[tuple[datetime, datetime]]:
+    """Return the ``(open, close)`` times of ``day``'s sessions in Tokyo time."""
+    if not is_trading_day(day):
+        return []
+    windows = TSE_SESSIONS
+    if day in _configured_dates("TSE_HALF_DAYS"):
+        windows = TSE_SESSIONS[:1]
+    return [
+        (datetime.combine(day, start, TOKYO), datetime.combine(day, end, TOKYO))
+        for start, end in windows
+    ]
+
+
+def _tokyo(now: datetime | None) -> datetime:
+    return (now or datetime.now(TOKYO)).astimezone(TOKYO)
+
+
+def is_trading_hours(now: datetime | None = None) -> bool:
+    """Return True while a TSE session is open."""
+    now = _tokyo(now)
+    return any(start <= now <= end for start, end in sessions(now.date()))
+
+
+def next_session_open(now: datetime | None = None) -> datetime:
+    """Return when the next TSE session opens."""
+    now = _tokyo(now)
+    day = now.date()
+    while True:
+        for start, _ in sessions(day):
+            if start > now:
+                return start
+        day += timedelta(days=1)
+
+
+def _data_windows(day: date) -> list[tuple[datetime, datetime]]:
+    """Return the periods of ``day`` during which published prices can move."""
+    delay = timedelta(minutes=settings.TSE_DATA_DELAY_MINUTES)
+    return [(start, end + delay) for start, end in sessions(day)]
+
+
+def data_can_change(now: datetime | None = None) -> bool:
+    """Return True while a session, or its quote delay, is running."""
+    now = _tokyo(now)
+    return any(
+        start <= now <= end
+        for day in (now.date() - timedelta(days=1), now.date())
+        for start, end in _data_windows(day)
+    )
+
+
+def next_data_change(now: datetime | None = None) -> datetime:
+    """Return the next time a ticker's daily data can change (``now`` if it can)."""
+    now = _tokyo(now)
+    if data_can_change(now):
+        return now
+    return next_session_open(now)
+
+
+def changed_between(start: datetime, end: datetime | None = None) -> bool:
+    """Return True if prices could have changed between ``start`` and ``end``."""
+    start, end = _tokyo(start), _tokyo(end)
+    if end - start > timedelta(days=14):
+        return True
+    day = start.date() - timedelta(days=1)
+    while day <= end.date():
+        if any(s < end and start < e for s, e in _data_windows(day)):
+            return True
+        day += timedelta(days=1)
+    return False
+
+
+def cache_timeout(active_seconds: int, now: datetime | None = None) -> int:
+    """Return a cache lifetime that lasts until the data can next change.
+
+    While prices can move the fixed ``active_seconds`` is used; otherwise
+    the entry lives until the next session opens.
+    """
+    now = _tokyo(now)
+    change = next_data_change(now)
+    if change <= now:
+        return active_seconds
+    return max(1, int((change - now).total_seconds()))
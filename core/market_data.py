@@ -0,0 +1,130 @@
+"""Price downloads shared by the analysis, API and batch paths."""
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+import pandas as pd
+import yfinance as yf
+from curl_cffi import requests as curl_requests
+
+from .single_flight import single_flight
+
+# Column layout of every cached daily history, whichever path fetched it
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+# yfinance releases without per-call download state keep the results in
+# module globals, so concurrent yf.download calls can mix up tickers
+DOWNLOAD_IS_THREAD_SAFE = hasattr(getattr(yf, "multi", None), "_DownloadCtx")
+_download_lock = threading.Lock()
+# Set by route_yahoo_to; yf.download installs a fresh session on every call
+# unless it is given one
+_yahoo_session = None
+
+
+class _RoutedSession(curl_requests.Session):
+    """Session sending every request for a Yahoo host to ``endpoint``."""
+
+    def __init__(self, endpoint: str, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = urlsplit(endpoint)
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        if (parts.hostname or "").endswith("yahoo.com"):
+            url = urlunsplit(
+                parts._replace(
+                    scheme=self.endpoint.scheme, netloc=self.endpoint.netloc
+                )
+            )
+        return super().request(method, url, *args, **kwargs)
+
+
+def route_yahoo_to(endpoint: str) -> None:
+    """Send all yfinance traffic of this process to ``endpoint``.
+
+    Used with ``YAHOO_API_ENDPOINT`` to run against the load-test stand-in
+    (:mod:`core.stub_upstream`).
+    """
+    global _yahoo_session
+    _yahoo_session = _RoutedSession(endpoint, impersonate="chrome")
+    yf.data.YfData(session=_yahoo_session)
+
+
+def yahoo_ticker(symbol: str) -> yf.Ticker:
+    """Return ``yf.Ticker(symbol)`` on the routed session, if any."""
+    return yf.Ticker(symbol, session=_yahoo_session)
+
+
+def _download(tickers, kwargs) -> pd.DataFrame:
+    if _yahoo_session is not None:
+        kwargs = {**kwargs, "session": _yahoo_session}
+    if DOWNLOAD_IS_THREAD_SAFE:
+        return yf.download(tickers, **kwargs)
+    with _download_lock:
+        return yf.download(tickers, **kwargs)
+
+
+def download(tickers, **kwargs) -> pd.DataFrame:
+    """Call ``yf.download``, serialised on yfinance versions that need it.
+
+    Identical concurrent downloads share a single upstream request (see
+    :mod:`core.single_flight`); single-symbol downloads are shared with
+    other workers too, batches only within this worker.
+    """
+    key = f"download:{tickers!r}:{sorted(kwargs.items())!r}"
+    return single_flight(
+        key,
+        lambda: _download(tickers, kwargs),
+        across_workers=isinstance(tickers, str),
+    )
+
+
+def price_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return one ticker's download with flat :data:`PRICE_COLUMNS`.
+
+    ``yf.download`` labels single-ticker columns with a (price, ticker)
+    MultiIndex whose order varies between releases, so columns are picked
+    by name rather than position.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    if isinstance(df.columns, pd.MultiIndex):
+        level = next(
+            i for i, names in enumerate(df.columns.levels) if "Close" in names
+        )
+        df = df.set_axis(df.columns.get_level_values(level), axis=1)
+    if "Adj Close" not in df.columns:
+        df = df.assign(**{"Adj Close": df["Close"]})
+    return df[PRICE_COLUMNS]
+
+
+def download_histories(
+    symbols: list[str], period: str, interval: str = "1d"
+) -> dict[str, pd.DataFrame]:
+    """Return OHLCV frames keyed by symbol from one batched download.
+
+    Symbols without any bars are omitted from the result.
+    """
+    if not symbols:
+        return {}
+    df = download(
+        symbols,
+        period=period,
+        interval=interval,
+        auto_adjust=False,
+        group_by="column",
+        progress=False,
+    )
+    if df is None or df.empty:
+        return {}
+
+    if isinstance(df.columns, pd.MultiIndex):
+        present = set(df.columns.get_level_values(1))
+        frames = {s: df.xs(s, axis=1, level=1) for s in symbols if s in present}
+    else:
+        frames = {symbols[0]: df} if len(symbols) == 1 else {}
+
+    histories = {}
+    for symbol, frame in frames.items():
+        frame = frame.dropna(how="all")
+        if not frame.empty:
+            histories[symbol] = frame.copy()
+    return histories
@@ -0,0 +1,70 @@
+"""Request middleware."""
+import logging
+import threading
+import tracemalloc
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger("core.memory")
+
+
+class PeakMemoryMiddleware:
+    """Report the peak Python allocation while each request was handled.
+
+    Uses :mod:`tracemalloc`, whose peak is process-wide: when requests
+    overlap in one worker the reported peak covers all of them. For streamed
+    responses only the work done before the first chunk is counted. The
+    middleware runs natively on both the WSGI and ASGI paths, so async
+    views are not moved onto a thread to pass through it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._lock = threading.Lock()
+        self._active = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = self._enter()
+        try:
+            response = self.get_response(request)
+        finally:
+            peak = self._exit()
+        return self._report(request, response, start, peak)
+
+    async def __acall__(self, request):
+        start = self._enter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            peak = self._exit()
+        return self._report(request, response, start, peak)
+
+    def _enter(self) -> int:
+        with self._lock:
+            if self._active == 0:
+                tracemalloc.reset_peak()
+            self._active += 1
+            start, _ = tracemalloc.get_traced_memory()
+        return start
+
+    def _exit(self) -> int:
+        with self._lock:
+            _, peak = tracemalloc.get_traced_memory()
+            self._active -= 1
+        return peak
+
+    def _report(self, request, response, start, peak):
+        peak_kb = max(peak - start, 0) // 1024
+        response["X-Peak-Memory-KB"] = str(peak_kb)
+        logger.info("%s %s peak %d KiB", request.method, request.path, peak_kb)
+        return response
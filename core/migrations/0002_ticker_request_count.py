@@ -0,0 +1,40 @@
+# Generated by Django 6.1.2 on 2026-10-19 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TickerRequestCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=20)),
+                ("date", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["date"], name="core_ticker_date_9f8806_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("code", "date"), name="unique_ticker_request_day"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.1.2 on 2026-10-19 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_ticker_request_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=20, unique=True)),
+                ("data", models.JSONField(default=dict)),
+                ("chart_data", models.TextField(blank=True)),
+                ("computed_at", models.DateTimeField()),
+                ("refresh_started_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
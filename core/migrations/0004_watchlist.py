@@ -0,0 +1,38 @@
+# Generated by Django 6.1.2 on 2026-10-19 10:35
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_analysis_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Watchlist",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        default=core.models._watchlist_key, max_length=32, unique=True
+                    ),
+                ),
+                ("name", models.CharField(blank=True, max_length=100)),
+                ("codes", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,231 @@
+"""Per-ticker models kept up to date incrementally as new bars arrive.
+
+``python manage.py update_models`` maintains one artifact per ticker under
+``TICKER_MODEL_DIR``. When labels became known since the last run, it
+continues boosting the saved booster (LightGBM ``init_model``) on a
+trailing window of labeled rows that ends with them, and rebuilds from
+scratch every ``MODEL_REBUILD_EVERY`` updates or when the model's log loss
+on the new rows drifts more than
+``MODEL_DRIFT_TOLERANCE`` above the out-of-sample loss measured at build
+time. With ``PREDICTION_MODEL=stored`` the request path only predicts.
+"""
+from datetime import datetime
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from sklearn.model_selection import TimeSeriesSplit
+
+from .artifacts import load_cached_artifact, save_artifact
+from .features import FEATURE_COLUMNS, add_targets, build_feature_frame
+from .tuning import MODEL_PARAMS, booster_params, tuned_params_for
+
+# Minimum new rows before their log loss is trusted as a drift signal
+DRIFT_MIN_ROWS = 5
+
+
+def model_path(code: str) -> Path:
+    return Path(settings.TICKER_MODEL_DIR) / f"{code}.joblib"
+
+
+def save_ticker_model(artifact: dict) -> Path:
+    """Save a ticker's artifact under ``TICKER_MODEL_DIR`` and return its path."""
+    path = model_path(artifact["code"])
+    save_artifact(path, artifact)
+    return path
+
+
+def load_ticker_model(code: str) -> dict | None:
+    """Return the cached artifact for ``code``, reloading when the file changes."""
+    return load_cached_artifact(model_path(code))
+
+
+def labeled_rows(df: pd.DataFrame, h: int) -> pd.DataFrame:
+    """Return rows whose features and ``h``-bar label are both known."""
+    return df[FEATURE_COLUMNS + [f"target_{h}", f"future_return_{h}"]].dropna()
+
+
+def _logloss(booster: lgb.Booster, X: np.ndarray, y: np.ndarray) -> float:
+    p = np.clip(booster.predict(X), 1e-15, 1 - 1e-15)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def _fit(X, y, params, trees, init_model=None) -> lgb.Booster:
+    return lgb.train(
+        booster_params(params, 1),
+        lgb.Dataset(X, y, params={"verbose": -1}),
+        num_boost_round=trees,
+        init_model=init_model,
+    )
+
+
+def build_horizon(code: str, rows: pd.DataFrame, h: int) -> dict | None:
+    """Fit one horizon from scratch on every labeled row.
+
+    The baseline log loss comes from a model fitted on the last
+    time-series fold's training rows and scored on its validation rows.
+    """
+    tscv = TimeSeriesSplit(n_splits=5)
+    if len(rows) <= tscv.n_splits:
+        return None
+    X = rows[FEATURE_COLUMNS].to_numpy()
+    y = rows[f"target_{h}"].to_numpy()
+    returns = rows[f"future_return_{h}"].to_numpy()
+    params = {**MODEL_PARAMS, **tuned_params_for(code, h)}
+    trees = params["n_estimators"]
+
+    *_, (train_index, valid_index) = tscv.split(X)
+    holdout = _fit(X[train_index], y[train_index], params, trees)
+    booster = _fit(X, y, params, trees)
+
+    pred = booster.predict(X) > 0.5
+    up, down = pred & (y == 1), ~pred & (y == 0)
+    return {
+        "booster": booster,
+        "params": params,
+        "last_date": rows.index[-1],
+        "n_rows": len(rows),
+        "up_return": float(returns[up].mean()) if up.any() else 0.0,
+        "down_return": float(returns[down].mean()) if down.any() else 0.0,
+        "baseline_logloss": _logloss(holdout, X[valid_index], y[valid_index]),
+        "drift_loss_sum": 0.0,
+        "drift_rows": 0,
+        "updates": 0,
+    }
+
+
+def update_horizon(entry: dict, rows: pd.DataFrame, h: int) -> str:
+    """Continue boosting ``entry`` in place on the rows labeled since its update.
+
+    ``rows`` are all labeled rows. A day's few new rows are below
+    LightGBM's minimum leaf size, so the continuation trains on the last
+    ``MODEL_UPDATE_WINDOW`` rows (at least twice ``min_child_samples``),
+    new rows included. Returns ``"updated"``, ``"drift"`` when the caller
+    should rebuild, or ``"unchanged"`` when no tree could be added; the
+    entry is then left as it was so the rows are retried next run. The
+    drift check scores the new rows with the model as it was before seeing
+    them and accumulates the loss until the next rebuild.
+    """
+    new_rows = rows[rows.index > entry["last_date"]]
+    X = new_rows[FEATURE_COLUMNS].to_numpy()
+    y = new_rows[f"target_{h}"].to_numpy()
+    loss_sum = entry["drift_loss_sum"] + _logloss(entry["booster"], X, y) * len(y)
+    drift_rows = entry["drift_rows"] + len(y)
+    if drift_rows >= DRIFT_MIN_ROWS:
+        limit = entry["baseline_logloss"] * (1 + settings.MODEL_DRIFT_TOLERANCE)
+        if loss_sum / drift_rows > limit:
+            return "drift"
+
+    min_leaf = entry["params"].get("min_child_samples", 20)
+    window = rows.iloc[-max(settings.MODEL_UPDATE_WINDOW, 2 * min_leaf):]
+    trees = entry["booster"].num_trees()
+    booster = _fit(
+        window[FEATURE_COLUMNS].to_numpy(),
+        window[f"target_{h}"].to_numpy(),
+        entry["params"],
+        settings.MODEL_UPDATE_TREES,
+        entry["booster"],
+    )
+    if booster.num_trees() <= trees:
+        return "unchanged"
+    entry.update(
+        booster=booster,
+        drift_loss_sum=loss_sum,
+        drift_rows=drift_rows,
+        last_date=new_rows.index[-1],
+        n_rows=entry["n_rows"] + len(new_rows),
+        updates=entry["updates"] + 1,
+    )
+    return "updated"
+
+
+def maintain_ticker_model(
+    code: str, df: pd.DataFrame, horizons: list[int], full: bool = False
+) -> dict[int, str]:
+    """Bring the saved model for ``code`` up to date with ``df``.
+
+    ``df`` carries features and targets (see :func:`core.features.add_targets`).
+    Returns the action taken per horizon: ``built``, ``updated``,
+    ``rebuilt:drift``, ``rebuilt:scheduled``, ``unchanged`` or ``skipped``.
+    """
+    artifact = load_ticker_model(code)
+    if artifact is None or full:
+        artifact = {"code": code, "horizons": {}}
+    else:
+        artifact = {**artifact, "horizons": dict(artifact["horizons"])}
+
+    actions = {}
+    for h in horizons:
+        rows = labeled_rows(df, h)
+        entry = artifact["horizons"].get(h)
+        if entry is None:
+            action = "built"
+        elif entry["updates"] >= settings.MODEL_REBUILD_EVERY:
+            action = "rebuilt:scheduled"
+        else:
+            if rows.empty or rows.index[-1] <= entry["last_date"]:
+                actions[h] = "unchanged"
+                continue
+            entry = dict(entry)
+            action = update_horizon(entry, rows, h)
+            if action == "drift":
+                action = "rebuilt:drift"
+            elif action == "unchanged":
+                actions[h] = action
+                continue
+            else:
+                artifact["horizons"][h] = entry
+        if action != "updated":
+            entry = build_horizon(code, rows, h)
+            if entry is None:
+                actions[h] = "skipped"
+                continue
+            artifact["horizons"][h] = entry
+        actions[h] = action
+
+    if any(a not in ("unchanged", "skipped") for a in actions.values()):
+        artifact["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        save_ticker_model(artifact)
+    return actions
+
+
+def refresh_ticker_model(
+    code: str,
+    prices: pd.DataFrame,
+    fund: pd.DataFrame,
+    horizons: list[int],
+    full: bool = False,
+) -> dict[int, str]:
+    """Build features and targets from raw prices, then maintain the model."""
+    df = add_targets(build_feature_frame(prices.copy(), fund, lean=True), horizons)
+    return maintain_ticker_model(code, df, horizons, full=full)
+
+
+def predict_with_ticker_model(
+    code: str, df: pd.DataFrame, horizons: list[int]
+) -> list[dict] | None:
+    """Predict from the latest feature row with the stored ticker model.
+
+    Returns ``None`` when the artifact is missing or does not cover the
+    requested horizons so the caller can fall back to per-request training.
+    """
+    artifact = load_ticker_model(code)
+    if artifact is None or any(h not in artifact["horizons"] for h in horizons):
+        return None
+    row = df[FEATURE_COLUMNS].iloc[[-1]].to_numpy(dtype=float)
+    if np.isnan(row).any():
+        return None
+    predictions = []
+    for h in horizons:
+        entry = artifact["horizons"][h]
+        predictions.append(
+            {
+                "horizon": h,
+                "prob_up": float(entry["booster"].predict(row)[0]),
+                "up_return": entry["up_return"],
+                "down_return": entry["down_return"],
+            }
+        )
+    return predictions
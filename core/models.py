@@ -1,3 +1,5 @@
+import secrets
+
 from django.db import models
 
 
@@ -19,3 +21,56 @@ class Ticker(models.Model):
 
     def __str__(self) -> str:
         return f"{self.code} {self.name}"
+
+
+class TickerRequestCount(models.Model):
+    """Analysis requests per ticker and day, used to rank popular tickers."""
+
+    code = models.CharField(max_length=20)
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["code", "date"], name="unique_ticker_request_day"
+            )
+        ]
+        indexes = [models.Index(fields=["date"])]
+
+    def __str__(self) -> str:
+        return f"{self.code} {self.date}: {self.count}"
+
+
+class AnalysisSnapshot(models.Model):
+    """Last computed analysis page for one ticker.
+
+    ``data`` holds the rendered tables, prediction records and report;
+    the chart PNG is kept in its own column so it can be deferred.
+    """
+
+    code = models.CharField(max_length=20, unique=True)
+    data = models.JSONField(default=dict)
+    chart_data = models.TextField(blank=True)
+    computed_at = models.DateTimeField()
+    refresh_started_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.code} @ {self.computed_at:%Y-%m-%d %H:%M}"
+
+
+def _watchlist_key() -> str:
+    return secrets.token_urlsafe(12)
+
+
+class Watchlist(models.Model):
+    """Saved list of ticker codes, addressed by its unguessable ``key``."""
+
+    key = models.CharField(max_length=32, unique=True, default=_watchlist_key)
+    name = models.CharField(max_length=100, blank=True)
+    codes = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name or self.key}: {', '.join(self.codes)}"
@@ -0,0 +1,133 @@
+"""Cross-sectional LightGBM model trained on the whole Ticker universe.
+
+The model is trained offline by ``python manage.py train_panel_model`` and
+saved with joblib. On the request path :func:`predict_with_panel_model` only
+looks up the cached artifact and calls ``predict_proba`` on the latest row.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from lightgbm import LGBMClassifier
+
+from .artifacts import load_cached_artifact, save_artifact
+from .features import FEATURE_COLUMNS
+
+PANEL_FEATURE_COLUMNS = FEATURE_COLUMNS + ["ticker_id", "sector_id"]
+CATEGORICAL_COLUMNS = ["ticker_id", "sector_id"]
+
+
+def stack_panel(
+    frames: dict[str, pd.DataFrame],
+    ticker_ids: dict[str, int],
+    sector_ids: dict[str, int],
+    horizons: list[int],
+) -> pd.DataFrame:
+    """Stack per-ticker feature frames into one training matrix.
+
+    Each frame must already contain features and targets (see
+    :func:`core.features.add_targets`). Rows with missing values are dropped.
+    """
+    target_cols = [f"target_{h}" for h in horizons]
+    return_cols = [f"future_return_{h}" for h in horizons]
+    parts = []
+    for code, df in frames.items():
+        part = df[FEATURE_COLUMNS + target_cols + return_cols].dropna()
+        if part.empty:
+            continue
+        part = part.astype(np.float32)
+        part["ticker_id"] = ticker_ids[code]
+        part["sector_id"] = sector_ids[code]
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=PANEL_FEATURE_COLUMNS + target_cols + return_cols)
+    return pd.concat(parts, ignore_index=True)
+
+
+def train_panel_model(
+    panel: pd.DataFrame,
+    horizons: list[int],
+    ticker_ids: dict[str, int],
+    sector_ids: dict[str, int],
+) -> dict:
+    """Fit one classifier per horizon on the stacked panel."""
+    X = panel[PANEL_FEATURE_COLUMNS]
+    models = {}
+    for h in horizons:
+        y = panel[f"target_{h}"].astype(int)
+        returns = panel[f"future_return_{h}"]
+        model = LGBMClassifier(
+            random_state=0,
+            learning_rate=0.05,
+            n_estimators=400,
+            num_leaves=63,
+            max_depth=-1,
+            reg_alpha=0.1,
+            reg_lambda=0.1,
+            n_jobs=-1,
+            verbose=-1,
+        )
+        model.fit(X, y, categorical_feature=CATEGORICAL_COLUMNS)
+        pred = model.predict(X)
+        up_return = returns[(pred == 1) & (y == 1)].mean()
+        down_return = returns[(pred == 0) & (y == 0)].mean()
+        models[h] = {
+            "model": model,
+            "up_return": 0.0 if pd.isna(up_return) else float(up_return),
+            "down_return": 0.0 if pd.isna(down_return) else float(down_return),
+        }
+    return {
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "features": PANEL_FEATURE_COLUMNS,
+        "tickers": {
+            code: (ticker_ids[code], sector_ids[code]) for code in ticker_ids
+        },
+        "horizons": models,
+        "n_rows": len(panel),
+    }
+
+
+def save_panel_model(artifact: dict, path: str | None = None) -> str:
+    """Save the trained panel artifact and return its path."""
+    return save_artifact(path or settings.PANEL_MODEL_PATH, artifact)
+
+
+def load_panel_model(path: str | None = None) -> dict | None:
+    """Return the cached artifact, reloading it when the file changes."""
+    return load_cached_artifact(path or settings.PANEL_MODEL_PATH)
+
+
+def predict_with_panel_model(
+    code: str, df: pd.DataFrame, horizons: list[int]
+) -> list[dict] | None:
+    """Predict from the latest feature row with the shared panel model.
+
+    Returns ``None`` when the artifact is missing or does not cover the
+    requested horizons so the caller can fall back to per-ticker training.
+    """
+    artifact = load_panel_model()
+    if artifact is None or any(h not in artifact["horizons"] for h in horizons):
+        return None
+    ticker_id, sector_id = artifact["tickers"].get(code, (np.nan, np.nan))
+
+    row = df[FEATURE_COLUMNS].iloc[[-1]].astype(np.float32)
+    if row.isna().any(axis=None):
+        return None
+    row["ticker_id"] = ticker_id
+    row["sector_id"] = sector_id
+    row = row[artifact["features"]]
+
+    predictions = []
+    for h in horizons:
+        entry = artifact["horizons"][h]
+        prob_up = float(entry["model"].predict_proba(row)[0, 1])
+        predictions.append(
+            {
+                "horizon": h,
+                "prob_up": prob_up,
+                "up_return": entry["up_return"],
+                "down_return": entry["down_return"],
+            }
+        )
+    return predictions
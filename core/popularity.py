@@ -0,0 +1,84 @@
+"""Per-ticker request counts used to choose what to precompute overnight.
+
+Views call :func:`record_ticker_request`, which only bumps an in-process
+counter; the counts are written to :class:`~core.models.TickerRequestCount`
+at most every ``POPULARITY_FLUSH_SECONDS`` so a page view never waits on a
+database write. Counts still buffered when a worker exits are lost, which
+is harmless for ranking.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import TickerRequestCount
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending: Counter = Counter()
+_last_flush = time.monotonic()
+
+
+def record_ticker_request(code: str) -> None:
+    """Count one analysis request for ``code`` (without the ``.T`` suffix)."""
+    global _last_flush
+    if not code:
+        return
+    with _lock:
+        _pending[(timezone.localdate(), code)] += 1
+        due = time.monotonic() - _last_flush >= settings.POPULARITY_FLUSH_SECONDS
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush_request_counts()
+
+
+def _add_count(day, code: str, n: int) -> None:
+    rows = TickerRequestCount.objects.filter(code=code, date=day)
+    if rows.update(count=F("count") + n):
+        return
+    try:
+        with transaction.atomic():
+            TickerRequestCount.objects.create(code=code, date=day, count=n)
+    except IntegrityError:
+        # Another worker created the row first
+        rows.update(count=F("count") + n)
+
+
+def flush_request_counts() -> int:
+    """Write the buffered counts to the database and return how many."""
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+    try:
+        with transaction.atomic():
+            for (day, code), n in pending.items():
+                _add_count(day, code, n)
+    except Exception:
+        logger.warning("Could not store ticker request counts", exc_info=True)
+        with _lock:
+            _pending.update(pending)
+        return 0
+    return sum(pending.values())
+
+
+def popular_tickers(n: int, days: int | None = None) -> list[str]:
+    """Return the ``n`` most requested codes over the last ``days`` days."""
+    days = days or settings.POPULARITY_WINDOW_DAYS
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = (
+        TickerRequestCount.objects.filter(date__gte=since)
+        .values("code")
+        .annotate(total=Sum("count"))
+        .order_by("-total", "code")[:n]
+    )
+    return [row["code"] for row in rows]
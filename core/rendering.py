@@ -0,0 +1,49 @@
+"""HTML presentation of analysis results.
+
+Result objects are immutable, so each rendering is memoised per object and
+re-serving a cached result never re-renders its tables.
+"""
+from functools import lru_cache
+
+import pandas as pd
+
+from .results import PREDICTION_COLUMNS, LatestData, PredictionResult
+
+
+@lru_cache(maxsize=256)
+def render_latest_table(latest: LatestData) -> str:
+    """Return the latest-data table as HTML."""
+    return pd.DataFrame(latest.records()).to_html(
+        classes="table table-striped", index=False
+    )
+
+
+@lru_cache(maxsize=256)
+def render_prediction_table(result: PredictionResult) -> str:
+    """Return predictions as an HTML table coloured by probability."""
+    prob_col = PREDICTION_COLUMNS[2]
+    table = pd.DataFrame(
+        {
+            PREDICTION_COLUMNS[0]: result.horizons,
+            PREDICTION_COLUMNS[1]: result.directions,
+            prob_col: (result.prob_up * 100).round(),
+            PREDICTION_COLUMNS[3]: result.expected_return,
+        }
+    )
+
+    def color_scale(val: float) -> str:
+        if val == 50:
+            return ""
+        if val > 50:
+            alpha = min((val - 50) / 50, 1)
+            return f"background-color: rgba(0, 255, 0, {alpha:.2f})"
+        alpha = min((50 - val) / 50, 1)
+        return f"background-color: rgba(255, 0, 0, {alpha:.2f})"
+
+    styled_table = (
+        table.style.applymap(color_scale, subset=[prob_col])
+        .format({prob_col: "{:.0f}%", PREDICTION_COLUMNS[3]: lambda x: f"{x:+.2f}%"})
+        .hide(axis="index")
+        .set_table_attributes('class="table table-striped"')
+    )
+    return styled_table.to_html()
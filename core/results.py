@@ -0,0 +1,95 @@
+"""Typed result objects returned by the analysis functions.
+
+They hold numeric arrays plus enough labels to build records; turning them
+into HTML is left to :mod:`core.rendering`.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Shared header names for prediction tables
+PREDICTION_COLUMNS = [
+    "予測日数",
+    "予想方向",
+    "上昇確率",
+    "期待リターン",
+]
+
+
+def _cell(value: float):
+    """Return a table cell as a rounded int, or "-" when missing."""
+    return "-" if np.isnan(value) else int(round(value))
+
+
+@dataclass(frozen=True, eq=False)
+class LatestData:
+    """Last few bars of price, indicators and fundamentals."""
+
+    dates: tuple[str, ...]
+    columns: tuple[str, ...]
+    values: np.ndarray
+
+    def records(self) -> list[dict]:
+        return [
+            {"date": date, **{c: _cell(v) for c, v in zip(self.columns, row)}}
+            for date, row in zip(self.dates, self.values)
+        ]
+
+
+@dataclass(frozen=True, eq=False)
+class CandlestickResult:
+    """Chart image and latest data produced by the candlestick analysis."""
+
+    ticker: str
+    chart_data: str | None
+    latest: LatestData | None
+    warning: str | None = None
+    # True when upstream returned no price history at all
+    no_data: bool = False
+
+
+@dataclass(frozen=True, eq=False)
+class PredictionResult:
+    """Direction probabilities and expected returns per horizon."""
+
+    ticker: str
+    horizons: np.ndarray
+    prob_up: np.ndarray
+    expected_return: np.ndarray
+
+    @classmethod
+    def from_estimates(cls, ticker: str, estimates: list[tuple]):
+        """Build from ``(horizon, prob_up, up_return, down_return)`` tuples.
+
+        The expected return is the mean realised return of correct UP (or
+        DOWN) calls, whichever direction the probability points to.
+        """
+        if not estimates:
+            return None
+        horizons, prob_up, up_return, down_return = (
+            np.array(col, dtype=float) for col in zip(*estimates)
+        )
+        expected = np.where(prob_up >= 0.5, up_return, down_return)
+        return cls(
+            ticker=ticker,
+            horizons=horizons.astype(int),
+            prob_up=prob_up,
+            expected_return=np.nan_to_num(expected, nan=0.0),
+        )
+
+    @property
+    def directions(self) -> list[str]:
+        return ["UP" if p >= 0.5 else "DOWN" for p in self.prob_up]
+
+    def records(self) -> list[dict]:
+        return [
+            {
+                PREDICTION_COLUMNS[0]: int(h),
+                PREDICTION_COLUMNS[1]: direction,
+                PREDICTION_COLUMNS[2]: int(round(p * 100)),
+                PREDICTION_COLUMNS[3]: round(float(r), 4),
+            }
+            for h, direction, p, r in zip(
+                self.horizons, self.directions, self.prob_up, self.expected_return
+            )
+        ]
@@ -0,0 +1,144 @@
+"""Sector-wide aggregates computed from a dense (date x ticker) close matrix."""
+import numpy as np
+import pandas as pd
+
+from .market_data import download
+from .models import Industry, Ticker
+from .tickers import symbol_for
+
+SECTOR_PERIODS = ("1mo", "3mo", "6mo", "1y")
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _download_closes(symbols: list[str], period: str) -> pd.DataFrame:
+    """Return closes for all symbols from one batched download."""
+    if not symbols:
+        return pd.DataFrame()
+    df = download(
+        symbols,
+        period=period,
+        interval="1d",
+        auto_adjust=False,
+        group_by="column",
+        progress=False,
+    )
+    if df is None or df.empty:
+        return pd.DataFrame(columns=symbols)
+    if isinstance(df.columns, pd.MultiIndex):
+        closes = df["Close"]
+    else:
+        closes = df[["Close"]]
+        closes.columns = symbols[:1]
+    return closes.reindex(columns=symbols)
+
+
+def build_close_matrix(closes: pd.DataFrame) -> np.ndarray:
+    """Return a forward-filled float64 array of shape (dates, tickers).
+
+    Gaps (suspensions, late listings) are filled with the previous close so
+    every column lives on the same trading calendar. Values before a ticker's
+    first bar stay NaN.
+    """
+    arr = closes.to_numpy(dtype=np.float64, copy=True)
+    if arr.size == 0:
+        return arr
+    rows = np.arange(arr.shape[0])[:, None]
+    last_valid = np.where(~np.isnan(arr), rows, 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return arr[last_valid, np.arange(arr.shape[1])]
+
+
+def compute_sector_stats(
+    matrix: np.ndarray, sector_ids: np.ndarray, n_sectors: int
+) -> dict[str, np.ndarray]:
+    """Return per-sector return, volatility, breadth and member count.
+
+    ``matrix`` is the output of :func:`build_close_matrix` and ``sector_ids``
+    maps each column to a sector index in ``range(n_sectors)``.
+
+    - ``return``: equal-weighted mean of member period returns
+    - ``volatility``: annualised volatility of the equal-weighted sector index
+    - ``breadth``: share of members with a positive period return
+    """
+    n_dates, n_tickers = matrix.shape
+    membership = np.zeros((n_tickers, n_sectors))
+    membership[np.arange(n_tickers), sector_ids] = 1.0
+    if n_dates == 0:
+        empty = np.full(n_sectors, np.nan)
+        return {
+            "count": np.zeros(n_sectors, dtype=int),
+            "return": empty,
+            "volatility": empty.copy(),
+            "breadth": empty.copy(),
+        }
+
+    valid = ~np.isnan(matrix)
+    first = matrix[valid.argmax(axis=0), np.arange(n_tickers)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        period_ret = matrix[-1] / first - 1.0
+        daily = matrix[1:] / matrix[:-1] - 1.0
+    ok = np.isfinite(period_ret)
+    daily_ok = np.isfinite(daily)
+
+    # Sector sums are matrix products with the one-hot membership matrix.
+    count = ok.astype(float) @ membership
+    ret_sum = np.where(ok, period_ret, 0.0) @ membership
+    up_sum = (ok & (period_ret > 0)).astype(float) @ membership
+    daily_count = daily_ok.astype(float) @ membership
+    daily_sum = np.where(daily_ok, daily, 0.0) @ membership
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_ret = ret_sum / count
+        breadth = up_sum / count
+        index_ret = daily_sum / daily_count
+        index_ok = np.isfinite(index_ret)
+        n_obs = index_ok.sum(axis=0)
+        index_mean = np.where(index_ok, index_ret, 0.0).sum(axis=0) / n_obs
+        sq_dev = np.where(index_ok, index_ret - index_mean, 0.0) ** 2
+        variance = sq_dev.sum(axis=0) / (n_obs - 1)
+    volatility = np.sqrt(variance * TRADING_DAYS_PER_YEAR)
+    volatility[n_obs < 2] = np.nan
+
+    return {
+        "count": count.astype(int),
+        "return": mean_ret,
+        "volatility": volatility,
+        "breadth": breadth,
+    }
+
+
+def _to_json_list(values: np.ndarray, digits: int = 4) -> list:
+    """Round an array and replace non-finite values with ``None``."""
+    rounded = np.round(values.astype(float), digits)
+    return [float(v) if np.isfinite(v) else None for v in rounded]
+
+
+def sector_heatmap(period: str = "1mo") -> dict:
+    """Return compact column-oriented sector statistics for a heatmap."""
+    industries = list(Industry.objects.order_by("name").values_list("id", "name"))
+    position = {pk: i for i, (pk, _) in enumerate(industries)}
+    members = list(
+        Ticker.objects.order_by("industry__name", "code").values_list(
+            "code", "industry_id"
+        )
+    )
+    symbols = [symbol_for(code) for code, _ in members]
+    sector_ids = np.array([position[pk] for _, pk in members], dtype=np.intp)
+
+    closes = _download_closes(symbols, period)
+    matrix = build_close_matrix(closes)
+    if matrix.size == 0:
+        matrix = np.empty((0, len(symbols)))
+    stats = compute_sector_stats(matrix, sector_ids, len(industries))
+
+    dates = closes.index
+    return {
+        "period": period,
+        "start": str(dates[0].date()) if len(dates) else None,
+        "end": str(dates[-1].date()) if len(dates) else None,
+        "sectors": [name for _, name in industries],
+        "count": stats["count"].tolist(),
+        "return": _to_json_list(stats["return"]),
+        "volatility": _to_json_list(stats["volatility"]),
+        "breadth": _to_json_list(stats["breadth"]),
+    }
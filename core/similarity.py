@@ -0,0 +1,139 @@
+"""Similar stocks from a precomputed index of daily-return correlations.
+
+``python manage.py build_similarity_index`` downloads closes for the whole
+Ticker universe, turns them into a (days x tickers) matrix of normalized
+returns and keeps each ticker's top-k most correlated peers, within its
+industry and market-wide. Correlations are computed block by block as
+``Z[:, block].T @ Z``, so memory stays at ``block_size`` x tickers. The
+index is saved with joblib; on the request path :func:`similar_tickers` is
+a dictionary lookup on the cached artifact.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .artifacts import load_cached_artifact, save_artifact
+from .sectors import build_close_matrix
+from .tickers import normalize_code
+
+
+def normalized_returns(
+    matrix: np.ndarray, min_days: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return unit-length demeaned log returns per column and a usable mask.
+
+    The dot product of two columns is their return correlation. Missing
+    returns count as the column mean, and columns with fewer than
+    ``min_days`` returns (or no variance) are zeroed and marked unusable.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(matrix), axis=0)
+    valid = np.isfinite(returns)
+    counts = valid.sum(axis=0)
+    filled = np.where(valid, returns, 0.0)
+    mean = filled.sum(axis=0) / np.maximum(counts, 1)
+    deviations = np.where(valid, returns - mean, 0.0)
+    norm = np.sqrt((deviations**2).sum(axis=0))
+    usable = (counts >= min_days) & (norm > 0)
+    z = np.zeros(deviations.shape, dtype=np.float32)
+    z[:, usable] = deviations[:, usable] / norm[usable]
+    return z, usable
+
+
+def top_k_neighbours(
+    z: np.ndarray,
+    k: int,
+    usable: np.ndarray,
+    groups: np.ndarray | None = None,
+    block_size: int = 512,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the column indices and correlations of each column's top-k peers.
+
+    With ``groups``, peers must share the column's group. Missing peers
+    have index -1 and correlation NaN.
+    """
+    n = z.shape[1]
+    k = max(0, min(k, n - 1))
+    indices = np.full((n, k), -1, dtype=np.int64)
+    scores = np.full((n, k), np.nan, dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        sims = z[:, start:stop].T @ z
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        sims[:, ~usable] = -np.inf
+        if groups is not None:
+            sims[groups[start:stop, None] != groups[None, :]] = -np.inf
+        best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(sims, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        found = np.isfinite(best_scores) & usable[start:stop, None]
+        indices[start:stop] = np.where(found, best, -1)
+        scores[start:stop] = np.where(found, best_scores, np.nan)
+    return indices, scores
+
+
+def build_similarity_index(
+    closes: pd.DataFrame,
+    industries: dict[str, int],
+    names: dict[str, str],
+    k: int,
+    min_days: int,
+    block_size: int = 512,
+) -> dict:
+    """Return the peers artifact for the close columns of ``closes``.
+
+    ``closes`` has one column per ticker code; ``industries`` and ``names``
+    map codes to their industry id and display name.
+    """
+    codes = list(closes.columns)
+    z, usable = normalized_returns(build_close_matrix(closes), min_days)
+    groups = np.array([industries.get(code, -1) for code in codes])
+
+    peers = {code: {} for code in codes}
+    for scope, scope_groups in (("industry", groups), ("market", None)):
+        indices, scores = top_k_neighbours(z, k, usable, scope_groups, block_size)
+        for i, code in enumerate(codes):
+            peers[code][scope] = [
+                {
+                    "code": codes[j],
+                    "name": names.get(codes[j], ""),
+                    "correlation": round(float(score), 3),
+                }
+                for j, score in zip(indices[i], scores[i])
+                if j >= 0
+            ]
+    return {
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "days": int(len(closes)),
+        "k": k,
+        "peers": {code: p for code, p in peers.items() if p["market"]},
+    }
+
+
+def save_similarity_index(artifact: dict, path: str | None = None) -> str:
+    """Save the index and return its path."""
+    return save_artifact(path or settings.SIMILARITY_INDEX_PATH, artifact)
+
+
+def load_similarity_index(path: str | None = None) -> dict | None:
+    """Return the cached index, reloading it when the file changes."""
+    return load_cached_artifact(path or settings.SIMILARITY_INDEX_PATH)
+
+
+def similar_tickers(code: str) -> dict | None:
+    """Return ``{"industry": [...], "market": [...]}`` peers of ``code``.
+
+    Each peer is a dict with ``code``, ``name`` and ``correlation``.
+    ``None`` when there is no index or ``code`` is not in it.
+    """
+    artifact = load_similarity_index()
+    if artifact is None:
+        return None
+    return artifact["peers"].get(normalize_code(code))
@@ -0,0 +1,283 @@
+"""Single-flight coalescing of upstream data loads across threads and workers.
+
+When several requests need the same upstream result at once, only one of
+them calls the loader. Threads of the same worker wait on a shared future;
+other gunicorn workers on the host wait on an ``flock`` lock file under
+``SINGLE_FLIGHT_DIR``. A waiting worker leaves a ``.wait`` marker; only
+then does the leader pickle its result next to the lock, and the last
+waiter to read it deletes it. A result is only reused by callers that were
+already waiting when it was written, so this coalesces concurrent loads
+without acting as a cache. Files untouched for ``STALE_SECONDS`` (e.g. of a
+killed worker) are purged now and then. The directory is created private
+(mode 0700) and not used unless it is owned by this user and writable by
+nobody else, as other users could otherwise plant the pickled results.
+
+:func:`asingle_flight` does the same for coroutines on the ASGI path,
+polling the lock file without blocking the event loop.
+
+Lock files need ``fcntl``; where it is missing, or the directory is not
+private, only threads are coalesced.
+"""
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Sleep between attempts to take another worker's lock
+POLL_SECONDS = 0.05
+# Flight files older than this are removed, checked at most every
+# PURGE_SECONDS per worker
+STALE_SECONDS = 3600
+PURGE_SECONDS = 600
+
+_lock = threading.Lock()
+_flights: dict[str, Future] = {}
+_async_flights: dict[tuple[int, str], asyncio.Future] = {}
+_last_purge = 0.0
+_refused_dirs: set[Path] = set()
+
+
+def single_flight(key: str, loader, across_workers: bool = True):
+    """Return ``loader()``, sharing one call among concurrent callers of ``key``.
+
+    Callers that joined another caller's load get a deep copy of its
+    result, so they may modify it freely. Exceptions propagate to every
+    caller waiting in the same worker. ``across_workers=False`` only
+    coalesces the threads of this worker, e.g. for large batch results
+    not worth writing to disk.
+    """
+    if not settings.SINGLE_FLIGHT:
+        return loader()
+    with _lock:
+        future = _flights.get(key)
+        leader = future is None
+        if leader:
+            future = _flights[key] = Future()
+    if not leader:
+        return copy.deepcopy(future.result())
+
+    try:
+        value = _load_across_workers(key, loader) if across_workers else loader()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        with _lock:
+            del _flights[key]
+
+
+def _paths(key: str) -> tuple[Path, Path]:
+    name = hashlib.sha256(key.encode()).hexdigest()[:32]
+    base = Path(settings.SINGLE_FLIGHT_DIR)
+    return base / f"{name}.lock", base / f"{name}.pkl"
+
+
+def _waiter_path(lock_path: Path) -> Path:
+    ident = f"{os.getpid()}-{threading.get_ident()}"
+    return lock_path.with_name(f"{lock_path.stem}.{ident}.wait")
+
+
+def _has_waiters(lock_path: Path) -> bool:
+    return any(lock_path.parent.glob(f"{lock_path.stem}.*.wait"))
+
+
+def _is_private(base: Path) -> bool:
+    """Create ``base`` if needed and return whether only this user can write it."""
+    try:
+        base.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = os.lstat(base)
+    except OSError:
+        logger.warning("Cannot create %s", base, exc_info=True)
+        return False
+    private = (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+    if not private and base not in _refused_dirs:
+        _refused_dirs.add(base)
+        logger.warning(
+            "SINGLE_FLIGHT_DIR %s is not a directory owned by this user and "
+            "writable only by it; loads are not shared between workers",
+            base,
+        )
+    return private
+
+
+def _prepare(key: str) -> tuple[Path, Path] | None:
+    """Return the flight's paths, purging stale flight files now and then.
+
+    Returns ``None`` if the directory is not private (:func:`_is_private`).
+    """
+    global _last_purge
+    lock_path, result_path = _paths(key)
+    base = lock_path.parent
+    if not _is_private(base):
+        return None
+    now = time.time()
+    if now - _last_purge >= PURGE_SECONDS:
+        _last_purge = now
+        for path in base.iterdir():
+            try:
+                if now - path.stat().st_mtime > STALE_SECONDS:
+                    path.unlink()
+            except OSError:
+                pass
+    return lock_path, result_path
+
+
+def _read_result(path: Path, since: float):
+    """Return ``(True, value)`` if ``path`` was written after ``since``."""
+    try:
+        if os.path.getmtime(path) < since:
+            return False, None
+        with open(path, "rb") as f:
+            return True, pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False, None
+
+
+def _take_result(lock_path: Path, result_path: Path, since: float):
+    """Return ``(found, value)`` as a waiter holding the lock.
+
+    The waiter's marker is removed, and so is the result once no other
+    waiter is left to read it.
+    """
+    found, value = _read_result(result_path, since)
+    _waiter_path(lock_path).unlink(missing_ok=True)
+    if found and not _has_waiters(lock_path):
+        result_path.unlink(missing_ok=True)
+    return found, value
+
+
+def _share_result(lock_path: Path, result_path: Path, value) -> None:
+    """Write the leader's result if another worker is waiting for it."""
+    if _has_waiters(lock_path):
+        _write_result(result_path, value)
+
+
+def _write_result(path: Path, value) -> None:
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except (OSError, pickle.PicklingError):
+        logger.warning("Could not share single-flight result", exc_info=True)
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _load_across_workers(key: str, loader):
+    """Run ``loader`` unless another worker is already running it."""
+    paths = _prepare(key) if fcntl is not None else None
+    if paths is None:
+        return loader()
+    lock_path, result_path = paths
+    started = time.time()
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+    with open(lock_path, "a") as lock_file:
+        waited = False
+        while not _try_lock(lock_file):
+            if not waited:
+                _waiter_path(lock_path).touch()
+                waited = True
+            if time.monotonic() >= deadline:
+                # The leader is stuck; do not hold this request hostage
+                _waiter_path(lock_path).unlink(missing_ok=True)
+                return loader()
+            time.sleep(POLL_SECONDS)
+        try:
+            os.utime(lock_path)
+            if waited:
+                found, value = _take_result(lock_path, result_path, started)
+                if found:
+                    return value
+            value = loader()
+            _share_result(lock_path, result_path, value)
+            return value
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def asingle_flight(key: str, loader):
+    """Async :func:`single_flight`; ``loader`` is a coroutine function."""
+    if not settings.SINGLE_FLIGHT:
+        return await loader()
+    loop = asyncio.get_running_loop()
+    flight = (id(loop), key)
+    future = _async_flights.get(flight)
+    if future is not None:
+        return copy.deepcopy(await asyncio.shield(future))
+
+    future = _async_flights[flight] = loop.create_future()
+    try:
+        value = await _aload_across_workers(key, loader)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        # Nobody may be waiting; do not log it as never retrieved
+        future.exception()
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        del _async_flights[flight]
+
+
+async def _aload_across_workers(key: str, loader):
+    paths = _prepare(key) if fcntl is not None else None
+    if paths is None:
+        return await loader()
+    lock_path, result_path = paths
+    started = time.time()
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+    with open(lock_path, "a") as lock_file:
+        waited = False
+        while not _try_lock(lock_file):
+            if not waited:
+                _waiter_path(lock_path).touch()
+                waited = True
+            if time.monotonic() >= deadline:
+                _waiter_path(lock_path).unlink(missing_ok=True)
+                return await loader()
+            await asyncio.sleep(POLL_SECONDS)
+        try:
+            os.utime(lock_path)
+            if waited:
+                found, value = _take_result(lock_path, result_path, started)
+                if found:
+                    return value
+            value = await loader()
+            _share_result(lock_path, result_path, value)
+            return value
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,164 @@
+"""Persisted analysis pages served stale-while-revalidate.
+
+The main view renders the latest :class:`~core.models.AnalysisSnapshot` of
+a ticker straight away. Once a snapshot is older than
+``SNAPSHOT_MAX_AGE_SECONDS`` and the TSE calendar says prices could have
+moved since it was computed, it is still served, and a background thread
+recomputes it; a lease stored on the row keeps other workers from
+refreshing the same ticker at the same time. Only a ticker without any
+snapshot is computed while the visitor waits.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .market_calendar import changed_between
+from .models import AnalysisSnapshot
+from .tickers import normalize_code
+
+logger = logging.getLogger(__name__)
+
+# Page data keys persisted in ``AnalysisSnapshot.data``
+SNAPSHOT_FIELDS = (
+    "warning",
+    "latest_data_table",
+    "quarterly_table",
+    "annual_table",
+    "predictions",
+    "company_name",
+    "gemini_report_html",
+    "similar",
+)
+
+_lock = threading.Lock()
+_inflight: set[str] = set()
+_executor: ThreadPoolExecutor | None = None
+
+
+def snapshot_code(ticker: str) -> str:
+    return normalize_code(ticker)
+
+
+def save_snapshot(code: str, data: dict) -> AnalysisSnapshot:
+    """Store the page data computed by ``fetch_data`` for ``code``."""
+    snapshot, _ = AnalysisSnapshot.objects.update_or_create(
+        code=code,
+        defaults={
+            "data": {key: data.get(key) for key in SNAPSHOT_FIELDS},
+            "chart_data": data.get("chart_data") or "",
+            "computed_at": timezone.now(),
+            "refresh_started_at": None,
+        },
+    )
+    return snapshot
+
+
+def is_stale(snapshot: AnalysisSnapshot) -> bool:
+    now = timezone.now()
+    max_age = timedelta(seconds=settings.SNAPSHOT_MAX_AGE_SECONDS)
+    if now - snapshot.computed_at <= max_age:
+        return False
+    return changed_between(snapshot.computed_at, now)
+
+
+def page_data(snapshot: AnalysisSnapshot, ticker: str) -> dict:
+    """Return the snapshot in the shape ``fetch_data`` returns."""
+    return {
+        "ticker": ticker,
+        **snapshot.data,
+        "chart_data": snapshot.chart_data or None,
+        "computed_at": snapshot.computed_at,
+    }
+
+
+def _claim_refresh(code: str) -> bool:
+    """Take the refresh lease on ``code``; False if another worker holds it."""
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.SNAPSHOT_REFRESH_LEASE_SECONDS)
+    claimed = (
+        AnalysisSnapshot.objects.filter(code=code)
+        .filter(Q(refresh_started_at__isnull=True) | Q(refresh_started_at__lt=expired))
+        .update(refresh_started_at=now)
+    )
+    return claimed == 1
+
+
+def refresh_snapshot(code: str, compute) -> bool:
+    """Recompute and store the snapshot of ``code``; False if that failed."""
+    try:
+        data = compute(code)
+    except Exception:
+        logger.exception("Snapshot refresh for %s failed", code)
+        return False
+    if not data.get("chart_data"):
+        # Keep serving the old snapshot; the expired lease retries it later
+        logger.warning("Snapshot refresh for %s failed: %s", code, data.get("warning"))
+        return False
+    save_snapshot(code, data)
+    return True
+
+
+def _refresh_in_background(code: str, compute) -> None:
+    try:
+        refresh_snapshot(code, compute)
+    finally:
+        with _lock:
+            _inflight.discard(code)
+        # This thread's connection is not managed by the request cycle
+        connection.close()
+
+
+def schedule_refresh(code: str, compute) -> bool:
+    """Recompute ``code`` in the background unless already in progress."""
+    global _executor
+    with _lock:
+        if code in _inflight:
+            return False
+        _inflight.add(code)
+    if not _claim_refresh(code):
+        with _lock:
+            _inflight.discard(code)
+        return False
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SNAPSHOT_REFRESH_WORKERS,
+                thread_name_prefix="snapshot-refresh",
+            )
+        _executor.submit(_refresh_in_background, code, compute)
+    return True
+
+
+def snapshot_page_data(ticker: str, compute) -> dict | None:
+    """Return the stored page data for ``ticker``, or ``None`` if there is none.
+
+    A stale snapshot is returned as is and refreshed in the background
+    with ``compute``, which is called with the ticker code and must return
+    what ``fetch_data`` returns.
+    """
+    snapshot = AnalysisSnapshot.objects.filter(code=snapshot_code(ticker)).first()
+    if snapshot is None:
+        return None
+    if is_stale(snapshot):
+        schedule_refresh(snapshot.code, compute)
+    return page_data(snapshot, ticker)
+
+
+def get_page_data(ticker: str, compute) -> dict:
+    """Return page data for ``ticker``, from its snapshot when one exists.
+
+    A missing snapshot is computed synchronously and stored when the chart
+    could be built.
+    """
+    data = snapshot_page_data(ticker, compute)
+    if data is None:
+        data = compute(ticker)
+        if data.get("chart_data"):
+            save_snapshot(snapshot_code(ticker), data)
+    return data
@@ -0,0 +1,293 @@
+"""Local stand-in for Yahoo Finance and Gemini, used by load tests.
+
+:func:`start_stub_server` serves deterministic synthetic data on a local
+port, after an artificial ``latency``:
+
+* ``/v8/finance/chart/<symbol>``: daily OHLCV for ``range`` or
+  ``period1``/``period2`` (a seeded random walk per symbol)
+* ``/v10/finance/quoteSummary/<symbol>`` and ``/v7/finance/quote``: info
+* ``/ws/fundamentals-timeseries/...``: financial statement line items
+* ``/v1beta/models/<model>:generateContent``: a canned Gemini report
+* the cookie and crumb endpoints yfinance calls first
+
+The app is pointed at it with the ``YAHOO_API_ENDPOINT`` and
+``GEMINI_API_ENDPOINT`` settings (see :func:`core.market_data.route_yahoo_to`).
+"""
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .market_calendar import TOKYO, is_trading_day
+
+PERIOD_DAYS = {
+    "1d": 1, "5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366,
+    "2y": 731, "5y": 1827, "10y": 3653, "ytd": 366, "max": 7305,
+}
+REPORT_TEXT = (
+    "## 投資判断\n\n"
+    "スタブサーバーが生成したレポートです。直近のトレンドは**中立**です。\n"
+)
+
+
+def _seed(symbol: str) -> int:
+    return zlib.crc32(symbol.encode())
+
+
+def synthetic_history(symbol: str, end: datetime | None = None) -> pd.DataFrame:
+    """Return 20 years of daily bars for ``symbol``, the same all day long."""
+    end = (end or datetime.now(TOKYO)).date()
+    days = [
+        d.date()
+        for d in pd.bdate_range(end - timedelta(days=PERIOD_DAYS["max"]), end)
+        if is_trading_day(d.date())
+    ]
+    rng = np.random.default_rng(_seed(symbol))
+    close = 1000 * (1 + _seed(symbol) % 9) * np.exp(
+        np.cumsum(rng.normal(0.0003, 0.015, len(days)))
+    )
+    spread = np.abs(rng.normal(0, 0.01, len(days))) * close
+    open_ = close * (1 + rng.normal(0, 0.005, len(days)))
+    return pd.DataFrame(
+        {
+            "open": open_.round(1),
+            "high": (np.maximum(open_, close) + spread).round(1),
+            "low": (np.minimum(open_, close) - spread).round(1),
+            "close": close.round(1),
+            "volume": rng.integers(100_000, 5_000_000, len(days)),
+        },
+        index=pd.DatetimeIndex(days).tz_localize(TOKYO) + pd.Timedelta(hours=9),
+    )
+
+
+def chart_payload(symbol: str, params: dict) -> dict:
+    """Return a v8 chart response for the requested range of daily bars."""
+    history = synthetic_history(symbol)
+    if "period1" in params:
+        start = pd.Timestamp(int(params["period1"]), unit="s", tz="UTC")
+        end = pd.Timestamp(int(params.get("period2", time.time())), unit="s", tz="UTC")
+    else:
+        period = params.get("range", "1mo")
+        end = pd.Timestamp.now(tz="UTC")
+        start = end - pd.Timedelta(days=PERIOD_DAYS.get(period, 31))
+    bars = history[(history.index >= start) & (history.index < end)]
+    timestamps = [int(ts.timestamp()) for ts in bars.index]
+    last = timestamps[-1] if timestamps else int(time.time())
+    session = {
+        "timezone": "JST", "start": last, "end": last + 23400, "gmtoffset": 32400
+    }
+    meta = {
+        "currency": "JPY",
+        "symbol": symbol,
+        "exchangeName": "JPX",
+        "fullExchangeName": "Tokyo",
+        "instrumentType": "EQUITY",
+        "firstTradeDate": int(history.index[0].timestamp()),
+        "regularMarketTime": last,
+        "hasPrePostMarketData": False,
+        "gmtoffset": 32400,
+        "timezone": "JST",
+        "exchangeTimezoneName": "Asia/Tokyo",
+        "regularMarketPrice": float(bars["close"].iloc[-1]) if len(bars) else None,
+        "priceHint": 1,
+        "currentTradingPeriod": {"pre": session, "regular": session, "post": session},
+        "dataGranularity": params.get("interval", "1d"),
+        "range": params.get("range", ""),
+        "validRanges": list(PERIOD_DAYS),
+    }
+    quote = {col: bars[col].tolist() for col in ("open", "high", "low", "close")}
+    quote["volume"] = [int(v) for v in bars["volume"]]
+    result = {"meta": meta}
+    if timestamps:
+        result["timestamp"] = timestamps
+        result["indicators"] = {
+            "quote": [quote],
+            "adjclose": [{"adjclose": quote["close"]}],
+        }
+    else:
+        result["indicators"] = {"quote": [{}], "adjclose": [{}]}
+    return {"chart": {"result": [result], "error": None}}
+
+
+def _info(symbol: str) -> dict:
+    seed = _seed(symbol)
+    price = float(synthetic_history(symbol)["close"].iloc[-1])
+    eps = round(price / (8 + seed % 20), 2)
+    return {
+        "symbol": symbol,
+        "shortName": f"STUB {symbol}",
+        "longName": f"Stub Holdings {symbol}",
+        "currency": "JPY",
+        "quoteType": "EQUITY",
+        "regularMarketPrice": price,
+        "trailingEps": eps,
+        "trailingPE": round(price / eps, 2),
+        "priceToBook": round(0.8 + (seed % 30) / 10, 2),
+        "sharesOutstanding": 100_000_000 + seed % 900_000_000,
+    }
+
+
+def _raw(value):
+    return {"raw": value, "fmt": str(value)}
+
+
+def quote_summary_payload(symbol: str) -> dict:
+    info = _info(symbol)
+    price = {
+        "symbol": symbol,
+        "shortName": info["shortName"],
+        "longName": info["longName"],
+        "currency": "JPY",
+        "quoteType": "EQUITY",
+        "regularMarketPrice": _raw(info["regularMarketPrice"]),
+    }
+    modules = {
+        "price": price,
+        "quoteType": {"symbol": symbol, "quoteType": "EQUITY"},
+        "summaryDetail": {"trailingPE": _raw(info["trailingPE"])},
+        "defaultKeyStatistics": {
+            "trailingEps": _raw(info["trailingEps"]),
+            "priceToBook": _raw(info["priceToBook"]),
+            "sharesOutstanding": _raw(info["sharesOutstanding"]),
+        },
+        "assetProfile": {"industry": "Stub", "sector": "Stub"},
+    }
+    return {"quoteSummary": {"result": [modules], "error": None}}
+
+
+def quote_payload(symbols: list[str]) -> dict:
+    return {"quoteResponse": {"result": [_info(s) for s in symbols], "error": None}}
+
+
+def timeseries_payload(symbol: str, types: list[str]) -> dict:
+    """Return a few periods of every requested statement line item."""
+    rng = np.random.default_rng(_seed(symbol))
+    base = float(rng.integers(10**11, 10**13))
+    today = datetime.now(timezone.utc).date()
+    results = []
+    for name in types:
+        quarterly = name.startswith("quarterly")
+        count, step = (5, 1) if quarterly else (4, 4)
+        dates = [
+            (pd.Timestamp(today) - pd.offsets.QuarterEnd(1 + step * i)).date()
+            for i in range(count)
+        ][::-1]
+        if "Revenue" in name:
+            share = 1.0
+        else:
+            share = 0.05 + (zlib.crc32(name.encode()) % 20) / 100
+        scale = 0.25 if quarterly else 1.0
+        values = [
+            {
+                "asOfDate": str(d),
+                "periodType": "3M" if quarterly else "12M",
+                "currencyCode": "JPY",
+                "reportedValue": _raw(round(base * share * scale * (1 + 0.02 * i))),
+            }
+            for i, d in enumerate(dates)
+        ]
+        results.append(
+            {
+                "meta": {"symbol": [symbol], "type": [name]},
+                "timestamp": [
+                    int(pd.Timestamp(d, tz="UTC").timestamp()) for d in dates
+                ],
+                name: values,
+            }
+        )
+    return {"timeseries": {"result": results, "error": None}}
+
+
+def gemini_payload() -> dict:
+    return {
+        "candidates": [
+            {
+                "content": {"parts": [{"text": REPORT_TEXT}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }
+        ],
+        "usageMetadata": {"promptTokenCount": 1, "totalTokenCount": 1},
+    }
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    """Route Yahoo Finance and Gemini requests to the synthetic payloads."""
+
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body, content_type="application/json", headers=()):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path
+        if match := re.fullmatch(r"/v8/finance/chart/([^/]+)", path):
+            return 200, chart_payload(match.group(1), params)
+        if match := re.fullmatch(r"/v10/finance/quoteSummary/([^/]+)", path):
+            return 200, quote_summary_payload(match.group(1))
+        if path == "/v7/finance/quote":
+            return 200, quote_payload(params.get("symbols", "").split(","))
+        timeseries = r"/ws/fundamentals-timeseries/.*/timeseries/([^/]+)"
+        if match := re.fullmatch(timeseries, path):
+            return 200, timeseries_payload(
+                match.group(1), params.get("type", "").split(",")
+            )
+        if re.fullmatch(r"/v1beta/models/[^/]+:generateContent", path):
+            return 200, gemini_payload()
+        if path == "/v1/test/getcrumb":
+            return 200, b"stub-crumb"
+        if path in ("", "/"):
+            return 200, b""
+        return 404, {"error": f"not stubbed: {path}"}
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if self.latency:
+            time.sleep(self.latency)
+        status, body = self._route()
+        if isinstance(body, bytes):
+            self._send(
+                status, body, "text/plain", [("Set-Cookie", "A3=stub; Path=/")]
+            )
+        else:
+            self._send(status, body)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+def start_stub_server(
+    latency: float = 0.0, host: str = "127.0.0.1", port: int = 0
+) -> tuple[ThreadingHTTPServer, str]:
+    """Serve the stand-in from a daemon thread; return it and its base URL.
+
+    ``latency`` seconds are slept before every response.
+    """
+    handler = type("Handler", (StubUpstreamHandler,), {"latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
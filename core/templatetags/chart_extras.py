@@ -0,0 +1,18 @@
+from django import template
+
+from core.downsample import CHART_RANGES
+
+register = template.Library()
+
+RANGE_LABELS = {"mo": "M", "y": "Y", "max": "Max"}
+
+
+@register.simple_tag
+def chart_ranges():
+    """Return ``(label, range)`` pairs for the chart range buttons."""
+    pairs = []
+    for chart_range in CHART_RANGES:
+        suffix = chart_range.lstrip("0123456789")
+        label = chart_range[: len(chart_range) - len(suffix)] + RANGE_LABELS[suffix]
+        pairs.append((label, chart_range))
+    return pairs
@@ -0,0 +1,188 @@
+import asyncio
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import django
+import pandas as pd
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import aio, views  # noqa: E402
+from core.analysis import daily_prices  # noqa: E402
+from core.models import Industry, Ticker  # noqa: E402
+from core.results import CandlestickResult  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+CHART_PAYLOAD = {
+    "chart": {
+        "result": [
+            {
+                "meta": {"exchangeTimezoneName": "Asia/Tokyo"},
+                # 2024-06-03 and 2024-06-04 09:00 JST
+                "timestamp": [1717372800, 1717459200],
+                "indicators": {
+                    "quote": [
+                        {
+                            "open": [100.0, 102.0],
+                            "high": [105.0, None],
+                            "low": [99.0, 101.0],
+                            "close": [104.0, 103.0],
+                            "volume": [1000, 2000],
+                        }
+                    ],
+                    "adjclose": [{"adjclose": [103.5, 103.0]}],
+                },
+            }
+        ],
+        "error": None,
+    }
+}
+
+
+def setUpModule():
+    # pytest runs without Django's test runner, so create the test database
+    global _old_db_name
+    _old_db_name = connection.creation.create_test_db(verbosity=0)
+
+
+def tearDownModule():
+    connection.creation.destroy_test_db(_old_db_name, verbosity=0)
+
+
+class ChartClientTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(SINGLE_FLIGHT_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_chart_payload_becomes_a_download_shaped_frame(self):
+        df = aio._chart_frame(CHART_PAYLOAD, "1d")
+        self.assertEqual(
+            list(df.columns), ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+        )
+        self.assertEqual(
+            list(df.index), [pd.Timestamp("2024-06-03"), pd.Timestamp("2024-06-04")]
+        )
+        self.assertEqual(df["Adj Close"].iloc[0], 103.5)
+        self.assertTrue(pd.isna(df["High"].iloc[1]))
+        self.assertTrue(aio._chart_frame({"chart": {"result": None}}, "1d").empty)
+
+    @patch("core.analysis.download")
+    def test_async_prices_are_coalesced_and_shared_with_the_sync_path(
+        self, mock_download
+    ):
+        async def slow_history(symbol, period):
+            await asyncio.sleep(0.1)
+            return SAMPLE_DF.copy()
+
+        async def fetch_many():
+            return await asyncio.gather(
+                *(aio.daily_prices("7203.T", "2y") for _ in range(5))
+            )
+
+        with patch("core.aio.chart_history", side_effect=slow_history) as mock_chart:
+            frames = asyncio.run(fetch_many())
+        self.assertEqual(mock_chart.call_count, 1)
+        self.assertTrue(all(len(f) == len(SAMPLE_DF) for f in frames))
+
+        self.assertEqual(len(daily_prices("7203.T", "2y")), len(SAMPLE_DF))
+        mock_download.assert_not_called()
+
+    @patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+    @patch("core.analysis.render_candlestick_chart", return_value="cG5n")
+    @patch("core.analysis.download")
+    def test_sync_and_async_histories_share_one_layout(
+        self, mock_download, mock_render, _
+    ):
+        # yf.download labels one ticker's columns (price, ticker), alphabetically
+        columns = sorted(SAMPLE_DF.columns)
+        mock_download.return_value = SAMPLE_DF[columns].set_axis(
+            pd.MultiIndex.from_product([columns, ["7203.T"]]), axis=1
+        )
+        synced = daily_prices("7203.T", "6mo")
+        cache.clear()
+        with patch("core.aio.chart_history", return_value=SAMPLE_DF.copy()):
+            fetched = asyncio.run(aio.daily_prices("7203.T", "6mo"))
+        pd.testing.assert_frame_equal(synced, fetched, check_freq=False)
+
+        # Whichever path filled the cache, the chart reads the real close
+        result = views.run_candlestick_analysis("7203", chart_range="6mo")
+        latest = result.latest.records()[-1]
+        self.assertAlmostEqual(latest["Close"], SAMPLE_DF["Close"].iloc[-1], delta=0.5)
+        plotted = mock_render.call_args.args[0]
+        self.assertEqual(plotted["Low"].iloc[-1], SAMPLE_DF["Low"].iloc[-1])
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        industry = Industry.objects.create(name="輸送用機器")
+        Ticker.objects.create(code="7203", name="トヨタ自動車", industry=industry)
+        Ticker.objects.create(code="7267", name="ホンダ", industry=industry)
+        cls.industry = industry
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    async def test_listing_and_search_endpoints(self):
+        response = await self.async_client.get("/api/industries/")
+        self.assertEqual(response.json(), [{"id": self.industry.pk, "name": "輸送用機器"}])
+
+        response = await self.async_client.get(
+            f"/api/industries/{self.industry.pk}/tickers/"
+        )
+        self.assertEqual([t["code"] for t in response.json()], ["7203", "7267"])
+        response = await self.async_client.get("/api/industries/999/tickers/")
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get("/api/tickers/search/?q=ホンダ")
+        self.assertEqual(response.json(), [{"code": "7267", "name": "ホンダ"}])
+        response = await self.async_client.post("/api/tickers/search/")
+        self.assertEqual(response.status_code, 405)
+
+    @patch("core.views.generate_analyst_report_async", new_callable=AsyncMock)
+    @patch("core.views._load_and_format_financials", return_value="<table></table>")
+    @patch("core.views.run_predictions", return_value=None)
+    @patch("core.views.run_candlestick_analysis")
+    async def test_afetch_data_runs_stages_on_prefetched_prices(
+        self, mock_candle, mock_predict, mock_fin, mock_report
+    ):
+        mock_candle.return_value = CandlestickResult("7203", "chart", None)
+        mock_report.return_value = "**買い**"
+        with patch(
+            "core.aio.daily_prices", new=AsyncMock(return_value=SAMPLE_DF.copy())
+        ):
+            data = await views.afetch_data("7203")
+
+        self.assertIs(mock_candle.call_args.kwargs["prices"].empty, False)
+        self.assertEqual(len(mock_predict.call_args.kwargs["prices"]), len(SAMPLE_DF))
+        self.assertEqual(data["chart_data"], "chart")
+        self.assertEqual(data["gemini_report_html"], "<p><strong>買い</strong></p>\n")
+        self.assertNotIn("prices", data)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    async def test_sync_api_views_run_on_the_blocking_pool(self):
+        threads = []
+
+        def heatmap(period):
+            threads.append(threading.current_thread().name)
+            return {"period": period, "sectors": []}
+
+        cache.clear()
+        with patch("core.views.sector_heatmap", side_effect=heatmap):
+            response = await self.async_client.get("/api/sectors/heatmap/")
+        self.assertEqual(response.json()["period"], "1mo")
+        self.assertTrue(threads[0].startswith("async-blocking"), threads)
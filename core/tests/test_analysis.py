@@ -6,11 +6,22 @@ from pathlib import Path
 
 import django
 import pandas as pd
-from django.test import TestCase
+from django.test import TransactionTestCase, override_settings
 from django.urls import reverse
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
-from core.analysis import analyze_stock_candlestick, predict_future_moves
+from lightgbm import LGBMClassifier
+from sklearn.model_selection import TimeSeriesSplit
+
+from core.analysis import (
+    MODEL_PARAMS,
+    analyze_stock_candlestick,
+    predict_future_moves,
+    run_candlestick_analysis,
+    run_predictions,
+)
+from core.features import FEATURE_COLUMNS, add_targets, build_feature_frame
+from core.results import CandlestickResult
 
 # --- Django 環境設定 (この後にコードは書かない) ---
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myapp.settings')
@@ -29,7 +40,10 @@ sys.modules.setdefault(
 # ダミーの gemini_analyzer モジュール
 sys.modules.setdefault(
     'core.gemini_analyzer',
-    types.SimpleNamespace(generate_analyst_report=lambda *a, **k: ""),
+    types.SimpleNamespace(
+        generate_analyst_report=lambda *a, **k: "",
+        generate_analyst_report_async=AsyncMock(return_value=""),
+    ),
 )
 
 # --- テスト用サンプルデータ準備 ---
@@ -39,16 +53,15 @@ SAMPLE_FUND = pd.DataFrame(
     {"eps": 0.1, "pe": 15.0, "pb": 1.0},
     index=SAMPLE_DF.index,
 )
+CHART_RESULT = CandlestickResult("7203", "chart_data_string", None)
+# The async view prefetches prices with the chart API; simulate a failure
+NO_CHART_HISTORY = AsyncMock(return_value=pd.DataFrame())
 
 
-from django.test import TestCase
-
-
-class AnalysisTests(TestCase):
+class AnalysisTests(TransactionTestCase):
     """core.analysis 関数と main_analysis ビューのテスト"""
 
-    @classmethod
-    def setUpTestData(cls):
+    def setUp(self):
         industry = Industry.objects.create(name="dummy")
         Ticker.objects.create(code="7203", name="Toyota", industry=industry)
         Ticker.objects.create(code="6758", name="Sony", industry=industry)
@@ -70,41 +83,77 @@ class AnalysisTests(TestCase):
             self.assertIn("予想方向", html)
             self.assertIn("期待リターン", html)
 
+    @patch("core.analysis._load_fundamentals", return_value=SAMPLE_FUND.copy())
+    @patch("core.analysis.yf.download", return_value=SAMPLE_DF.copy())
+    def test_structured_results(self, mock_download, mock_fund):
+        prediction = run_predictions("7203", horizons=[1, 7])
+        self.assertEqual(prediction.horizons.tolist(), [1, 7])
+        self.assertEqual(prediction.prob_up.shape, (2,))
+        records = prediction.records()
+        self.assertEqual(records[0]["予測日数"], 1)
+        self.assertIn(records[0]["予想方向"], ["UP", "DOWN"])
+
+        candle = run_candlestick_analysis("7203")
+        self.assertEqual(candle.latest.values.shape, (5, 5))
+        self.assertEqual(len(candle.latest.records()), 5)
+
+    @patch("core.analysis._load_fundamentals", return_value=SAMPLE_FUND.copy())
+    def test_shared_dataset_matches_separate_classifiers(self, mock_fund):
+        """ラベル差し替えの共有 Dataset が個別学習と同じ確率を返す"""
+        horizons = [1, 3, 7]
+        prediction = run_predictions("7203", horizons=horizons, prices=SAMPLE_DF)
+
+        df = add_targets(
+            build_feature_frame(SAMPLE_DF.copy(), SAMPLE_FUND.copy()), horizons
+        )
+        target_cols = [f"target_{h}" for h in horizons]
+        return_cols = [f"future_return_{h}" for h in horizons]
+        df = df[FEATURE_COLUMNS + target_cols + return_cols].dropna()
+        *_, (train_index, _) = TimeSeriesSplit(n_splits=5).split(df)
+        X = df[FEATURE_COLUMNS].to_numpy()
+        for h, prob in zip(horizons, prediction.prob_up):
+            model = LGBMClassifier(**{**MODEL_PARAMS, "verbose": -1})
+            model.fit(X[train_index], df[f"target_{h}"].to_numpy()[train_index])
+            self.assertAlmostEqual(prob, model.predict_proba(X[-1:])[0, 1])
+
+    @patch("core.aio.chart_history", new=NO_CHART_HISTORY)
     @patch("core.views._load_and_format_financials", return_value="")
-    @patch("core.views.predict_future_moves", return_value=("<table></table>", None))
-    @patch("core.views.analyze_stock_candlestick")
+    @patch("core.views.run_predictions", return_value=None)
+    @patch("core.views.run_candlestick_analysis")
     def test_main_analysis_view_with_one_ticker(
         self, mock_analyze, mock_predict, mock_fin
     ):
-        mock_analyze.return_value = ("chart_data_string", "<table></table>", None)
+        mock_analyze.return_value = CHART_RESULT
         url = reverse("main_analysis") + "?ticker1=7203"
         response = self.client.get(url, HTTP_HOST="localhost")
         self.assertEqual(response.status_code, 200)
-        mock_analyze.assert_called_once_with("7203")
+        mock_analyze.assert_called_once_with("7203", prices=None)
         self.assertIn("chart_data_string", response.content.decode())
 
+    @patch("core.aio.chart_history", new=NO_CHART_HISTORY)
     @patch("core.views._load_and_format_financials", return_value="")
-    @patch("core.views.predict_future_moves", return_value=("<table></table>", None))
-    @patch("core.views.analyze_stock_candlestick")
+    @patch("core.views.run_predictions", return_value=None)
+    @patch("core.views.run_candlestick_analysis")
     def test_main_view_handles_two_tickers(
         self, mock_analyze, mock_predict, mock_fin
     ):
-        mock_analyze.return_value = ("chart_data_string", "<table></table>", None)
+        mock_analyze.return_value = CHART_RESULT
         url = reverse("main_analysis") + "?ticker1=7203&ticker2=6758"
         response = self.client.get(url, HTTP_HOST="localhost")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(mock_analyze.call_count, 2)
-        mock_analyze.assert_any_call("7203")
-        mock_analyze.assert_any_call("6758")
+        mock_analyze.assert_any_call("7203", prices=None)
+        mock_analyze.assert_any_call("6758", prices=None)
         self.assertEqual(mock_predict.call_count, 2)
 
+    @patch("core.aio.chart_history", new=NO_CHART_HISTORY)
     @patch("core.views._load_and_format_financials")
-    @patch("core.views.predict_future_moves", return_value=("<table></table>", None))
-    @patch("core.views.analyze_stock_candlestick")
+    @patch("core.views.run_predictions", return_value=None)
+    @patch("core.views.run_candlestick_analysis")
     def test_main_view_shows_quarter_and_annual_financials(
         self, mock_analyze, mock_predict, mock_fin
     ):
-        mock_analyze.return_value = ("chart_data_string", "<table></table>", None)
+        mock_analyze.return_value = CHART_RESULT
         mock_fin.side_effect = [
             "<h3>Quarterly Financials</h3><table></table>",
             "<h3>Annual Financials</h3><table></table>",
@@ -115,3 +164,30 @@ class AnalysisTests(TestCase):
         content = response.content.decode()
         self.assertIn("Quarterly Financials", content)
         self.assertIn("Annual Financials", content)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    @patch("core.aio.chart_history", new=NO_CHART_HISTORY)
+    @patch(
+        "core.views._load_and_format_financials",
+        return_value="<h3>Quarterly Financials</h3>",
+    )
+    @patch("core.views.run_predictions", return_value=None)
+    @patch("core.views.run_candlestick_analysis")
+    async def test_main_view_streams_sections_in_order(
+        self, mock_analyze, mock_predict, mock_fin
+    ):
+        mock_analyze.return_value = CHART_RESULT
+        url = reverse("main_analysis") + "?ticker1=7203&stream=1"
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        chunks = [c.decode() async for c in response.streaming_content]
+        self.assertIn('id="data1-chart"', chunks[0])
+        self.assertNotIn("chart_data_string", chunks[0])
+        content = "".join(chunks)
+        self.assertLess(
+            content.index('streamFill("data1-financials")'),
+            content.index('streamFill("data1-chart")'),
+        )
+        self.assertIn("chart_data_string", content)
+        self.assertTrue(content.rstrip().endswith("</html>"))
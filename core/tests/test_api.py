@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.api import model_version  # noqa: E402
+from core.results import CandlestickResult, PredictionResult  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+PREDICTION = PredictionResult(
+    "7203", np.array([1]), np.array([0.6]), np.array([0.01])
+)
+
+
+@patch("core.api.generate_analyst_report", return_value="# report")
+@patch("core.api.get_company_name", return_value="トヨタ自動車")
+@patch("core.api.financial_records", return_value=[])
+@patch("core.api.run_predictions", return_value=PREDICTION)
+@patch(
+    "core.api.run_candlestick_analysis",
+    return_value=CandlestickResult("7203", "chart", None),
+)
+@patch("core.api.download", return_value=SAMPLE_DF.copy())
+class AnalysisAPITests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # An empty Ticker table accepts every well-formed code without the DB
+        patcher = patch("core.tickers.ticker_names", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("api-analysis", args=["7203"])
+
+    def test_returns_json_with_etag(self, *mocks):
+        response = self.client.get(self.url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        data = response.json()
+        self.assertEqual(data["last_bar_date"], "2022-03-01")
+        self.assertEqual(data["predictions"][0]["予想方向"], "UP")
+        self.assertEqual(data["report"], "# report")
+
+    def test_if_none_match_skips_recomputation(self, mock_download, mock_candle, *_):
+        first = self.client.get(self.url, HTTP_HOST="localhost")
+        mock_candle.reset_mock()
+        second = self.client.get(
+            self.url, HTTP_HOST="localhost", HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+        mock_candle.assert_not_called()
+        # Weak comparison: the strong form of the tag matches too
+        third = self.client.get(
+            self.url,
+            HTTP_HOST="localhost",
+            HTTP_IF_NONE_MATCH=first["ETag"].removeprefix("W/"),
+        )
+        self.assertEqual(third.status_code, 304)
+
+    def test_report_and_financials_are_not_cached_under_the_etag(
+        self, mock_download, mock_candle, mock_predict, mock_fin, mock_name, mock_report
+    ):
+        first = self.client.get(self.url, HTTP_HOST="localhost")
+        mock_report.return_value = "# revised"
+        second = self.client.get(self.url, HTTP_HOST="localhost")
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.json()["report"], "# revised")
+        self.assertEqual(mock_candle.call_count, 1)
+        self.assertEqual(mock_predict.call_count, 1)
+        self.assertEqual(mock_fin.call_count, 4)
+
+    def test_field_selection_limits_work(self, mock_download, mock_candle, *mocks):
+        mock_predict = mocks[0]
+        response = self.client.get(
+            self.url + "?fields=financials", HTTP_HOST="localhost"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("financials", response.json())
+        self.assertNotIn("predictions", response.json())
+        mock_candle.assert_not_called()
+        mock_predict.assert_not_called()
+
+    def test_unknown_field_is_rejected(self, *mocks):
+        response = self.client.get(self.url + "?fields=nope", HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 400)
+
+
+class ModelVersionTests(SimpleTestCase):
+    @override_settings(PREDICTION_MODEL="stored")
+    @patch("core.api.tuned_at", return_value="2026-10-01T00:00:00")
+    @patch("core.api.load_ticker_model")
+    def test_stored_model_and_tuning_runs_change_the_version(
+        self, mock_model, mock_tuned
+    ):
+        mock_model.return_value = {"updated_at": "2026-10-16T18:00:00"}
+        first = model_version("7203")
+        mock_model.return_value = {"updated_at": "2026-10-17T18:00:00"}
+        second = model_version("7203")
+        mock_tuned.return_value = "2026-10-18T00:00:00"
+        third = model_version("7203")
+        self.assertEqual(len({first, second, third}), 3)
+        mock_model.assert_called_with("7203")
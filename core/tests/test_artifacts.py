@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+import django
+from django.test import SimpleTestCase
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.artifacts import load_cached_artifact, save_artifact  # noqa: E402
+
+
+class ArtifactTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "models", "artifact.joblib")
+
+    def test_missing_file_is_none(self):
+        self.assertIsNone(load_cached_artifact(self.path))
+
+    def test_cached_until_the_file_changes(self):
+        save_artifact(self.path, {"version": 1})
+        first = load_cached_artifact(self.path)
+        self.assertIs(load_cached_artifact(self.path), first)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["artifact.joblib"])
+
+        save_artifact(self.path, {"version": 2})
+        mtime = os.path.getmtime(self.path) + 1
+        os.utime(self.path, (mtime, mtime))
+        self.assertEqual(load_cached_artifact(self.path), {"version": 2})
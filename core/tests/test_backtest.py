@@ -0,0 +1,55 @@
+import os
+from io import StringIO
+from pathlib import Path
+
+import django
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.backtest import signal_metrics  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+
+
+class SignalMetricsTests(SimpleTestCase):
+    def test_metrics_on_known_signals(self):
+        prob = np.array([np.nan, 0.9, 0.2, 0.8, 0.7])
+        future = np.array([0.01, 0.10, -0.05, -0.10, 0.02])
+        metrics = signal_metrics(prob, future, horizon=1)
+        self.assertEqual(metrics["signals"], 4)
+        self.assertAlmostEqual(metrics["hit_rate"], 0.75)
+        # long, short, long, long
+        expected = np.prod([1.10, 1.05, 0.90, 1.02]) - 1
+        self.assertAlmostEqual(metrics["total_return"], expected)
+        self.assertAlmostEqual(metrics["max_drawdown"], -0.10)
+        self.assertAlmostEqual(metrics["turnover"], (1 + 2 + 2 + 0) / 4)
+
+    def test_horizon_trades_do_not_overlap(self):
+        prob = np.full(10, 0.9)
+        future = np.full(10, 0.01)
+        metrics = signal_metrics(prob, future, horizon=5)
+        self.assertEqual(metrics["trades"], 2)
+
+
+class BacktestCommandTests(SimpleTestCase):
+    def test_runs_offline_against_fixture(self):
+        out = StringIO()
+        call_command(
+            "backtest",
+            "7203",
+            csv=str(FIXTURE_PATH),
+            horizons=[1],
+            min_train=10,
+            step=5,
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn("7203", output)
+        self.assertIn("hit_rate", output)
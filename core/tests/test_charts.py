@@ -0,0 +1,58 @@
+import base64
+import os
+from io import BytesIO
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+import ta
+from django.test import SimpleTestCase
+from PIL import Image
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import charts  # noqa: E402
+from core.charts import render_candlestick_chart, render_line_chart  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+def _size(chart_data):
+    return Image.open(BytesIO(base64.b64decode(chart_data))).size
+
+
+class ChartTemplateTests(SimpleTestCase):
+    def test_line_template_is_reused_and_updated_in_place(self):
+        close = SAMPLE_DF["Close"]
+        first = render_line_chart(
+            SAMPLE_DF.index, [("Close", close), ("MA5", close.rolling(5).mean())]
+        )
+        template = charts._local.templates["line"]
+        second = render_line_chart(SAMPLE_DF.index[:20], [("Close", close[:20])])
+        self.assertIs(charts._local.templates["line"], template)
+        self.assertNotEqual(first, second)
+        visible = [line for line in template.lines if line.get_visible()]
+        self.assertEqual(len(visible), 1)
+        self.assertEqual(len(visible[0].get_xdata()), 20)
+
+    def test_candlestick_and_thumbnail(self):
+        close = SAMPLE_DF["Close"]
+        macd = ta.trend.macd(close)
+        rsi = ta.momentum.rsi(close)
+        full = render_candlestick_chart(SAMPLE_DF, macd, rsi, "7203.T")
+        thumb = render_candlestick_chart(SAMPLE_DF, macd, rsi, "7203.T", thumbnail=True)
+        self.assertEqual(_size(full), (2000, 1200))
+        self.assertEqual(_size(thumb), (600, 360))
+
+        template = charts._local.templates["candlestick"]
+        self.assertEqual(len(template.bodies.get_paths()), len(SAMPLE_DF))
+        low, high = template.ax_price.get_ylim()
+        self.assertLess(low, SAMPLE_DF["Low"].min())
+        self.assertGreater(high, SAMPLE_DF["High"].max())
+        self.assertTrue(np.isnan(template.macd_line.get_ydata()[0]))
@@ -0,0 +1,70 @@
+import os
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.comparison import correlation_matrix  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+class CorrelationTests(SimpleTestCase):
+    def test_matches_pandas_pairwise_correlation(self):
+        rng = np.random.default_rng(0)
+        returns = rng.normal(size=(50, 4))
+        returns[:10, 2] = np.nan
+        returns[40:, 3] = np.nan
+        expected = pd.DataFrame(returns).corr().to_numpy()
+        np.testing.assert_allclose(correlation_matrix(returns), expected)
+
+
+class CompareViewTests(SimpleTestCase):
+    def setUp(self):
+        # An empty Ticker table accepts every well-formed code without the DB
+        patcher = patch("core.tickers.ticker_names", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("core.comparison._load_and_format_financials", return_value="")
+    @patch("core.comparison.get_company_name", side_effect=lambda code: code)
+    @patch("core.comparison.run_predictions", return_value=None)
+    @patch("core.comparison.download_histories")
+    def test_compares_three_tickers_with_one_download(
+        self, mock_download, mock_predict, mock_name, mock_fin
+    ):
+        shifted = SAMPLE_DF * 1.5
+        mock_download.return_value = {
+            "7203.T": SAMPLE_DF,
+            "6758.T": shifted,
+            "9101.T": SAMPLE_DF.iloc[::-1].set_axis(SAMPLE_DF.index),
+        }
+        url = reverse("compare") + "?tickers=7203,6758,9101"
+        response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        mock_download.assert_called_once()
+        self.assertEqual(mock_predict.call_count, 3)
+        for call in mock_predict.call_args_list:
+            self.assertIsNotNone(call.kwargs["prices"])
+        content = response.content.decode()
+        self.assertIn("Return Correlation", content)
+        self.assertIn("<td>1.00</td>", content)
+
+    def test_rejects_too_many_tickers(self):
+        codes = ",".join(str(1000 + i) for i in range(20))
+        response = self.client.get(
+            reverse("compare") + f"?tickers={codes}", HTTP_HOST="localhost"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("alert-warning", response.content.decode())
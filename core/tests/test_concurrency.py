@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.analysis import run_candlestick_analysis, run_predictions  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+CODES = [str(1000 + i) for i in range(8)]
+
+
+def _prices(symbol, *args, **kwargs):
+    """Return a distinct price history per ticker."""
+    scale = 1 + CODES.index(symbol.removesuffix(".T")) / 10
+    df = SAMPLE_DF.copy()
+    df[["Open", "High", "Low", "Close", "Adj Close"]] *= scale
+    return df
+
+
+@patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+@patch("core.analysis.download", side_effect=_prices)
+class ConcurrentAnalysisTests(SimpleTestCase):
+    """Threaded runs must give exactly what sequential runs give."""
+
+    def _run_both(self, func):
+        sequential = [func(code) for code in CODES]
+        with ThreadPoolExecutor(max_workers=len(CODES)) as pool:
+            threaded = list(pool.map(func, CODES * 2))
+        return sequential * 2, threaded
+
+    def test_candlestick_charts_and_tables(self, mock_download, mock_fund):
+        sequential, threaded = self._run_both(run_candlestick_analysis)
+        for expected, result in zip(sequential, threaded):
+            self.assertEqual(result.ticker, expected.ticker)
+            self.assertIsNone(result.warning)
+            self.assertEqual(result.chart_data, expected.chart_data)
+            np.testing.assert_array_equal(
+                result.latest.values, expected.latest.values
+            )
+
+    def test_predictions(self, mock_download, mock_fund):
+        def predict(code):
+            return run_predictions(code, horizons=[1, 7])
+
+        sequential, threaded = self._run_both(predict)
+        for expected, result in zip(sequential, threaded):
+            self.assertEqual(result.ticker, expected.ticker)
+            np.testing.assert_allclose(result.prob_up, expected.prob_up)
+            np.testing.assert_allclose(
+                result.expected_return, expected.expected_return
+            )
@@ -0,0 +1,84 @@
+import os
+
+import django
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.downsample import aggregate_ohlc, candle_bars, lttb_indices  # noqa: E402
+
+
+def _daily(days, start="2000-01-03"):
+    rng = np.random.default_rng(0)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    return pd.DataFrame(
+        {
+            "Open": close * 0.99,
+            "High": close * 1.02,
+            "Low": close * 0.97,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": 1000.0,
+        },
+        index=pd.bdate_range(start, periods=days),
+    )
+
+
+class DownsampleTests(SimpleTestCase):
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        y = np.sin(np.linspace(0, 20, 5000))
+        y[1234] = 10.0
+        y[4321] = np.nan
+        indices = lttb_indices(np.arange(5000), y, 200)
+        self.assertEqual(len(indices), 200)
+        self.assertEqual((indices[0], indices[-1]), (0, 4999))
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(1234, indices)
+        self.assertNotIn(4321, indices)
+        np.testing.assert_array_equal(
+            lttb_indices(np.arange(10), y[:10], 50), range(10)
+        )
+
+    def test_weekly_and_monthly_candles(self):
+        daily = _daily(10)[["Open", "High", "Low", "Close", "Volume"]]
+        weekly = aggregate_ohlc(daily, "W")
+        self.assertEqual(
+            [str(d.date()) for d in weekly.index], ["2000-01-07", "2000-01-14"]
+        )
+        first_week = daily.iloc[:5]
+        self.assertEqual(weekly["Open"].iloc[0], first_week["Open"].iloc[0])
+        self.assertEqual(weekly["High"].iloc[0], first_week["High"].max())
+        self.assertEqual(weekly["Low"].iloc[0], first_week["Low"].min())
+        self.assertEqual(weekly["Close"].iloc[0], first_week["Close"].iloc[-1])
+        self.assertEqual(weekly["Volume"].iloc[0], 5000.0)
+
+        self.assertEqual(candle_bars(daily, 300)[1], "D")
+        self.assertEqual(candle_bars(_daily(1300), 300)[1], "W")
+        bars, freq = candle_bars(_daily(2600), 300)
+        self.assertEqual(freq, "M")
+        self.assertLessEqual(len(bars), 300)
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    @patch("core.tickers.ticker_names", return_value={})
+    @patch("core.analysis.render_candlestick_chart", return_value="cG5n")
+    @patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+    @patch("core.analysis.daily_prices", return_value=_daily(6000))
+    def test_chart_endpoint_draws_long_ranges_with_coarse_candles(
+        self, mock_prices, mock_fund, mock_render, mock_names
+    ):
+        url = reverse("api-chart", args=["7203"])
+        response = self.client.get(url, {"range": "max"})
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response.content, b"png")
+        mock_prices.assert_called_once_with("7203.T", "max")
+        self.assertLessEqual(len(mock_render.call_args.args[0]), 300)
+        self.assertIn("Monthly", mock_render.call_args.kwargs["title"])
+        self.assertEqual(self.client.get(url, {"range": "3d"}).status_code, 400)
@@ -0,0 +1,154 @@
+import asyncio
+import io
+import os
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+
+import django
+import pandas as pd
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.export import (  # noqa: E402
+    EXPORT_COLUMNS,
+    csv_chunks,
+    export_frames,
+    parquet_available,
+    parquet_chunks,
+    universe,
+)
+from core.models import Industry, Ticker  # noqa: E402
+from core.results import PredictionResult  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+def setUpModule():
+    # pytest runs without Django's test runner, so create the test database
+    global _old_db_name
+    _old_db_name = connection.creation.create_test_db(verbosity=0)
+
+
+def tearDownModule():
+    connection.creation.destroy_test_db(_old_db_name, verbosity=0)
+
+
+def _histories(symbols, period):
+    return {s: SAMPLE_DF.copy() for s in symbols if s != "9999.T"}
+
+
+def _predictions(code, prices=None, fundamentals=None):
+    return PredictionResult.from_estimates(
+        code, [(1, 0.7, 0.01, -0.01), (7, 0.4, 0.02, -0.03)]
+    )
+
+
+def _body(response):
+    async def read():
+        return b"".join([part async for part in response])
+
+    return asyncio.run(read())
+
+
+@patch("core.export.run_predictions", side_effect=_predictions)
+@patch("core.export._load_fundamentals", return_value=pd.DataFrame())
+@patch("core.export.download_histories", side_effect=_histories)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        autos = Industry.objects.create(name="輸送用機器")
+        tech = Industry.objects.create(name="電気機器")
+        Ticker.objects.create(code="7203", name="トヨタ自動車", industry=autos)
+        Ticker.objects.create(code="7267", name="ホンダ", industry=autos)
+        Ticker.objects.create(code="6758", name="ソニーグループ", industry=tech)
+        Ticker.objects.create(code="9999", name="上場廃止", industry=tech)
+        cls.autos = autos
+
+    def test_frames_are_built_chunk_by_chunk(self, mock_download, mock_fund, _):
+        frames = list(export_frames(universe(), chunk_size=2, workers=2))
+        self.assertEqual(mock_download.call_count, 2)
+        # One statements lookup per exported ticker, shared with its predictions
+        self.assertEqual(mock_fund.call_count, 3)
+        self.assertEqual(
+            [list(f["code"]) for f in frames], [["6758", "7203"], ["7267"]]
+        )
+        row = frames[0].iloc[1]
+        self.assertEqual(row["industry"], "輸送用機器")
+        self.assertAlmostEqual(row["close"], SAMPLE_DF["Close"].iloc[-1])
+        self.assertAlmostEqual(row["prob_up_1d"], 0.7)
+        self.assertAlmostEqual(row["exp_return_7d"], -0.03)
+        self.assertTrue(pd.isna(row["prob_up_28d"]))
+
+    @skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_parquet_has_one_row_group_per_chunk(self, *_):
+        import pyarrow.parquet as pq
+
+        chunks = list(parquet_chunks(export_frames(universe(), chunk_size=1)))
+        data = io.BytesIO(b"".join(chunks))
+        self.assertEqual(pq.ParquetFile(data).num_row_groups, 3)
+        self.assertEqual(list(pd.read_parquet(data).columns), EXPORT_COLUMNS)
+
+    def test_failing_ticker_is_skipped(self, mock_download, mock_fund, mock_predict):
+        mock_predict.side_effect = lambda code, **_: (
+            1 / 0 if code == "7203" else _predictions(code)
+        )
+        with self.assertLogs("core.export", "ERROR"):
+            frames = list(export_frames(universe(), chunk_size=10))
+        self.assertEqual(list(frames[0]["code"]), ["6758", "7267"])
+
+    def test_endpoint_serves_the_written_file(self, *_):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with override_settings(ALLOWED_HOSTS=["testserver"], EXPORT_DIR=tmp.name):
+            url = reverse("api-export")
+            self.assertEqual(self.client.get(url).status_code, 404)
+            call_command("export_universe", stdout=io.StringIO())
+            with patch("core.export.export_frames") as mock_frames:
+                response = self.client.get(url, {"industry": self.autos.pk})
+            mock_frames.assert_not_called()
+            self.assertIn("Last-Modified", response)
+            self.assertTrue(response.is_async)
+            frame = pd.read_csv(io.BytesIO(_body(response)), dtype={"code": str})
+            self.assertEqual(list(frame["code"]), ["7203", "7267"])
+            full = self.client.get(url)
+            written = Path(tmp.name, "universe.csv").read_bytes()
+            self.assertEqual(_body(full), written)
+            self.assertEqual(full["Content-Length"], str(len(written)))
+            bad = self.client.get(url, {"format": "xlsx"})
+            self.assertEqual(bad.status_code, 400)
+
+    @skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_endpoint_filters_parquet_by_industry(self, *_):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with override_settings(ALLOWED_HOSTS=["testserver"], EXPORT_DIR=tmp.name):
+            call_command("export_universe", "--format", "parquet", stdout=io.StringIO())
+            response = self.client.get(
+                reverse("api-export"), {"format": "parquet", "industry": self.autos.pk}
+            )
+        frame = pd.read_parquet(io.BytesIO(_body(response)))
+        self.assertEqual(list(frame["code"]), ["7203", "7267"])
+        self.assertEqual(list(frame.columns), EXPORT_COLUMNS)
+
+    def test_command_writes_csv(self, *_):
+        out = io.StringIO()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "universe.csv")
+        call_command("export_universe", path, "--chunk-size", "3", stdout=out)
+        self.assertIn("Exported 3 of 4 tickers", out.getvalue())
+        with open(path, "rb") as f:
+            self.assertEqual(
+                f.read(), b"".join(csv_chunks(export_frames(universe(), 3)))
+            )
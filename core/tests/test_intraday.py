@@ -0,0 +1,114 @@
+import os
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+import ta
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import intraday  # noqa: E402
+from core.intraday import BAR_FIELDS, INDICATOR_FIELDS, BarBuffer  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+def _column(buffer, name, bars=None):
+    _, data = buffer.snapshot(bars)
+    return data[:, (BAR_FIELDS + INDICATOR_FIELDS).index(name)]
+
+
+class BarBufferTests(SimpleTestCase):
+    def test_incremental_indicators_match_ta(self):
+        buffer = BarBuffer(100)
+        buffer.extend(SAMPLE_DF)
+        close = SAMPLE_DF["Close"]
+        macd = ta.trend.MACD(close)
+        expected = {
+            "ma5": close.rolling(5).mean(),
+            "ma25": close.rolling(25).mean(),
+            "macd": macd.macd(),
+            "macd_signal": macd.macd_signal(),
+            "rsi": ta.momentum.RSIIndicator(close).rsi(),
+        }
+        for name, series in expected.items():
+            np.testing.assert_allclose(
+                _column(buffer, name), series.to_numpy(), err_msg=name
+            )
+
+    def test_ring_keeps_newest_bars_and_rolling_window(self):
+        buffer = BarBuffer(10)
+        buffer.extend(SAMPLE_DF)
+        stamps, _ = buffer.snapshot()
+        self.assertEqual(buffer.size, 10)
+        self.assertEqual(
+            stamps.tolist(),
+            (SAMPLE_DF.index[-10:].asi8 // 1_000_000_000).tolist(),
+        )
+        np.testing.assert_allclose(
+            _column(buffer, "ma25"),
+            SAMPLE_DF["Close"].rolling(25).mean().to_numpy()[-10:],
+        )
+
+    def test_forming_bar_is_replaced_not_appended(self):
+        buffer = BarBuffer(100)
+        buffer.extend(SAMPLE_DF.iloc[:-1])
+        forming = SAMPLE_DF.iloc[[-1]].copy()
+        forming["Close"] += 50
+        buffer.extend(forming)
+        added = buffer.extend(SAMPLE_DF.iloc[[-1]])
+        self.assertEqual(added, 0)
+        self.assertEqual(buffer.size, len(SAMPLE_DF))
+        fresh = BarBuffer(100)
+        fresh.extend(SAMPLE_DF)
+        np.testing.assert_allclose(buffer.snapshot()[1], fresh.snapshot()[1])
+
+
+@override_settings(INTRADAY_BUFFER_BARS=100)
+class IntradayViewTests(SimpleTestCase):
+    def setUp(self):
+        intraday._buffers.clear()
+        intraday._last_refresh.clear()
+        # An empty Ticker table accepts every well-formed code without the DB
+        patcher = patch("core.tickers.ticker_names", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("core.intraday.data_can_change", return_value=True)
+    @patch("core.intraday.download")
+    def test_later_requests_fetch_only_new_bars(self, mock_download, mock_hours):
+        mock_download.return_value = SAMPLE_DF.iloc[:-5]
+        url = reverse("api-intraday", args=["7203"]) + "?interval=1m&bars=3"
+        response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_download.call_args.kwargs["period"], "5d")
+
+        intraday._last_refresh.clear()
+        mock_download.return_value = SAMPLE_DF.iloc[-6:]
+        response = self.client.get(url, HTTP_HOST="localhost")
+        start = mock_download.call_args.kwargs["start"]
+        self.assertEqual(start.tz_convert(None), SAMPLE_DF.index[-6])
+        data = response.json()
+        self.assertEqual(len(data["bars"]["t"]), 3)
+        self.assertAlmostEqual(
+            data["bars"]["close"][-1], SAMPLE_DF["Close"].iloc[-1], places=3
+        )
+        self.assertEqual(len(data["latest"]), 5)
+
+        # Within the same bar the buffer is served without a download
+        self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(mock_download.call_count, 2)
+
+    def test_rejects_unknown_interval(self):
+        url = reverse("api-intraday", args=["7203"]) + "?interval=1h"
+        response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 400)
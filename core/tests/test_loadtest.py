@@ -0,0 +1,64 @@
+import os
+
+import django
+from curl_cffi import requests as curl_requests
+from django.test import SimpleTestCase
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import market_data  # noqa: E402
+from core.loadtest import endpoint_paths, run_load  # noqa: E402
+from core.stub_upstream import start_stub_server, synthetic_history  # noqa: E402
+
+
+class StubUpstreamTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server, cls.url = start_stub_server(latency=0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        super().tearDownClass()
+
+    def test_yfinance_downloads_synthetic_bars_through_the_stand_in(self):
+        session = market_data._RoutedSession(self.url, impersonate="chrome")
+        with patch.object(market_data, "_yahoo_session", session):
+            df = market_data._download(
+                "7203.T", {"period": "6mo", "auto_adjust": False, "progress": False}
+            )
+        self.assertGreater(len(df), 100)
+        expected = synthetic_history("7203.T")["close"].iloc[-1]
+        self.assertAlmostEqual(float(df["Close"].iloc[-1].squeeze()), expected)
+
+    def test_gemini_and_unknown_paths(self):
+        response = curl_requests.post(
+            f"{self.url}/v1beta/models/gemini-1.5-flash:generateContent", json={}
+        )
+        text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        self.assertIn("投資判断", text)
+        self.assertEqual(curl_requests.get(f"{self.url}/nope").status_code, 404)
+
+    def test_run_load_reports_throughput_and_percentiles(self):
+        results = run_load(
+            self.url, ["industries"], ["7203"], requests=20, concurrency=5
+        )
+        row = results.iloc[0]
+        self.assertEqual(row["requests"], 20)
+        # The stand-in does not serve the app's own URLs
+        self.assertEqual(row["errors"], 20)
+        self.assertGreaterEqual(row["p50_ms"], 50)
+        self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+        self.assertGreater(row["rps"], 0)
+
+    def test_endpoint_paths_rotate_tickers(self):
+        self.assertEqual(
+            endpoint_paths("api-analysis", ["7203", "6758"]),
+            ["/api/v1/analysis/7203/", "/api/v1/analysis/6758/"],
+        )
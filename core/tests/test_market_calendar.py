@@ -0,0 +1,128 @@
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+import django
+import pandas as pd
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.analysis import daily_prices  # noqa: E402
+from core.market_calendar import (  # noqa: E402
+    TOKYO,
+    cache_timeout,
+    changed_between,
+    data_can_change,
+    is_trading_day,
+    is_trading_hours,
+    national_holidays,
+    next_data_change,
+    next_session_open,
+    sessions,
+)
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+def _at(*args):
+    return datetime(*args, tzinfo=TOKYO)
+
+
+class HolidayTests(SimpleTestCase):
+    def test_national_holidays_2024(self):
+        holidays = national_holidays(2024)
+        expected = [
+            date(2024, 1, 8),  # 成人の日
+            date(2024, 2, 12),  # 振替休日 for 建国記念の日
+            date(2024, 3, 20),  # 春分の日
+            date(2024, 5, 6),  # 振替休日 for こどもの日
+            date(2024, 9, 16),  # 敬老の日
+            date(2024, 9, 22),  # 秋分の日
+            date(2024, 9, 23),  # 振替休日
+            date(2024, 11, 4),  # 振替休日 for 文化の日
+        ]
+        for day in expected:
+            self.assertIn(day, holidays)
+        self.assertEqual(len(holidays), 21)
+
+    def test_citizens_holiday_and_olympic_moves(self):
+        self.assertEqual(national_holidays(2026)[date(2026, 9, 22)], "国民の休日")
+        self.assertIn(date(2021, 7, 23), national_holidays(2021))
+        self.assertNotIn(date(2021, 10, 11), national_holidays(2021))
+
+    def test_trading_days(self):
+        self.assertFalse(is_trading_day(date(2024, 12, 31)))
+        self.assertFalse(is_trading_day(date(2025, 1, 3)))
+        self.assertTrue(is_trading_day(date(2025, 1, 6)))
+        self.assertFalse(is_trading_day(date(2024, 5, 11)))
+
+    @override_settings(
+        TSE_EXTRA_HOLIDAYS=["2020-10-01"], TSE_HALF_DAYS=["2024-05-13"]
+    )
+    def test_configured_closures_and_half_days(self):
+        self.assertFalse(is_trading_day(date(2020, 10, 1)))
+        self.assertEqual(len(sessions(date(2024, 5, 13))), 1)
+
+
+@override_settings(TSE_DATA_DELAY_MINUTES=20)
+class SessionTests(SimpleTestCase):
+    def test_sessions(self):
+        self.assertTrue(is_trading_hours(_at(2024, 5, 13, 10, 0)))
+        self.assertFalse(is_trading_hours(_at(2024, 5, 13, 12, 0)))
+        self.assertFalse(is_trading_hours(_at(2024, 5, 11, 10, 0)))
+        # Substitute holiday for こどもの日
+        self.assertFalse(is_trading_hours(_at(2024, 5, 6, 10, 0)))
+
+    def test_next_session_open(self):
+        cases = [
+            (_at(2024, 5, 10, 16, 0), _at(2024, 5, 13, 9, 0)),
+            (_at(2024, 5, 13, 11, 45), _at(2024, 5, 13, 12, 30)),
+            # Golden Week: Friday 3 May to Monday 6 May are closed
+            (_at(2024, 5, 2, 16, 0), _at(2024, 5, 7, 9, 0)),
+        ]
+        for now, expected in cases:
+            self.assertEqual(next_session_open(now), expected)
+
+    def test_data_changes_until_quotes_settle(self):
+        self.assertTrue(data_can_change(_at(2024, 5, 10, 15, 45)))
+        self.assertFalse(data_can_change(_at(2024, 5, 10, 16, 0)))
+        now = _at(2024, 5, 10, 15, 45)
+        self.assertEqual(next_data_change(now), now)
+
+    def test_cache_timeout_lasts_until_next_open(self):
+        self.assertEqual(cache_timeout(300, _at(2024, 5, 13, 10, 0)), 300)
+        saturday_night = _at(2024, 5, 11, 22, 0)
+        self.assertEqual(cache_timeout(300, saturday_night), 35 * 3600)
+
+    def test_changed_between(self):
+        friday_close = _at(2024, 5, 10, 16, 0)
+        self.assertFalse(changed_between(friday_close, _at(2024, 5, 12, 22, 0)))
+        self.assertTrue(changed_between(friday_close, _at(2024, 5, 13, 9, 5)))
+        self.assertTrue(changed_between(_at(2024, 5, 10, 15, 0), friday_close))
+
+
+class DailyPriceCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("core.analysis.download", return_value=SAMPLE_DF)
+    def test_download_is_cached_until_data_can_change(self, mock_download):
+        with patch("core.analysis.cache.set", wraps=cache.set) as mock_set, patch(
+            "core.analysis.cache_timeout", return_value=35 * 3600
+        ):
+            first = daily_prices("7203.T", "6mo")
+            first["Close"] = 0.0
+            second = daily_prices("7203.T", "6mo")
+        mock_download.assert_called_once()
+        self.assertEqual(mock_set.call_args.args[2], 35 * 3600)
+        # Callers get their own copy
+        self.assertFalse((second["Close"] == 0).any())
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import tracemalloc
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.analysis import run_predictions  # noqa: E402
+from core.features import (  # noqa: E402
+    FEATURE_COLUMNS,
+    add_targets,
+    build_feature_frame,
+)
+from core.middleware import PeakMemoryMiddleware  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+class LeanFeatureFrameTests(SimpleTestCase):
+    def test_lean_frame_is_float32_and_close_to_full(self):
+        full = build_feature_frame(SAMPLE_DF.copy(), pd.DataFrame())
+        lean = build_feature_frame(SAMPLE_DF.copy(), pd.DataFrame(), lean=True)
+        self.assertEqual(list(lean.columns), ["Close"] + FEATURE_COLUMNS)
+        self.assertTrue((lean.dtypes == np.float32).all())
+        self.assertLess(
+            lean.memory_usage().sum(), full.memory_usage().sum() / 2
+        )
+        np.testing.assert_allclose(
+            lean[FEATURE_COLUMNS].to_numpy(),
+            full[FEATURE_COLUMNS].to_numpy(),
+            rtol=1e-3,
+            atol=1e-3,
+        )
+
+        targets = add_targets(lean, [1])
+        self.assertEqual(targets["target_1"].dtype, np.int8)
+        self.assertEqual(targets["future_return_1"].dtype, np.float32)
+
+    @override_settings(MEMORY_LEAN=True)
+    @patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+    def test_predictions_run_in_lean_mode(self, mock_fund):
+        result = run_predictions("7203", horizons=[1], prices=SAMPLE_DF)
+        self.assertIsNotNone(result)
+        self.assertEqual(result.horizons.tolist(), [1])
+
+
+class PeakMemoryMiddlewareTests(SimpleTestCase):
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_reports_peak_allocation(self):
+        def allocate(request):
+            block = bytearray(4 * 1024 * 1024)
+            return HttpResponse(str(len(block)))
+
+        middleware = PeakMemoryMiddleware(allocate)
+        response = middleware(RequestFactory().get("/"))
+        self.assertGreaterEqual(int(response["X-Peak-Memory-KB"]), 4096)
+
+    def test_async_views_stay_on_the_event_loop(self):
+        async def allocate(request):
+            block = bytearray(4 * 1024 * 1024)
+            return HttpResponse(str(len(block)))
+
+        middleware = PeakMemoryMiddleware(allocate)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = asyncio.run(middleware(RequestFactory().get("/")))
+        self.assertGreaterEqual(int(response["X-Peak-Memory-KB"]), 4096)
@@ -0,0 +1,125 @@
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import django
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import analysis  # noqa: E402
+from core.features import add_targets, build_feature_frame  # noqa: E402
+from core.model_store import load_ticker_model, maintain_ticker_model  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+def _prices(days, seed=0):
+    """Return a seeded random-walk OHLCV history of ``days`` business days."""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+    spread = close * rng.uniform(0.002, 0.02, days)
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 1, days) * spread / 2,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": rng.integers(1e5, 1e6, days).astype(float),
+        },
+        index=pd.bdate_range("2024-01-01", periods=days, name="Date"),
+    )
+
+
+LONG_DF = _prices(400)
+
+
+def _frame(rows, prices=SAMPLE_DF):
+    df = build_feature_frame(prices.iloc[:rows].copy(), pd.DataFrame())
+    return add_targets(df, [1])
+
+
+class TickerModelStoreTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings = override_settings(
+            TICKER_MODEL_DIR=tmp.name,
+            MODEL_UPDATE_TREES=5,
+            MODEL_REBUILD_EVERY=20,
+            MODEL_DRIFT_TOLERANCE=10.0,
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_daily_update_adds_trees_with_production_params(self):
+        first = _frame(395, LONG_DF)
+        self.assertEqual(maintain_ticker_model("7203", first, [1]), {1: "built"})
+        built = load_ticker_model("7203")["horizons"][1]
+        trees = built["booster"].num_trees()
+
+        # One more trading day labels a single new row
+        actions = maintain_ticker_model("7203", _frame(396, LONG_DF), [1])
+        self.assertEqual(actions, {1: "updated"})
+        updated = load_ticker_model("7203")["horizons"][1]
+        self.assertGreater(updated["booster"].num_trees(), trees)
+        self.assertGreater(updated["last_date"], built["last_date"])
+        self.assertEqual(updated["updates"], 1)
+
+        self.assertEqual(
+            maintain_ticker_model("7203", _frame(396, LONG_DF), [1]),
+            {1: "unchanged"},
+        )
+
+    def test_update_that_adds_no_tree_keeps_the_rows(self):
+        maintain_ticker_model("7203", _frame(45), [1])
+        built = load_ticker_model("7203")["horizons"][1]
+        # The short fixture is below the minimum leaf size, so nothing splits
+        self.assertEqual(
+            maintain_ticker_model("7203", _frame(60), [1]), {1: "unchanged"}
+        )
+        entry = load_ticker_model("7203")["horizons"][1]
+        self.assertEqual(entry["last_date"], built["last_date"])
+        self.assertEqual(entry["updates"], 0)
+
+    def test_scheduled_rebuild(self):
+        maintain_ticker_model("7203", _frame(45), [1])
+        with override_settings(MODEL_REBUILD_EVERY=0):
+            actions = maintain_ticker_model("7203", _frame(60), [1])
+        self.assertEqual(actions, {1: "rebuilt:scheduled"})
+        self.assertEqual(load_ticker_model("7203")["horizons"][1]["updates"], 0)
+
+    def test_drift_triggers_full_retrain(self):
+        maintain_ticker_model("7203", _frame(45), [1])
+        with override_settings(MODEL_DRIFT_TOLERANCE=-1.0):
+            actions = maintain_ticker_model("7203", _frame(60), [1])
+        self.assertEqual(actions, {1: "rebuilt:drift"})
+        entry = load_ticker_model("7203")["horizons"][1]
+        self.assertEqual(entry["drift_rows"], 0)
+        self.assertEqual(entry["n_rows"], len(_frame(60).dropna()))
+
+    @patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+    def test_stored_prediction_skips_training(self, mock_fund):
+        call_command(
+            "update_models", "7203", "--csv", str(FIXTURE_PATH),
+            "--horizons", "1", "--workers", "1", stdout=StringIO(),
+        )
+        with override_settings(PREDICTION_MODEL="stored"):
+            with patch("core.analysis._train_and_predict") as mock_train:
+                result = analysis.run_predictions(
+                    "7203", horizons=[1], prices=SAMPLE_DF
+                )
+        mock_train.assert_not_called()
+        self.assertEqual(result.horizons, [1])
+        self.assertTrue(0 <= result.prob_up[0] <= 1)
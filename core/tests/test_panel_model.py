@@ -0,0 +1,61 @@
+import os
+import tempfile
+from pathlib import Path
+
+import django
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.analysis import predict_future_moves  # noqa: E402
+from core.features import add_targets, build_feature_frame  # noqa: E402
+from core.panel_model import (  # noqa: E402
+    save_panel_model,
+    stack_panel,
+    train_panel_model,
+)
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+class PanelModelTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.model_path = os.path.join(tmp.name, "panel.joblib")
+
+        frames = {}
+        for code, scale in [("7203", 1.0), ("6758", 2.0)]:
+            df = SAMPLE_DF.copy()
+            df[["Open", "High", "Low", "Close"]] *= scale
+            frames[code] = add_targets(build_feature_frame(df, pd.DataFrame()), [1])
+        ticker_ids = {"7203": 0, "6758": 1}
+        sector_ids = {"7203": 0, "6758": 0}
+        self.panel = stack_panel(frames, ticker_ids, sector_ids, [1])
+        artifact = train_panel_model(self.panel, [1], ticker_ids, sector_ids)
+        save_panel_model(artifact, self.model_path)
+
+    def test_panel_stacks_all_tickers(self):
+        self.assertEqual(set(self.panel["ticker_id"]), {0, 1})
+        self.assertFalse(self.panel.isna().any(axis=None))
+
+    @patch("core.analysis.lgb.train")
+    @patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+    @patch("core.analysis.yf.download", return_value=SAMPLE_DF.copy())
+    def test_panel_mode_skips_per_request_training(
+        self, mock_download, mock_fund, mock_train
+    ):
+        with override_settings(
+            PREDICTION_MODEL="panel", PANEL_MODEL_PATH=self.model_path
+        ):
+            html, _ = predict_future_moves("7203", horizons=[1])
+        mock_train.assert_not_called()
+        self.assertIn("<table", html)
+        self.assertIn("予想方向", html)
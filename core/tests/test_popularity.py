@@ -0,0 +1,95 @@
+import os
+from io import StringIO
+from pathlib import Path
+
+import django
+import pandas as pd
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import popularity  # noqa: E402
+from core.models import TickerRequestCount  # noqa: E402
+from core.popularity import (  # noqa: E402
+    flush_request_counts,
+    popular_tickers,
+    record_ticker_request,
+)
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+def setUpModule():
+    # pytest runs without Django's test runner, so create the test database
+    global _old_db_name
+    _old_db_name = connection.creation.create_test_db(verbosity=0)
+
+
+def tearDownModule():
+    connection.creation.destroy_test_db(_old_db_name, verbosity=0)
+
+
+class PopularityTests(TestCase):
+    def setUp(self):
+        # Drop counts buffered by view tests in other modules
+        popularity._pending.clear()
+
+    def test_counts_are_buffered_then_ranked(self):
+        for code in ["7203", "6758", "7203", "9101", "7203", "6758"]:
+            record_ticker_request(code)
+        self.assertEqual(TickerRequestCount.objects.count(), 0)
+
+        self.assertEqual(flush_request_counts(), 6)
+        record_ticker_request("9101")
+        flush_request_counts()
+        self.assertEqual(popular_tickers(2), ["7203", "6758"])
+        self.assertEqual(popular_tickers(5), ["7203", "6758", "9101"])
+
+
+@patch("core.management.commands.precompute_popular.data_can_change",
+       return_value=False)
+@patch("core.views.get_company_name", side_effect=lambda code: code)
+@patch("core.views._load_and_format_financials", return_value="<h3>Q</h3>")
+@patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+class PrecomputePopularTests(TransactionTestCase):
+    def setUp(self):
+        popularity._pending.clear()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @patch("core.management.commands.precompute_popular.download_histories")
+    def test_first_view_is_served_from_precomputed_data(
+        self, mock_histories, *mocks
+    ):
+        for code in ["7203", "7203", "6758"]:
+            record_ticker_request(code)
+        flush_request_counts()
+        mock_histories.return_value = {
+            "7203.T": SAMPLE_DF.copy(),
+            "6758.T": SAMPLE_DF.copy(),
+        }
+        call_command(
+            "precompute_popular", "--top", "1", stdout=StringIO()
+        )
+        mock_histories.assert_called_once_with(["7203.T"], "2y")
+
+        with patch("core.views.run_candlestick_analysis") as mock_candle, patch(
+            "core.views.run_predictions"
+        ) as mock_predict:
+            response = self.client.get(
+                reverse("main_analysis") + "?ticker1=7203", HTTP_HOST="localhost"
+            )
+        self.assertEqual(response.status_code, 200)
+        mock_candle.assert_not_called()
+        mock_predict.assert_not_called()
+        self.assertIn("data:image/png;base64", response.content.decode())
@@ -0,0 +1,76 @@
+import os
+
+import django
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.models import Industry, Ticker  # noqa: E402
+from core.sectors import build_close_matrix, compute_sector_stats  # noqa: E402
+
+
+class SectorStatsTests(TestCase):
+    def test_close_matrix_forward_fills_gaps(self):
+        closes = pd.DataFrame(
+            {"A.T": [100.0, np.nan, 110.0], "B.T": [np.nan, 50.0, np.nan]}
+        )
+        matrix = build_close_matrix(closes)
+        np.testing.assert_array_equal(matrix[:, 0], [100.0, 100.0, 110.0])
+        self.assertTrue(np.isnan(matrix[0, 1]))
+        np.testing.assert_array_equal(matrix[1:, 1], [50.0, 50.0])
+
+    def test_sector_stats(self):
+        matrix = np.array(
+            [
+                [100.0, 100.0, 50.0],
+                [105.0, 95.0, 55.0],
+                [110.0, 90.0, 60.0],
+            ]
+        )
+        stats = compute_sector_stats(matrix, np.array([0, 0, 1]), 2)
+        np.testing.assert_array_equal(stats["count"], [2, 1])
+        np.testing.assert_allclose(stats["return"], [0.0, 0.2], atol=1e-12)
+        np.testing.assert_allclose(stats["breadth"], [0.5, 1.0])
+        self.assertTrue(np.all(stats["volatility"] >= 0))
+
+
+class SectorHeatmapAPITests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        banks = Industry.objects.create(name="銀行業")
+        autos = Industry.objects.create(name="輸送用機器")
+        Ticker.objects.create(code="8306", name="MUFG", industry=banks)
+        Ticker.objects.create(code="7203", name="Toyota", industry=autos)
+
+    @patch("core.sectors.download")
+    def test_heatmap_uses_single_batched_download(self, mock_download):
+        index = pd.date_range("2024-01-01", periods=3)
+        columns = pd.MultiIndex.from_product([["Close"], ["7203.T", "8306.T"]])
+        mock_download.return_value = pd.DataFrame(
+            [[100.0, 10.0], [101.0, 9.0], [102.0, 8.0]],
+            index=index,
+            columns=columns,
+        )
+        url = reverse("api-sector-heatmap") + "?period=1mo"
+        response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        mock_download.assert_called_once()
+        data = response.json()
+        self.assertEqual(data["sectors"], ["輸送用機器", "銀行業"])
+        self.assertEqual(data["count"], [1, 1])
+        self.assertEqual(data["return"], [0.02, -0.2])
+        self.assertEqual(data["breadth"], [1.0, 0.0])
+
+    def test_rejects_unknown_period(self):
+        url = reverse("api-sector-heatmap") + "?period=10y"
+        response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 400)
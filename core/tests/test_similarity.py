@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import django
+import numpy as np
+import pandas as pd
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, override_settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.similarity import (  # noqa: E402
+    build_similarity_index,
+    normalized_returns,
+    save_similarity_index,
+    similar_tickers,
+    top_k_neighbours,
+)
+
+
+def _closes(seed=0, days=250):
+    """Two factors: 1000/1001/1002 follow the first, 2000/2001 the second."""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.02, size=(days, 2))
+    loadings = {
+        "1000": (1.0, 0.0, 0.002),
+        "1001": (1.0, 0.0, 0.01),
+        "1002": (0.8, 0.6, 0.01),
+        "2000": (0.0, 1.0, 0.002),
+        "2001": (0.0, 1.0, 0.01),
+    }
+    closes = {}
+    for code, (a, b, noise) in loadings.items():
+        returns = a * factors[:, 0] + b * factors[:, 1]
+        returns = returns + rng.normal(0, noise, size=days)
+        closes[code] = 100 * np.exp(np.cumsum(returns))
+    return pd.DataFrame(closes, index=pd.bdate_range("2024-01-01", periods=days))
+
+
+class SimilarityTests(SimpleTestCase):
+    def test_blockwise_neighbours_match_full_correlation_matrix(self):
+        matrix = _closes().to_numpy()
+        z, usable = normalized_returns(matrix, min_days=10)
+        expected = np.corrcoef(np.diff(np.log(matrix), axis=0), rowvar=False)
+        np.testing.assert_allclose(z.T @ z, expected, atol=1e-5)
+
+        indices, scores = top_k_neighbours(z, 2, usable, block_size=2)
+        np.fill_diagonal(expected, -np.inf)
+        np.testing.assert_array_equal(
+            indices, np.argsort(-expected, axis=1)[:, :2]
+        )
+        np.testing.assert_allclose(
+            scores, np.sort(expected, axis=1)[:, ::-1][:, :2], atol=1e-5
+        )
+
+    def test_industry_scope_and_short_histories(self):
+        closes = _closes()
+        closes.loc[closes.index[:200], "2001"] = np.nan
+        artifact = build_similarity_index(
+            closes,
+            industries={"1000": 1, "1001": 1, "1002": 2, "2000": 2, "2001": 2},
+            names={"1001": "Peer"},
+            k=3,
+            min_days=100,
+        )
+        peers = artifact["peers"]
+        self.assertNotIn("2001", peers)
+        self.assertEqual([p["code"] for p in peers["1000"]["industry"]], ["1001"])
+        self.assertEqual(peers["1000"]["industry"][0]["name"], "Peer")
+        self.assertEqual(
+            [p["code"] for p in peers["1000"]["market"]], ["1001", "1002", "2000"]
+        )
+        self.assertEqual([p["code"] for p in peers["2000"]["industry"]], ["1002"])
+
+    def test_lookup_reads_saved_index(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "similarity.joblib")
+        artifact = build_similarity_index(
+            _closes(), {}, {}, k=1, min_days=10
+        )
+        save_similarity_index(artifact, path)
+        with override_settings(SIMILARITY_INDEX_PATH=path):
+            self.assertEqual(
+                similar_tickers("1000.T")["market"][0]["code"], "1001"
+            )
+            self.assertIsNone(similar_tickers("9999"))
+        with override_settings(SIMILARITY_INDEX_PATH=path + ".missing"):
+            self.assertIsNone(similar_tickers("1000"))
+
+    def test_section_links_to_peer_analysis(self):
+        html = render_to_string(
+            "partials/analysis_section.html",
+            {
+                "section": "similar",
+                "data": {
+                    "similar": {
+                        "industry": [],
+                        "market": [
+                            {"code": "6758", "name": "ソニー", "correlation": 0.61}
+                        ],
+                    }
+                },
+            },
+        )
+        self.assertIn("?ticker1=6758", html)
+        self.assertIn("0.61", html)
+        self.assertIn("該当なし", html)
@@ -0,0 +1,161 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import django
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import market_data, single_flight as flights  # noqa: E402
+from core.single_flight import single_flight  # noqa: E402
+
+
+def _slow_load(calls, delay=0.3):
+    def load():
+        calls.append(1)
+        time.sleep(delay)
+        return pd.DataFrame({"Close": [1.0, 2.0]})
+
+    return load
+
+
+def _worker_load(key, counter_path, results):
+    def load():
+        with open(counter_path, "a") as f:
+            f.write("x")
+        time.sleep(0.5)
+        return {"close": 100}
+
+    results.put(single_flight(key, load))
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(SINGLE_FLIGHT_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _run_threads(self, n, target):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(target()))
+            for _ in range(n)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_threads_share_one_load_and_own_their_copy(self):
+        calls = []
+        load = _slow_load(calls)
+        results = self._run_threads(5, lambda: single_flight("prices:7203", load))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        results[0].loc[0, "Close"] = -1
+        self.assertTrue(all(r.loc[0, "Close"] == 1.0 for r in results[1:]))
+
+    def test_sequential_calls_are_not_cached(self):
+        calls = []
+        load = _slow_load(calls, delay=0)
+        single_flight("prices:7203", load)
+        single_flight("prices:7203", load)
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_reach_every_waiting_thread(self):
+        def load():
+            time.sleep(0.2)
+            raise ValueError("upstream down")
+
+        errors = []
+
+        def call():
+            try:
+                single_flight("prices:7203", load)
+            except ValueError as exc:
+                errors.append(exc)
+
+        self._run_threads(3, call)
+        self.assertEqual(len(errors), 3)
+
+    def test_worker_processes_share_one_load(self):
+        ctx = multiprocessing.get_context("fork")
+        counter_path = os.path.join(self.tmp.name, "calls")
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(
+                target=_worker_load, args=("prices:6758", counter_path, results)
+            )
+            for _ in range(3)
+        ]
+        for w in workers:
+            w.start()
+        values = [results.get(timeout=10) for _ in workers]
+        for w in workers:
+            w.join()
+        self.assertEqual(values, [{"close": 100}] * 3)
+        with open(counter_path) as f:
+            self.assertEqual(f.read(), "x")
+        # The last waiter removed the shared result and every marker
+        leftovers = {p.suffix for p in Path(self.tmp.name).iterdir()}
+        self.assertEqual(leftovers, {"", ".lock"})
+
+    def test_unshared_results_are_not_written(self):
+        single_flight("prices:7203", lambda: {"close": 100})
+        names = [p.suffix for p in Path(self.tmp.name).iterdir()]
+        self.assertEqual(names, [".lock"])
+
+    def test_stale_flight_files_are_purged(self):
+        stale = Path(self.tmp.name) / "old.pkl"
+        stale.write_bytes(b"x")
+        old = time.time() - flights.STALE_SECONDS - 1
+        os.utime(stale, (old, old))
+        with patch.object(flights, "_last_purge", 0.0):
+            single_flight("prices:7203", lambda: 1)
+        self.assertFalse(stale.exists())
+
+    def test_directory_is_created_private(self):
+        base = Path(self.tmp.name) / "flights"
+        with override_settings(SINGLE_FLIGHT_DIR=str(base)):
+            single_flight("prices:7203", lambda: 1)
+        self.assertEqual(base.stat().st_mode & 0o777, 0o700)
+        self.assertEqual([p.suffix for p in base.iterdir()], [".lock"])
+
+    def test_shared_directory_is_refused(self):
+        os.chmod(self.tmp.name, 0o777)
+        with self.assertLogs("core.single_flight", "WARNING"):
+            self.assertEqual(single_flight("prices:7203", lambda: 1), 1)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    @patch("core.market_data.yf.download")
+    def test_identical_downloads_are_coalesced(self, mock_download):
+        def slow_download(*args, **kwargs):
+            time.sleep(0.3)
+            return pd.DataFrame({"Close": [1.0]})
+
+        mock_download.side_effect = slow_download
+        self._run_threads(
+            4, lambda: market_data.download("7203.T", period="1y", progress=False)
+        )
+        self.assertEqual(mock_download.call_count, 1)
+        market_data.download("7203.T", period="6mo", progress=False)
+        self.assertEqual(mock_download.call_count, 2)
+
+    @patch("core.market_data.yf.download", return_value=pd.DataFrame())
+    def test_batch_downloads_stay_within_the_worker(self, mock_download):
+        market_data.download_histories(["7203.T", "6758.T"], "1y")
+        self.assertEqual(mock_download.call_count, 1)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
@@ -0,0 +1,106 @@
+import os
+from datetime import timedelta
+
+import django
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import snapshots  # noqa: E402
+from core.models import AnalysisSnapshot  # noqa: E402
+
+
+def setUpModule():
+    # pytest runs without Django's test runner, so create the test database
+    global _old_db_name
+    _old_db_name = connection.creation.create_test_db(verbosity=0)
+
+
+def tearDownModule():
+    connection.creation.destroy_test_db(_old_db_name, verbosity=0)
+
+
+def _page(ticker, chart="chart-v1"):
+    return {
+        "ticker": ticker,
+        "chart_data": chart,
+        "latest_data_table": "<table>latest</table>",
+        "predictions": [{"予測日数": 1, "予想方向": "UP", "上昇確率": 60}],
+        "gemini_report_html": "<p>report</p>",
+        "warning": None,
+    }
+
+
+class SnapshotViewTests(TransactionTestCase):
+    def setUp(self):
+        self.url = reverse("main_analysis") + "?ticker1=7203"
+
+    def test_first_visit_computes_and_later_visits_read_the_snapshot(self):
+        with patch(
+            "core.views.afetch_data", new=AsyncMock(side_effect=_page)
+        ) as mock_fetch:
+            first = self.client.get(self.url, HTTP_HOST="localhost")
+            second = self.client.get(self.url, HTTP_HOST="localhost")
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertIn("chart-v1", second.content.decode())
+        self.assertEqual(
+            AnalysisSnapshot.objects.get(code="7203").data["predictions"][0]["上昇確率"],
+            60,
+        )
+        self.assertIn("<p>report</p>", first.content.decode())
+
+    def _get_with_old_snapshot(self, market_moved):
+        snapshots.save_snapshot("7203", _page("7203"))
+        AnalysisSnapshot.objects.update(
+            computed_at=timezone.now() - timedelta(hours=1)
+        )
+        with patch("core.views.afetch_data") as mock_fetch, patch(
+            "core.snapshots.changed_between", return_value=market_moved
+        ):
+            response = self.client.get(self.url, HTTP_HOST="localhost")
+        mock_fetch.assert_not_called()
+        self.assertIn("chart-v1", response.content.decode())
+
+    @patch("core.snapshots.schedule_refresh")
+    def test_stale_snapshot_is_served_and_refreshed_in_background(self, mock_schedule):
+        self._get_with_old_snapshot(market_moved=True)
+        mock_schedule.assert_called_once()
+        self.assertEqual(mock_schedule.call_args.args[0], "7203")
+
+    @patch("core.snapshots.schedule_refresh")
+    def test_old_snapshot_stays_fresh_while_market_is_closed(self, mock_schedule):
+        self._get_with_old_snapshot(market_moved=False)
+        mock_schedule.assert_not_called()
+
+
+class SnapshotRefreshTests(TestCase):
+    def setUp(self):
+        snapshots.save_snapshot("7203", _page("7203"))
+
+    def test_lease_allows_one_refresh_at_a_time(self):
+        executor = MagicMock()
+        with patch.object(snapshots, "_executor", executor):
+            self.assertTrue(snapshots.schedule_refresh("7203", _page))
+            snapshots._inflight.clear()
+            # Another worker: the row's lease is still held
+            self.assertFalse(snapshots.schedule_refresh("7203", _page))
+        executor.submit.assert_called_once()
+
+    def test_refresh_replaces_snapshot_and_keeps_it_on_failure(self):
+        def compute(code):
+            return _page(code, chart="chart-v2")
+
+        self.assertTrue(snapshots.refresh_snapshot("7203", compute))
+        self.assertEqual(AnalysisSnapshot.objects.get().chart_data, "chart-v2")
+
+        failed = {"ticker": "7203", "chart_data": None, "warning": "down"}
+        self.assertFalse(snapshots.refresh_snapshot("7203", lambda code: failed))
+        self.assertEqual(AnalysisSnapshot.objects.get().chart_data, "chart-v2")
@@ -0,0 +1,89 @@
+import os
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.models import Industry, Ticker  # noqa: E402
+from core.tickers import (  # noqa: E402
+    UnknownTicker,
+    reset_ticker_table,
+    resolve_ticker,
+    symbol_for,
+)
+
+
+def setUpModule():
+    # pytest runs without Django's test runner, so create the test database
+    global _old_db_name
+    _old_db_name = connection.creation.create_test_db(verbosity=0)
+
+
+def tearDownModule():
+    connection.creation.destroy_test_db(_old_db_name, verbosity=0)
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"])
+class ResolveTickerTests(TransactionTestCase):
+    def setUp(self):
+        industry = Industry.objects.create(name="輸送用機器")
+        for code in ("7203", "130A"):
+            Ticker.objects.create(code=code, name=f"name {code}", industry=industry)
+        cache.clear()
+        reset_ticker_table()
+
+    def test_normalizes_symbols_and_full_width_input(self):
+        for raw in ("7203", " 7203.T ", "7203.t", "７２０３"):
+            resolved = resolve_ticker(raw)
+            self.assertEqual(resolved.code, "7203")
+            self.assertEqual(resolved.symbol, "7203.T")
+        self.assertEqual(resolve_ticker("130a").name, "name 130A")
+        self.assertEqual(symbol_for("7203.T"), "7203.T")
+
+    def test_rejects_malformed_and_unlisted_codes(self):
+        for raw in ("", "72", "ABCD", "7203;DROP", "9999"):
+            with self.assertRaises(UnknownTicker):
+                resolve_ticker(raw)
+
+    def test_empty_table_accepts_well_formed_codes(self):
+        Ticker.objects.all().delete()
+        reset_ticker_table()
+        self.assertEqual(resolve_ticker("9999").code, "9999")
+        with self.assertRaises(UnknownTicker):
+            resolve_ticker("99")
+
+    @patch("core.views.aanalysis_data", return_value={})
+    def test_unknown_code_never_reaches_the_analysis(self, mock_analysis):
+        response = self.client.get(reverse("main_analysis"), {"ticker1": "9999"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("登録されていません", response.content.decode())
+        # Only the empty second column is looked up
+        mock_analysis.assert_called_once_with("")
+
+    @patch("core.views.last_bar_date", return_value=None)
+    def test_empty_history_is_negatively_cached(self, mock_bar_date):
+        url = reverse("api-analysis", args=["7203"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("取得できません", response.json()["detail"])
+        mock_bar_date.assert_called_once()
+        with self.assertRaises(UnknownTicker):
+            resolve_ticker("7203")
+
+    @override_settings(TICKER_EMPTY_HISTORY_SECONDS=0)
+    @patch("core.views.last_bar_date", return_value=None)
+    def test_empty_history_is_retried_once_the_entry_expires(self, mock_bar_date):
+        url = reverse("api-analysis", args=["7203"])
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(mock_bar_date.call_count, 2)
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import django
+import pandas as pd
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core import analysis  # noqa: E402
+from core.tuning import tuned_params_for  # noqa: E402
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "sample_prices.csv"
+SAMPLE_DF = pd.read_csv(FIXTURE_PATH, index_col="Date", parse_dates=True)
+
+
+class TuneModelsTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "tuned.json")
+        self.settings = override_settings(TUNED_PARAMS_PATH=self.path)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def _tune(self, code, horizons):
+        call_command(
+            "tune_models",
+            code,
+            "--csv",
+            str(FIXTURE_PATH),
+            "--horizons",
+            *map(str, horizons),
+            "--splits",
+            "3",
+            "--max-trees",
+            "50",
+            "--workers",
+            "2",
+            stdout=StringIO(),
+        )
+
+    def test_saves_params_and_tree_count_per_horizon(self):
+        self._tune("7203", [1, 7])
+        self._tune("6758", [1])
+        with open(self.path, encoding="utf-8") as f:
+            stored = json.load(f)["params"]
+        self.assertEqual(set(stored), {"7203", "6758"})
+        self.assertEqual(set(stored["7203"]), {"1", "7"})
+
+        params = tuned_params_for("7203", 7)
+        self.assertLessEqual(params["n_estimators"], 50)
+        self.assertIn("num_leaves", params)
+        self.assertEqual(tuned_params_for("7203", 28), {})
+
+    @patch("core.analysis._load_fundamentals", return_value=pd.DataFrame())
+    def test_online_training_uses_tuned_trees(self, mock_fund):
+        self._tune("7203", [1])
+        trees = tuned_params_for("7203", 1)["n_estimators"]
+        with patch("core.analysis.lgb.train", wraps=analysis.lgb.train) as mock_train:
+            analysis.run_predictions("7203", horizons=[1], prices=SAMPLE_DF)
+        mock_train.assert_called_once()
+        self.assertEqual(mock_train.call_args.kwargs["num_boost_round"], trees)
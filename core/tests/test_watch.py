@@ -0,0 +1,135 @@
+import json
+import os
+
+import django
+import pandas as pd
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myapp.settings")
+os.environ.setdefault("SECRET_KEY", "dummy")
+os.environ.setdefault("DEBUG", "True")
+
+django.setup()
+
+from core.models import Industry, Ticker, Watchlist  # noqa: E402
+from core.tickers import reset_ticker_table  # noqa: E402
+from core.watch import FeedHub, watch_state  # noqa: E402
+
+
+def setUpModule():
+    # pytest runs without Django's test runner, so create the test database
+    global _old_db_name
+    _old_db_name = connection.creation.create_test_db(verbosity=0)
+
+
+def tearDownModule():
+    connection.creation.destroy_test_db(_old_db_name, verbosity=0)
+
+
+def _state(close, report="<p>r</p>"):
+    return {
+        "last_bar": "2026-10-16",
+        "close": close,
+        "change_pct": 1.0,
+        "predictions": [],
+        "report_html": report,
+    }
+
+
+@override_settings(WATCH_POLL_SECONDS=0, WATCH_HEARTBEAT_SECONDS=1)
+class FeedHubTests(SimpleTestCase):
+    async def test_subscribers_share_one_computation_and_get_deltas(self):
+        states = iter([_state(100.0), _state(100.0), _state(101.0)])
+        compute = AsyncMock(side_effect=lambda code: next(states, _state(101.0)))
+        hub = FeedHub(compute)
+        first, second = hub.updates(["7203"]), hub.updates(["7203"])
+
+        self.assertEqual(await anext(first), {"code": "7203", **_state(100.0)})
+        self.assertEqual(await anext(second), {"code": "7203", **_state(100.0)})
+        self.assertEqual(await anext(first), {"code": "7203", "close": 101.0})
+        self.assertEqual(await anext(second), {"code": "7203", "close": 101.0})
+        self.assertEqual(hub.feed_count(), 1)
+        self.assertEqual({c.args for c in compute.call_args_list}, {("7203",)})
+
+        late = hub.updates(["7203"])
+        self.assertEqual(await anext(late), {"code": "7203", **_state(101.0)})
+        for updates in (first, second, late):
+            await updates.aclose()
+        self.assertEqual(hub.feed_count(), 0)
+
+    async def test_heartbeat_without_changes(self):
+        hub = FeedHub(AsyncMock(return_value=_state(100.0)))
+        updates = hub.updates(["7203"])
+        await anext(updates)
+        with override_settings(WATCH_HEARTBEAT_SECONDS=0.05):
+            self.assertIsNone(await anext(updates))
+        await updates.aclose()
+
+    def test_watch_state_reports_last_bar(self):
+        prices = pd.DataFrame(
+            {"Close": [100.0, 102.0]},
+            index=pd.to_datetime(["2026-10-15", "2026-10-16"]),
+        )
+        state = watch_state({"gemini_report_html": "<p>r</p>"}, prices)
+        self.assertEqual(state["last_bar"], "2026-10-16")
+        self.assertEqual(state["change_pct"], 2.0)
+        self.assertEqual(state["report_html"], "<p>r</p>")
+        self.assertIsNone(watch_state({}, pd.DataFrame())["close"])
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"])
+class WatchlistAPITests(TransactionTestCase):
+    def setUp(self):
+        industry = Industry.objects.create(name="輸送用機器")
+        for code in ("7203", "7267"):
+            Ticker.objects.create(code=code, name=code, industry=industry)
+        reset_ticker_table()
+
+    def test_create_update_and_delete(self):
+        url = reverse("api-watchlists")
+        bad = self.client.post(
+            url, {"codes": ["7203", "0000"]}, content_type="application/json"
+        )
+        self.assertEqual(bad.status_code, 400)
+        self.assertIn("0000", bad.json()["detail"])
+
+        created = self.client.post(
+            url,
+            {"name": "autos", "codes": ["7203.T", "7203"]},
+            content_type="application/json",
+        ).json()
+        self.assertEqual(created["codes"], ["7203"])
+        detail = reverse("api-watchlist", args=[created["key"]])
+        updated = self.client.put(
+            detail, {"codes": ["7203", "7267"]}, content_type="application/json"
+        )
+        self.assertEqual(updated.json()["codes"], ["7203", "7267"])
+        self.assertEqual(self.client.delete(detail).status_code, 204)
+        self.assertFalse(Watchlist.objects.exists())
+
+    def test_page_form_creates_and_redirects(self):
+        response = self.client.post(
+            reverse("watchlist-create"), {"name": "mine", "codes": "7203,7267"}
+        )
+        watchlist = Watchlist.objects.get()
+        self.assertRedirects(response, reverse("watchlist", args=[watchlist.key]))
+
+    @override_settings(WATCH_POLL_SECONDS=3600)
+    async def test_stream_sends_update_events(self):
+        watchlist = await Watchlist.objects.acreate(codes=["7203"])
+        hub = FeedHub(AsyncMock(return_value=_state(100.0)))
+        with patch("core.views.watch_hub", hub):
+            response = await self.async_client.get(
+                reverse("api-watchlist-stream", args=[watchlist.key])
+            )
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            stream = aiter(response.streaming_content)
+            self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+            event = (await anext(stream)).decode()
+            await stream.aclose()
+        name, data = event.strip().split("\n")
+        self.assertEqual(name, "event: update")
+        self.assertEqual(json.loads(data.removeprefix("data: "))["close"], 100.0)
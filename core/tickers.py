@@ -0,0 +1,112 @@
+"""Ticker resolution shared by every entry point.
+
+:func:`resolve_ticker` turns user input ("7203", "7203.t", "７２０３") into a
+:class:`ResolvedTicker` or raises :class:`UnknownTicker`. Codes are checked
+against the ``Ticker`` table, held in memory and reloaded every
+``TICKER_TABLE_SECONDS``, and against a short-lived negative cache of codes
+whose price history came back empty upstream (kept
+``TICKER_EMPTY_HISTORY_SECONDS``).
+Rejected input costs a couple of dictionary lookups and never reaches
+Yahoo Finance or Gemini. While the table is empty (before ``load_tickers``
+has run) every well-formed code is accepted.
+"""
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+# TSE codes are four characters; codes issued since 2024 may contain a
+# letter in the last three positions (e.g. 130A)
+CODE_PATTERN = re.compile(r"[0-9][0-9A-Z]{3}")
+
+_table_lock = threading.Lock()
+_table = {"loaded_at": None, "names": {}}
+
+
+class UnknownTicker(ValueError):
+    """The input is not a ticker that can be analysed; the message says why."""
+
+
+@dataclass(frozen=True)
+class ResolvedTicker:
+    code: str
+    name: str = ""
+
+    @property
+    def symbol(self) -> str:
+        """Yahoo Finance symbol of the code."""
+        return f"{self.code}.T"
+
+
+def normalize_code(raw: str) -> str:
+    """Return the bare upper-case code of ``raw`` (full-width and ``.T`` ok)."""
+    code = unicodedata.normalize("NFKC", raw).strip().upper()
+    return code.removesuffix(".T")
+
+
+def symbol_for(raw: str) -> str:
+    """Return the Yahoo Finance symbol of a code, with or without ``.T``."""
+    return f"{normalize_code(raw)}.T"
+
+
+def ticker_names() -> dict[str, str]:
+    """Return ``{code: name}`` of the Ticker table, reloaded periodically."""
+    # Imported here so analysis code can use symbol_for without Django set up
+    from .models import Ticker
+
+    with _table_lock:
+        loaded_at = _table["loaded_at"]
+        if loaded_at is None or (
+            time.monotonic() - loaded_at > settings.TICKER_TABLE_SECONDS
+        ):
+            _table["names"] = dict(Ticker.objects.values_list("code", "name"))
+            _table["loaded_at"] = time.monotonic()
+        return _table["names"]
+
+
+def reset_ticker_table() -> None:
+    """Reload the Ticker table on the next lookup."""
+    with _table_lock:
+        _table["loaded_at"] = None
+
+
+def _unavailable_key(code: str) -> str:
+    return f"ticker_unavailable:{code}"
+
+
+def mark_unavailable(code: str) -> None:
+    """Remember that upstream returned no price history for ``code``.
+
+    yfinance also returns an empty history on rate limits, timeouts and
+    network errors, so the entry only lives ``TICKER_EMPTY_HISTORY_SECONDS``.
+    """
+    cache.set(
+        _unavailable_key(normalize_code(code)),
+        True,
+        settings.TICKER_EMPTY_HISTORY_SECONDS,
+    )
+
+
+def is_unavailable(code: str) -> bool:
+    return cache.get(_unavailable_key(normalize_code(code))) is not None
+
+
+def resolve_ticker(raw: str) -> ResolvedTicker:
+    """Return the ticker ``raw`` refers to.
+
+    Raises :class:`UnknownTicker` for malformed codes, codes missing from a
+    non-empty Ticker table and codes in the negative cache.
+    """
+    code = normalize_code(raw)
+    if not CODE_PATTERN.fullmatch(code):
+        raise UnknownTicker(f"銘柄コード「{raw.strip()}」の形式が正しくありません。")
+    names = ticker_names()
+    if names and code not in names:
+        raise UnknownTicker(f"銘柄コード {code} は登録されていません。")
+    if is_unavailable(code):
+        raise UnknownTicker(f"銘柄コード {code} の株価データを取得できません。")
+    return ResolvedTicker(code, names.get(code, ""))
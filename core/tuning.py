@@ -0,0 +1,174 @@
+"""Offline LightGBM tuning per ticker and horizon.
+
+``python manage.py tune_models`` runs time-series cross-validation with
+early stopping for a small parameter grid and stores the winner, including
+the number of trees early stopping settled on. The request path looks the
+entry up with :func:`tuned_params_for` and trains only that many trees.
+"""
+import json
+import os
+from datetime import datetime
+from itertools import product
+
+import lightgbm as lgb
+import numpy as np
+from django.conf import settings
+from sklearn.model_selection import TimeSeriesSplit
+
+from .artifacts import load_cached_artifact, save_artifact
+
+# LightGBM settings for the per-ticker direction classifiers
+MODEL_PARAMS = {
+    "random_state": 0,
+    "learning_rate": 0.05,
+    "n_estimators": 200,
+    "num_leaves": 31,
+    "max_depth": -1,
+    "reg_alpha": 0.1,
+    "reg_lambda": 0.1,
+    "n_jobs": -1,
+}
+
+# Searched on top of MODEL_PARAMS
+PARAM_GRID = {
+    "learning_rate": [0.05, 0.1],
+    "num_leaves": [7, 15, 31],
+    "min_child_samples": [10, 20],
+}
+TUNED_KEYS = ("learning_rate", "num_leaves", "min_child_samples")
+
+
+def param_candidates(grid: dict | None = None) -> list[dict]:
+    """Return every combination of the grid as a list of dicts."""
+    grid = grid or PARAM_GRID
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*grid.values())]
+
+
+def cross_validate(
+    X: np.ndarray,
+    y: np.ndarray,
+    horizon: int,
+    params: dict,
+    n_splits: int = 5,
+    max_trees: int = 500,
+    stopping_rounds: int = 20,
+) -> tuple[float, int] | None:
+    """Return ``(mean validation log loss, trees)`` over time-series folds.
+
+    ``params`` are native LightGBM parameters (sklearn aliases accepted).
+    ``horizon`` rows are dropped from the end of each training fold because
+    their labels look into the validation period. The tree count is the
+    mean of the per-fold best iterations.
+    """
+    losses, iterations = [], []
+    for train_index, valid_index in TimeSeriesSplit(n_splits=n_splits).split(X):
+        train_index = train_index[: len(train_index) - horizon]
+        if len(train_index) < 2 or np.unique(y[train_index]).size < 2:
+            continue
+        train_set = lgb.Dataset(X[train_index], y[train_index])
+        valid_set = lgb.Dataset(
+            X[valid_index], y[valid_index], reference=train_set
+        )
+        booster = lgb.train(
+            params,
+            train_set,
+            num_boost_round=max_trees,
+            valid_sets=[valid_set],
+            callbacks=[lgb.early_stopping(stopping_rounds, verbose=False)],
+        )
+        losses.append(booster.best_score["valid_0"]["binary_logloss"])
+        iterations.append(booster.best_iteration or max_trees)
+    if not losses:
+        return None
+    return float(np.mean(losses)), max(1, int(round(np.mean(iterations))))
+
+
+def tune_series(
+    X: np.ndarray,
+    y: np.ndarray,
+    horizon: int,
+    base_params: dict,
+    grid: dict | None = None,
+    n_splits: int = 5,
+    max_trees: int = 500,
+    stopping_rounds: int = 20,
+) -> dict | None:
+    """Return the best grid entry for one ticker and horizon, or ``None``."""
+    best = None
+    for candidate in param_candidates(grid):
+        params = {
+            **{k: v for k, v in base_params.items() if k != "n_estimators"},
+            **candidate,
+            "objective": "binary",
+            "metric": "binary_logloss",
+            "verbose": -1,
+        }
+        scored = cross_validate(
+            X, y, horizon, params, n_splits, max_trees, stopping_rounds
+        )
+        if scored is None:
+            continue
+        loss, trees = scored
+        if best is None or loss < best["cv_logloss"]:
+            best = {"params": candidate, "n_estimators": trees, "cv_logloss": loss}
+    return best
+
+
+def booster_params(params: dict, num_threads: int) -> dict:
+    """Translate classifier keyword arguments into ``lgb.train`` parameters."""
+    native = {
+        k: v for k, v in params.items() if k not in ("n_estimators", "n_jobs")
+    }
+    return {
+        **native,
+        "objective": "binary",
+        "num_threads": num_threads,
+        "verbose": -1,
+    }
+
+
+def _read_json(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(data: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def save_tuned_params(entries: dict, path: str | None = None) -> str:
+    """Merge ``{code: {horizon: entry}}`` into the tuned-params file."""
+    path = str(path or settings.TUNED_PARAMS_PATH)
+    data = _read_json(path) if os.path.exists(path) else {"params": {}}
+    for code, horizons in entries.items():
+        stored = data["params"].setdefault(code, {})
+        stored.update({str(h): entry for h, entry in horizons.items()})
+    data["tuned_at"] = datetime.now().isoformat(timespec="seconds")
+    return save_artifact(path, data, dump=_write_json)
+
+
+def _load_tuned_file(path: str | None = None) -> dict:
+    """Return the tuned-params file's contents, reloading when it changes."""
+    path = path or settings.TUNED_PARAMS_PATH
+    return load_cached_artifact(path, load=_read_json) or {}
+
+
+def load_tuned_params(path: str | None = None) -> dict:
+    """Return ``{code: {"h": entry}}``, reloading when the file changes."""
+    return _load_tuned_file(path).get("params", {})
+
+
+def tuned_at(path: str | None = None) -> str | None:
+    """Return when the tuned-params file was last written, if it exists."""
+    return _load_tuned_file(path).get("tuned_at")
+
+
+def tuned_params_for(code: str, horizon: int) -> dict:
+    """Return LightGBM overrides for ``code`` and ``horizon`` (empty if untuned)."""
+    entry = load_tuned_params().get(code, {}).get(str(horizon))
+    if not entry:
+        return {}
+    params = {k: v for k, v in entry["params"].items() if k in TUNED_KEYS}
+    return {**params, "n_estimators": int(entry["n_estimators"])}
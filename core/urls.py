@@ -4,7 +4,46 @@ from . import views
 
 urlpatterns = [
     path('', views.main_analysis_view, name='main_analysis'),
-    path('api/industries/', views.IndustryListAPIView.as_view(), name='api-industries'),
-    path('api/industries/<int:pk>/tickers/', views.IndustryTickerAPIView.as_view(), name='api-industry-tickers'),
-    path('api/tickers/search/', views.TickerSearchAPIView.as_view(), name='api-ticker-search'),
+    path('compare/', views.compare_view, name='compare'),
+    path('watchlist/', views.watchlist_view, name='watchlist-create'),
+    path('watchlist/<str:key>/', views.watchlist_view, name='watchlist'),
+    path('api/industries/', views.industry_list_api, name='api-industries'),
+    path(
+        'api/industries/<int:pk>/tickers/',
+        views.industry_tickers_api,
+        name='api-industry-tickers',
+    ),
+    path('api/tickers/search/', views.ticker_search_api, name='api-ticker-search'),
+    path(
+        'api/sectors/heatmap/',
+        views.SectorHeatmapAPIView.as_view(),
+        name='api-sector-heatmap',
+    ),
+    path(
+        'api/v1/analysis/<str:ticker>/',
+        views.AnalysisAPIView.as_view(),
+        name='api-analysis',
+    ),
+    path('api/v1/chart/<str:ticker>/', views.chart_api, name='api-chart'),
+    path('api/v1/export/', views.export_api, name='api-export'),
+    path(
+        'api/watchlists/',
+        views.WatchlistCreateAPIView.as_view(),
+        name='api-watchlists',
+    ),
+    path(
+        'api/watchlists/<str:key>/',
+        views.WatchlistAPIView.as_view(),
+        name='api-watchlist',
+    ),
+    path(
+        'api/watchlists/<str:key>/stream/',
+        views.watchlist_stream_api,
+        name='api-watchlist-stream',
+    ),
+    path(
+        'api/intraday/<str:ticker>/',
+        views.IntradayAPIView.as_view(),
+        name='api-intraday',
+    ),
 ]
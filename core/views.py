@@ -1,20 +1,73 @@
-from django.shortcuts import render, get_object_or_404
-import pandas as pd
+import asyncio
+import base64
+
+from django.shortcuts import get_object_or_404, redirect, render
 import markdown2
 import logging
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.template.loader import render_to_string
+from django.utils.http import http_date, parse_etags
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.db import models
 
+from . import aio
+
 from .analysis import (
     get_company_name,
-    analyze_stock_candlestick,
-    predict_future_moves,
+    run_candlestick_analysis,
+    run_predictions,
     _load_and_format_financials,
 )
-from .models import Industry, Ticker
-from .gemini_analyzer import generate_analyst_report
+from .rendering import render_latest_table
+from .api import (
+    ANALYSIS_FIELDS,
+    DEFAULT_FIELDS,
+    analysis_etag,
+    analysis_sections,
+    build_analysis_payload,
+    last_bar_date,
+    model_version,
+)
+from .comparison import compare_tickers
+from .downsample import CHART_RANGES, DEFAULT_CHART_RANGE
+from .export import EXPORT_FORMATS, export_path, parquet_available, read_export
+from .intraday import (
+    INTRADAY_INTERVALS,
+    buffer_payload,
+    latest_records,
+    refresh,
+    render_intraday_chart,
+)
+from .market_calendar import cache_timeout, is_trading_hours
+from .models import Industry, Ticker, Watchlist
+from .popularity import record_ticker_request
+from .snapshots import (
+    get_page_data,
+    save_snapshot,
+    snapshot_code,
+    snapshot_page_data,
+)
+from .sectors import SECTOR_PERIODS, sector_heatmap
+from .similarity import similar_tickers
+from .tickers import (
+    UnknownTicker,
+    mark_unavailable,
+    normalize_code,
+    resolve_ticker,
+    symbol_for,
+)
+from .gemini_analyzer import generate_analyst_report, generate_analyst_report_async
+from .watch import FeedHub, sse_event, watch_state
 
 
 def health_check(request):
@@ -29,101 +82,704 @@ _load_quarterly_financials = None
 _load_annual_financials = None
 
 
-def fetch_data(ticker):
-    """Helper function to fetch all data for a ticker."""
-    if not ticker:
-        return {}
+def _financials_stage(data):
+    ticker_symbol = symbol_for(data["ticker"])
+    return {
+        "quarterly_table": _load_and_format_financials(ticker_symbol, "quarterly"),
+        "annual_table": _load_and_format_financials(ticker_symbol, "annual"),
+    }
 
-    chart_data, latest_table_html, warning = analyze_stock_candlestick(ticker)
-    prediction_table_html, _ = predict_future_moves(ticker)
 
-    quarterly_table = _load_and_format_financials(ticker, "quarterly")
-    annual_table = _load_and_format_financials(ticker, "annual")
+def _chart_stage(data):
+    result = run_candlestick_analysis(data["ticker"], prices=data.get("prices"))
+    if result.no_data:
+        # Later requests for this code are rejected without any download
+        mark_unavailable(data["ticker"])
+    latest = result.latest
+    return {
+        "chart_data": result.chart_data,
+        "latest": latest,
+        "latest_data_table": render_latest_table(latest) if latest else None,
+        "warning": result.warning,
+    }
 
-    def html_to_records(html):
-        if not html:
-            return []
-        try:
-            return pd.read_html(html)[0].to_dict("records")
-        except Exception:
-            return []
 
-    latest_dict = html_to_records(latest_table_html)
-    prediction_dict = html_to_records(prediction_table_html)
+def _prediction_stage(data):
+    result = run_predictions(data["ticker"], prices=data.get("prices"))
+    return {
+        "prediction": result,
+        "predictions": result.records() if result else [],
+    }
 
-    company_name = get_company_name(ticker)
-    gemini_report_md = generate_analyst_report(
-        company_name,
-        ticker,
-        latest_dict,
-        prediction_dict,
-    )
+
+def _similar_stage(data):
+    return {"similar": similar_tickers(data["ticker"])}
+
+
+def _report_fields(company_name, gemini_report_md):
     if gemini_report_md:
         gemini_report_html = markdown2.markdown(gemini_report_md)
     else:
         gemini_report_html = "<p>AIレポートを生成できませんでした。</p>"
-
     return {
-        "ticker": ticker,
         "company_name": company_name,
-        "chart_data": chart_data,
-        "latest_data_table": latest_table_html,
-        "prediction_table": prediction_table_html,
-        "predictions": prediction_dict,
-        "quarterly_table": quarterly_table,
-        "annual_table": annual_table,
-        "warning": warning,
         "gemini_report_html": gemini_report_html,
     }
 
 
-def main_analysis_view(request):
+def _report_stage(data):
+    ticker = data["ticker"]
+    company_name = get_company_name(ticker)
+    gemini_report_md = generate_analyst_report(
+        company_name,
+        ticker,
+        data["latest"].records() if data["latest"] else [],
+        data["predictions"],
+    )
+    return _report_fields(company_name, gemini_report_md)
+
+
+async def _areport_stage(data):
+    ticker = data["ticker"]
+    company_name = await aio.run_blocking(get_company_name, ticker)
+    gemini_report_md = await generate_analyst_report_async(
+        company_name,
+        ticker,
+        data["latest"].records() if data["latest"] else [],
+        data["predictions"],
+    )
+    return _report_fields(company_name, gemini_report_md)
+
+
+# (stage, page sections it completes), cheapest first; each stage may read
+# the results of earlier ones
+ANALYSIS_STAGES = [
+    (_similar_stage, ["similar"]),
+    (_financials_stage, ["financials"]),
+    (_chart_stage, ["warning", "chart"]),
+    (_prediction_stage, ["predictions"]),
+    (_report_stage, ["report"]),
+]
+# Stages with a native async version on the ASGI path; the others run in
+# the blocking-work pool, all at once
+ASYNC_STAGES = {_report_stage: _areport_stage}
+# Page sections top to bottom within a ticker column
+PAGE_SECTIONS = [
+    "warning",
+    "report",
+    "chart",
+    "financials",
+    "predictions",
+    "similar",
+]
+STREAM_MARKER = "<!-- analysis-stream -->"
+
+
+def fetch_data(ticker, prices=None):
+    """Helper function to fetch all data for a ticker.
+
+    ``prices`` may carry an already downloaded 2-year daily history.
+    """
+    if not ticker:
+        return {}
+
+    data = {"ticker": ticker, "prices": prices}
+    for stage, _ in ANALYSIS_STAGES:
+        data.update(stage(data))
+    del data["prices"]
+    return data
+
+
+def analysis_data(ticker):
+    """Return the page data for ``ticker``, served from its snapshot if enabled."""
+    if not ticker:
+        return {}
+    if settings.ANALYSIS_SNAPSHOTS:
+        return get_page_data(ticker, fetch_data)
+    return fetch_data(ticker)
+
+
+def _start_stages(data):
+    """Start every blocking stage of ``data``; return their tasks by stage."""
+    return {
+        stage: asyncio.ensure_future(aio.run_blocking(stage, data))
+        for stage, _ in ANALYSIS_STAGES
+        if stage not in ASYNC_STAGES
+    }
+
+
+async def _finish_stage(stage, data, tasks):
+    if stage in ASYNC_STAGES:
+        return await ASYNC_STAGES[stage](data)
+    return await tasks[stage]
+
+
+async def _prefetch_prices(ticker):
+    """Return the 2-year daily history for the stages, or ``None``."""
+    prices = await aio.daily_prices(symbol_for(ticker), "2y")
+    return None if prices.empty else prices
+
+
+async def afetch_data(ticker):
+    """Async :func:`fetch_data`.
+
+    The price history comes from the async Yahoo client, the blocking
+    stages run concurrently in the blocking-work pool and the report
+    awaits Gemini once the chart and predictions are done.
+    """
+    if not ticker:
+        return {}
+
+    data = {"ticker": ticker, "prices": await _prefetch_prices(ticker)}
+    tasks = _start_stages(data)
+    for stage, _ in ANALYSIS_STAGES:
+        data.update(await _finish_stage(stage, data, tasks))
+    del data["prices"]
+    return data
+
+
+async def aanalysis_data(ticker):
+    """Async :func:`analysis_data`."""
+    if not ticker:
+        return {}
+    if not settings.ANALYSIS_SNAPSHOTS:
+        return await afetch_data(ticker)
+    data = await aio.run_blocking(snapshot_page_data, ticker, fetch_data)
+    if data is None:
+        data = await afetch_data(ticker)
+        if data.get("chart_data"):
+            await aio.run_blocking(save_snapshot, snapshot_code(ticker), data)
+    return data
+
+
+async def _stream_analysis(request, tickers, errors, inputs):
+    """Yield the page shell, then each section as soon as it is computed.
+
+    ``errors`` holds, per ticker, why it was rejected (or ``None``) and
+    ``inputs`` the raw form values. All stages of all accepted tickers
+    start at once; sections are still sent in ``ANALYSIS_STAGES`` order.
+    """
+    prefixes = [f"data{i}" for i in range(1, len(tickers) + 1)]
+    active = [p for p, t, e in zip(prefixes, tickers, errors) if t and e is None]
+    shell = render_to_string(
+        "core/main_analysis_stream.html",
+        {
+            **{f"ticker{i}": t for i, t in enumerate(inputs, start=1)},
+            "prefixes": prefixes,
+            "active": active,
+            "sections": PAGE_SECTIONS,
+            "stream_marker": STREAM_MARKER,
+        },
+        request,
+    )
+    head, tail = shell.split(STREAM_MARKER, 1)
+    yield head
+
+    datas = {p: {"ticker": t} for p, t in zip(prefixes, tickers) if t}
+    # Rejected tickers only show their warning
+    stored = set()
+    for prefix, error in zip(prefixes, errors):
+        if error is not None:
+            datas[prefix]["warning"] = error
+            stored.add(prefix)
+    if settings.ANALYSIS_SNAPSHOTS:
+        for prefix, data in datas.items():
+            if prefix in stored:
+                continue
+            snapshot = await aio.run_blocking(
+                snapshot_page_data, data["ticker"], fetch_data
+            )
+            if snapshot is not None:
+                data.update(snapshot)
+                stored.add(prefix)
+    computed = [p for p in datas if p not in stored]
+    prices = await asyncio.gather(
+        *(_prefetch_prices(datas[p]["ticker"]) for p in computed)
+    )
+    tasks = {}
+    for prefix, history in zip(computed, prices):
+        datas[prefix]["prices"] = history
+        tasks[prefix] = _start_stages(datas[prefix])
+
+    for stage, sections in ANALYSIS_STAGES:
+        for prefix, data in datas.items():
+            if prefix in tasks:
+                data.update(await _finish_stage(stage, data, tasks[prefix]))
+            for section in sections:
+                yield render_to_string(
+                    "partials/stream_chunk.html",
+                    {"slot": f"{prefix}-{section}", "section": section, "data": data},
+                )
+    for prefix in computed:
+        data = datas[prefix]
+        del data["prices"]
+        if settings.ANALYSIS_SNAPSHOTS and data.get("chart_data"):
+            await aio.run_blocking(save_snapshot, snapshot_code(data["ticker"]), data)
+    yield tail
+
+
+def _resolve_input(raw):
+    """Return ``(code, None)`` for a known ticker or ``(raw, reason)``."""
+    if not raw:
+        return "", None
+    try:
+        return resolve_ticker(raw).code, None
+    except UnknownTicker as exc:
+        return raw, str(exc)
+
+
+async def _column_data(ticker, error):
+    if error is not None:
+        return {"ticker": ticker, "warning": error}
+    return await aanalysis_data(ticker)
+
+
+async def main_analysis_view(request):
     """Main view for stock analysis."""
     ticker1 = request.GET.get("ticker1", "").strip()
     ticker2 = request.GET.get("ticker2", "").strip()
+    tickers, errors = [], []
+    for raw in (ticker1, ticker2):
+        ticker, error = await aio.run_blocking(_resolve_input, raw)
+        if ticker and error is None:
+            await aio.run_blocking(record_ticker_request, ticker)
+        tickers.append(ticker)
+        errors.append(error)
 
-    data1 = fetch_data(ticker1)
-    data2 = fetch_data(ticker2)
+    stream = request.GET.get("stream")
+    if stream == "1" or (stream is None and settings.ANALYSIS_STREAMING):
+        response = StreamingHttpResponse(
+            _stream_analysis(request, tickers, errors, [ticker1, ticker2]),
+            content_type="text/html; charset=utf-8",
+        )
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    data1, data2 = await asyncio.gather(
+        *(_column_data(t, e) for t, e in zip(tickers, errors))
+    )
 
     context = {
         "ticker1": ticker1,
         "ticker2": ticker2,
         "data1": data1,
         "data2": data2,
+        "columns": [data1, data2],
+        "sections": PAGE_SECTIONS,
     }
     return render(request, "core/main_analysis.html", context)
 
 
-class IndustryListAPIView(APIView):
-    """Return all industries."""
+@aio.blocking_view
+def compare_view(request):
+    """Compare an arbitrary list of tickers (``?tickers=7203,6758,9101``)."""
+    raw = request.GET.get("tickers", "")
+    codes = list(dict.fromkeys(normalize_code(c) for c in raw.split(",") if c.strip()))
+    limit = settings.COMPARE_MAX_TICKERS
+    context = {"tickers": ",".join(codes), "limit": limit}
+    if len(codes) > limit:
+        context["error"] = f"一度に比較できる銘柄は{limit}件までです。"
+        return render(request, "core/compare.html", context)
+    errors = []
+    for code in codes:
+        try:
+            resolve_ticker(code)
+        except UnknownTicker as exc:
+            errors.append(str(exc))
+    if errors:
+        context["error"] = " ".join(errors)
+    elif codes:
+        context.update(compare_tickers(codes, settings.COMPARE_WORKERS))
+        context["codes"] = codes
+    return render(request, "core/compare.html", context)
 
-    def get(self, request):
-        industries = Industry.objects.all().values("id", "name")
-        return Response(list(industries))
+
+@require_GET
+async def industry_list_api(request):
+    """Return all industries."""
+    industries = [i async for i in Industry.objects.values("id", "name")]
+    return JsonResponse(industries, safe=False)
 
 
-class IndustryTickerAPIView(APIView):
+@require_GET
+async def industry_tickers_api(request, pk):
     """Return tickers for a specific industry."""
+    if not await Industry.objects.filter(pk=pk).aexists():
+        return JsonResponse({"detail": "Not found."}, status=404)
+    tickers = (
+        Ticker.objects.filter(industry_id=pk).values("code", "name").order_by("code")
+    )
+    return JsonResponse([t async for t in tickers], safe=False)
+
 
-    def get(self, request, pk):
-        industry = get_object_or_404(Industry, pk=pk)
-        tickers = (
-            Ticker.objects.filter(industry=industry)
-            .values("code", "name")
-            .order_by("code")
+@require_GET
+async def ticker_search_api(request):
+    """Search tickers by code or name."""
+    query = request.GET.get("q", "").strip()
+    tickers = Ticker.objects.all()
+    if query:
+        tickers = tickers.filter(
+            models.Q(code__icontains=query) | models.Q(name__icontains=query)
         )
-        return Response(list(tickers))
+    tickers = tickers.order_by("code")[:20]
+    return JsonResponse([t async for t in tickers.values("code", "name")], safe=False)
 
 
-class TickerSearchAPIView(APIView):
-    """Search tickers by code or name."""
+@require_GET
+async def export_api(request):
+    """Return predictions, indicators and fundamentals of every ticker.
+
+    ``?format=csv`` (default) or ``parquet``; ``?industry=<id>`` limits the
+    export to one industry. The file is the one last written by
+    ``python manage.py export_universe``; nothing is computed here, and
+    both the file and the filtered rows are streamed.
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse(
+            {"detail": f"format must be one of {', '.join(EXPORT_FORMATS)}"},
+            status=400,
+        )
+    if fmt == "parquet" and not parquet_available():
+        return JsonResponse({"detail": "parquet export is not available"}, status=400)
+    industry = request.GET.get("industry")
+    if industry is not None and not industry.isdigit():
+        return JsonResponse({"detail": "industry must be an id"}, status=400)
+
+    industry_name = None
+    if industry is not None:
+        industry_name = await (
+            Industry.objects.filter(pk=int(industry))
+            .values_list("name", flat=True)
+            .afirst()
+        )
+        if industry_name is None:
+            return JsonResponse({"detail": "Not found."}, status=404)
+
+    content_type = "text/csv" if fmt == "csv" else "application/vnd.apache.parquet"
+    filename = f"universe.{fmt}"
+    try:
+        modified = export_path(fmt).stat().st_mtime
+        if industry_name is None:
+            response = FileResponse(
+                await aio.run_blocking(export_path(fmt).open, "rb"),
+                as_attachment=True,
+                filename=filename,
+                content_type=content_type,
+            )
+        else:
+            response = StreamingHttpResponse(
+                await aio.run_blocking(read_export, fmt, industry_name),
+                content_type=content_type,
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    except FileNotFoundError:
+        return JsonResponse({"detail": "export has not been generated"}, status=404)
+    # Read the file (and filter it) on the blocking pool as it is sent
+    response.streaming_content = aio.aiterate(response.streaming_content)
+    response["Last-Modified"] = http_date(modified)
+    return response
+
+
+class BlockingAPIView(APIView):
+    """An ``APIView`` served from the blocking-work pool (:func:`aio.blocking_view`)."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return aio.blocking_view(super().as_view(**initkwargs))
+
+
+def _clean_watchlist(payload) -> tuple[str, list[str], str | None]:
+    """Return ``(name, codes, error)`` from a watchlist request body.
+
+    ``codes`` may be a list or a comma separated string; codes are
+    normalized, deduplicated and must pass :func:`resolve_ticker`.
+    """
+    raw = payload.get("codes", [])
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, list) or not all(isinstance(c, str) for c in raw):
+        return "", [], "codes must be a list of ticker codes"
+    codes = list(dict.fromkeys(normalize_code(c) for c in raw if c.strip()))
+    limit = settings.WATCHLIST_MAX_TICKERS
+    if len(codes) > limit:
+        return "", [], f"a watchlist holds at most {limit} tickers"
+    unknown = []
+    for code in codes:
+        try:
+            resolve_ticker(code)
+        except UnknownTicker:
+            unknown.append(code)
+    if unknown:
+        return "", [], f"unknown tickers: {', '.join(unknown)}"
+    return str(payload.get("name", ""))[:100], codes, None
+
+
+def _watchlist_payload(watchlist):
+    return {
+        "key": watchlist.key,
+        "name": watchlist.name,
+        "codes": watchlist.codes,
+        "stream": reverse("api-watchlist-stream", args=[watchlist.key]),
+    }
+
+
+class WatchlistCreateAPIView(BlockingAPIView):
+    """Create a watchlist from ``{"name": ..., "codes": [...]}``.
+
+    The returned ``key`` is the only handle on the list; anyone holding it
+    can read, change or delete it.
+    """
+
+    def post(self, request):
+        name, codes, error = _clean_watchlist(request.data)
+        if error:
+            return Response({"detail": error}, status=400)
+        watchlist = Watchlist.objects.create(name=name, codes=codes)
+        return Response(_watchlist_payload(watchlist), status=201)
+
+
+class WatchlistAPIView(BlockingAPIView):
+    """Read, replace or delete one watchlist."""
+
+    def get(self, request, key):
+        return Response(_watchlist_payload(get_object_or_404(Watchlist, key=key)))
+
+    def put(self, request, key):
+        watchlist = get_object_or_404(Watchlist, key=key)
+        name, codes, error = _clean_watchlist(request.data)
+        if error:
+            return Response({"detail": error}, status=400)
+        watchlist.name, watchlist.codes = name, codes
+        watchlist.save(update_fields=["name", "codes", "updated_at"])
+        return Response(_watchlist_payload(watchlist))
+
+    def delete(self, request, key):
+        get_object_or_404(Watchlist, key=key).delete()
+        return Response(status=204)
+
+
+async def _awatch_state(code):
+    data, prices = await asyncio.gather(
+        aanalysis_data(code), aio.daily_prices(symbol_for(code), "5d")
+    )
+    return watch_state(data, prices)
+
+
+# One shared state computation per watched ticker and worker
+watch_hub = FeedHub(_awatch_state)
+
+
+async def _watch_events(codes):
+    yield "retry: 5000\n\n"
+    async for update in watch_hub.updates(codes):
+        yield ": keepalive\n\n" if update is None else sse_event("update", update)
+
+
+@require_GET
+async def watchlist_stream_api(request, key):
+    """Server-sent events with the changed fields of the list's tickers.
+
+    Each ``update`` event carries ``code`` plus whichever of the last bar,
+    close, change, predictions and report changed; the first event per
+    ticker carries all of them.
+    """
+    watchlist = await Watchlist.objects.filter(key=key).afirst()
+    if watchlist is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+    response = StreamingHttpResponse(
+        _watch_events(watchlist.codes), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@aio.blocking_view
+def watchlist_view(request, key=None):
+    """Create a watchlist (no ``key``) or show one with live updates."""
+    if key is None:
+        context = {"codes": ""}
+        if request.method == "POST":
+            name, codes, error = _clean_watchlist(request.POST)
+            if error is None:
+                watchlist = Watchlist.objects.create(name=name, codes=codes)
+                return redirect("watchlist", key=watchlist.key)
+            context = {"error": error, "codes": request.POST.get("codes", "")}
+        return render(request, "core/watchlist.html", context)
+
+    watchlist = get_object_or_404(Watchlist, key=key)
+    names = dict(
+        Ticker.objects.filter(code__in=watchlist.codes).values_list("code", "name")
+    )
+    context = {
+        "watchlist": watchlist,
+        "rows": [{"code": c, "name": names.get(c, "")} for c in watchlist.codes],
+        "stream_url": reverse("api-watchlist-stream", args=[key]),
+    }
+    return render(request, "core/watchlist.html", context)
+
+
+class SectorHeatmapAPIView(BlockingAPIView):
+    """Return per-sector return, volatility and breadth for a heatmap."""
 
     def get(self, request):
-        query = request.GET.get("q", "").strip()
-        tickers = Ticker.objects.all()
-        if query:
-            tickers = tickers.filter(
-                models.Q(code__icontains=query) | models.Q(name__icontains=query)
+        period = request.GET.get("period", SECTOR_PERIODS[0])
+        if period not in SECTOR_PERIODS:
+            return Response(
+                {"detail": f"period must be one of {', '.join(SECTOR_PERIODS)}"},
+                status=400,
+            )
+        data = cache.get_or_set(
+            f"sector_heatmap:{period}",
+            lambda: sector_heatmap(period),
+            cache_timeout(settings.SECTOR_HEATMAP_CACHE_SECONDS),
+        )
+        return Response(data)
+
+
+class AnalysisAPIView(BlockingAPIView):
+    """Return the full analysis of one ticker as JSON.
+
+    ``?fields=latest,predictions`` limits the payload (and the work done);
+    ``?thumbnail=1`` renders the chart field as a small thumbnail and
+    ``?range=5y`` (any of :data:`CHART_RANGES`) sets the chart's range.
+    Responses carry a weak ETag derived from the last bar date and the
+    model version, and a matching ``If-None-Match`` returns 304; only the
+    financials and the report are rebuilt for a new response.
+    """
+
+    def get(self, request, ticker):
+        try:
+            resolved = resolve_ticker(ticker)
+        except UnknownTicker as exc:
+            return Response({"detail": str(exc)}, status=404)
+        ticker = resolved.code
+        record_ticker_request(ticker)
+        raw_fields = request.GET.get("fields")
+        if raw_fields:
+            fields = [f.strip() for f in raw_fields.split(",") if f.strip()]
+        else:
+            fields = list(DEFAULT_FIELDS)
+        unknown = sorted(set(fields) - set(ANALYSIS_FIELDS))
+        if unknown:
+            return Response(
+                {"detail": f"unknown fields: {', '.join(unknown)}"}, status=400
+            )
+        fields = [f for f in ANALYSIS_FIELDS if f in fields]
+        thumbnail = "chart" in fields and request.GET.get("thumbnail") == "1"
+        chart_range = request.GET.get("range", DEFAULT_CHART_RANGE)
+        if chart_range not in CHART_RANGES:
+            return Response(
+                {"detail": f"range must be one of {', '.join(CHART_RANGES)}"},
+                status=400,
+            )
+        variants = ["thumbnail"] * thumbnail
+        if "chart" in fields and chart_range != DEFAULT_CHART_RANGE:
+            variants.append(f"range={chart_range}")
+
+        bar_date = last_bar_date(resolved.symbol)
+        if bar_date is None:
+            mark_unavailable(ticker)
+            return Response({"detail": "no price data"}, status=404)
+        version = model_version(ticker)
+        etag = analysis_etag(ticker, bar_date, version, fields + variants)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        # If-None-Match uses the weak comparison
+        client_etags = {
+            tag.removeprefix("W/")
+            for tag in parse_etags(request.headers.get("If-None-Match", ""))
+        }
+        if etag.removeprefix("W/") in client_etags or "*" in client_etags:
+            return Response(status=304, headers=headers)
+
+        sections = cache.get_or_set(
+            f"analysis_api:{etag}",
+            lambda: analysis_sections(ticker, fields, thumbnail, chart_range),
+            settings.ANALYSIS_API_CACHE_SECONDS,
+        )
+        payload = build_analysis_payload(ticker, fields, bar_date, version, sections)
+        return Response(payload, headers=headers)
+
+
+@require_GET
+async def chart_api(request, ticker):
+    """Return the candlestick chart PNG of one ticker.
+
+    ``?range=`` is any of :data:`CHART_RANGES` (default ``6mo``); long
+    ranges are drawn with weekly, monthly or quarterly candles so the image
+    costs about the same for every range. ``?thumbnail=1`` renders it small.
+    """
+    try:
+        resolved = await aio.run_blocking(resolve_ticker, ticker)
+    except UnknownTicker as exc:
+        return JsonResponse({"detail": str(exc)}, status=404)
+    ticker = resolved.code
+    chart_range = request.GET.get("range", DEFAULT_CHART_RANGE)
+    if chart_range not in CHART_RANGES:
+        return JsonResponse(
+            {"detail": f"range must be one of {', '.join(CHART_RANGES)}"},
+            status=400,
+        )
+    result = await aio.run_blocking(
+        run_candlestick_analysis,
+        ticker,
+        thumbnail=request.GET.get("thumbnail") == "1",
+        chart_range=chart_range,
+    )
+    if result.chart_data is None:
+        if result.no_data:
+            mark_unavailable(ticker)
+        return JsonResponse({"detail": result.warning}, status=404)
+    response = HttpResponse(
+        base64.b64decode(result.chart_data), content_type="image/png"
+    )
+    response["Cache-Control"] = (
+        f"max-age={cache_timeout(settings.PRICE_CACHE_SECONDS)}"
+    )
+    return response
+
+
+class IntradayAPIView(BlockingAPIView):
+    """Return intraday bars and indicators from this worker's ring buffer.
+
+    ``?interval=1m|5m`` picks the bar size, ``?bars=N`` the window length
+    and ``?chart=1`` (or ``?chart=thumbnail``) adds a PNG of close and
+    moving averages.
+    """
+
+    def get(self, request, ticker):
+        try:
+            resolved = resolve_ticker(ticker)
+        except UnknownTicker as exc:
+            return Response({"detail": str(exc)}, status=404)
+        ticker = resolved.code
+        interval = request.GET.get("interval", "5m")
+        if interval not in INTRADAY_INTERVALS:
+            return Response(
+                {"detail": f"interval must be one of {', '.join(INTRADAY_INTERVALS)}"},
+                status=400,
+            )
+        try:
+            bars = int(request.GET.get("bars", 120))
+        except ValueError:
+            return Response({"detail": "bars must be an integer"}, status=400)
+        bars = max(1, min(bars, settings.INTRADAY_BUFFER_BARS))
+
+        buffer = refresh(resolved.symbol, interval)
+        if buffer.size == 0:
+            return Response({"detail": "no intraday data"}, status=404)
+        payload = {
+            "ticker": ticker,
+            "interval": interval,
+            "trading": is_trading_hours(),
+            "bars": buffer_payload(buffer, bars),
+            "latest": latest_records(buffer),
+        }
+        chart = request.GET.get("chart")
+        if chart in ("1", "thumbnail"):
+            payload["chart"] = render_intraday_chart(
+                buffer, bars, f"{ticker} ({interval})", chart == "thumbnail"
             )
-        tickers = tickers.order_by("code")[:20]
-        return Response(list(tickers.values("code", "name")))
+        return Response(payload)
@@ -0,0 +1,151 @@
+"""Server-push updates for watchlists.
+
+Every watched ticker has one :class:`TickerFeed` per worker event loop. The
+feed recomputes the ticker's compact state every ``WATCH_POLL_SECONDS``
+while anyone subscribes and pushes only the keys that changed to each
+subscriber's queue, so a ticker costs one computation however many open
+pages watch it. Feeds stop when their last subscriber leaves.
+"""
+import asyncio
+import json
+import logging
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Keys of a ticker's watch state; only these are compared and pushed
+STATE_FIELDS = ("last_bar", "close", "change_pct", "predictions", "report_html")
+
+
+def watch_state(data: dict, prices: pd.DataFrame) -> dict:
+    """Return the compact state pushed for one ticker.
+
+    ``data`` is the analysis page data and ``prices`` a short daily
+    history whose last bar is reported.
+    """
+    state = dict.fromkeys(STATE_FIELDS)
+    if not prices.empty:
+        close = prices["Close"]
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        close = close.dropna()
+        if not close.empty:
+            state["last_bar"] = str(pd.Timestamp(close.index[-1]).date())
+            state["close"] = round(float(close.iloc[-1]), 2)
+        if len(close) > 1:
+            state["change_pct"] = round(
+                float(close.iloc[-1] / close.iloc[-2] - 1) * 100, 2
+            )
+    state["predictions"] = data.get("predictions") or []
+    state["report_html"] = data.get("gemini_report_html")
+    return state
+
+
+def state_delta(old: dict | None, new: dict) -> dict:
+    """Return the keys of ``new`` whose values differ from ``old``."""
+    if old is None:
+        return dict(new)
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+def sse_event(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+class TickerFeed:
+    """The shared state computation of one ticker on one event loop."""
+
+    def __init__(self, code: str, compute, poll_seconds: float, on_idle):
+        self.code = code
+        self.state = None
+        self._compute = compute
+        self._poll_seconds = poll_seconds
+        self._on_idle = on_idle
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task = None
+
+    def add(self, queue: asyncio.Queue) -> None:
+        self._subscribers.add(queue)
+        if self.state is not None:
+            queue.put_nowait({"code": self.code, **self.state})
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def discard(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers:
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            self._on_idle(self)
+
+    async def _run(self):
+        while True:
+            try:
+                state = await self._compute(self.code)
+            except Exception:
+                logger.exception("Watch update for %s failed", self.code)
+                state = None
+            if state is not None:
+                delta = state_delta(self.state, state)
+                self.state = state
+                if delta:
+                    for queue in self._subscribers:
+                        queue.put_nowait({"code": self.code, **delta})
+            await asyncio.sleep(self._poll_seconds)
+
+
+class FeedHub:
+    """Hands out the shared :class:`TickerFeed` of each ticker.
+
+    ``compute`` is an async callable returning the :func:`watch_state` of a
+    ticker code.
+    """
+
+    def __init__(self, compute):
+        self._compute = compute
+        self._feeds: dict[tuple[int, str], TickerFeed] = {}
+
+    def _feed(self, code: str) -> TickerFeed:
+        key = (id(asyncio.get_running_loop()), code)
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._feeds[key] = TickerFeed(
+                code,
+                self._compute,
+                settings.WATCH_POLL_SECONDS,
+                self._forget,
+            )
+        return feed
+
+    def _forget(self, feed: TickerFeed) -> None:
+        for key, current in list(self._feeds.items()):
+            if current is feed:
+                del self._feeds[key]
+
+    def feed_count(self) -> int:
+        return len(self._feeds)
+
+    async def updates(self, codes: list[str]):
+        """Yield ``{"code": ..., <changed keys>}`` deltas for ``codes``.
+
+        The first message per ticker carries its whole state. ``None`` is
+        yielded after ``WATCH_HEARTBEAT_SECONDS`` without an update.
+        """
+        queue = asyncio.Queue()
+        feeds = [self._feed(code) for code in codes]
+        for feed in feeds:
+            feed.add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        queue.get(), settings.WATCH_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            for feed in feeds:
+                feed.discard(queue)
@@ -0,0 +1,36 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+The app is served over ASGI by uvicorn workers (``gunicorn
+myapp.asgi:application``). The analysis page and the listing/search
+endpoints are async views: they await Yahoo Finance and Gemini on pooled
+connections and hand CPU-bound stages to a thread pool, so one worker
+process keeps hundreds of slow upstream requests in flight. Under ASGI,
+Django runs plain sync views and ``sync_to_async`` calls on a single
+thread per process, so the remaining sync views (the REST API, compare and
+watchlist pages) are wrapped with ``core.aio.blocking_view`` and run on
+that same pool of ``ASYNC_BLOCKING_THREADS`` threads instead.
+
+Set ``GUNICORN_WORKER_CLASS=gthread`` and start ``gunicorn myapp.wsgi``
+to go back to threaded WSGI workers.
+
+Environment variables:
+    WEB_CONCURRENCY          worker processes (default 2)
+    GUNICORN_WORKER_CLASS    default uvicorn_worker.UvicornWorker
+    GUNICORN_THREADS         threads per gthread worker (default 4)
+    GUNICORN_TIMEOUT         seconds before a silent worker is restarted
+    ASYNC_BLOCKING_THREADS   threads for blocking analysis stages per
+                             uvicorn worker (default 8)
+    LIGHTGBM_REQUEST_N_JOBS  set to 1-2 so concurrent model fits do not
+                             oversubscribe the CPU
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+# Recycle workers now and then to return memory fragmented by pandas
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "500"))
+max_requests_jitter = 50
+accesslog = "-"
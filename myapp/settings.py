@@ -72,6 +72,16 @@ DATABASES = {
         default="sqlite:///" + str(BASE_DIR / "db.sqlite3"),
     ),
 }
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Concurrent writers (async requests, refresh threads) otherwise fail
+    # with "database is locked" when a read transaction upgrades to a write
+    DATABASES["default"].setdefault("OPTIONS", {}).update(
+        {"transaction_mode": "IMMEDIATE", "timeout": 20}
+    )
+
+# Cache backend (e.g. redis://host:6379/1 or filecache:///var/tmp/app); the
+# default in-process cache is per worker and invisible to management commands
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -123,3 +133,156 @@ LOGGING = {
 }
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Sector heatmap downloads the whole Ticker universe, so cache the result
+SECTOR_HEATMAP_CACHE_SECONDS = env.int("SECTOR_HEATMAP_CACHE_SECONDS", default=900)
+
+# Prediction backend: "per_ticker" trains on each request, "panel" uses the
+# model built offline by ``python manage.py train_panel_model`` and "stored"
+# the per-ticker models kept current by ``python manage.py update_models``
+PREDICTION_MODEL = env("PREDICTION_MODEL", default="per_ticker")
+PANEL_MODEL_PATH = env(
+    "PANEL_MODEL_PATH", default=str(BASE_DIR / "models" / "panel_model.joblib")
+)
+
+# Stream the analysis page section by section (override per request with
+# ?stream=1 or ?stream=0)
+ANALYSIS_STREAMING = env.bool("ANALYSIS_STREAMING", default=False)
+
+# N-ticker comparison page
+COMPARE_MAX_TICKERS = env.int("COMPARE_MAX_TICKERS", default=10)
+COMPARE_WORKERS = env.int("COMPARE_WORKERS", default=4)
+
+# JSON analysis API: bump ANALYSIS_MODEL_VERSION when the features or model
+# change so clients holding old ETags refetch. ANALYSIS_API_CACHE_SECONDS
+# keeps the price and model sections; financials and the report are not cached
+ANALYSIS_MODEL_VERSION = env("ANALYSIS_MODEL_VERSION", default="1")
+LAST_BAR_CACHE_SECONDS = env.int("LAST_BAR_CACHE_SECONDS", default=300)
+ANALYSIS_API_CACHE_SECONDS = env.int("ANALYSIS_API_CACHE_SECONDS", default=86400)
+
+# Intraday mode: bars kept per worker in a ring buffer of this many bars
+INTRADAY_BUFFER_BARS = env.int("INTRADAY_BUFFER_BARS", default=1500)
+
+# Memory-lean mode keeps price and feature frames as float32 with only the
+# columns the models use; REPORT_PEAK_MEMORY adds an X-Peak-Memory-KB header
+# (tracemalloc, adds overhead) and logs each request's peak to "core.memory"
+MEMORY_LEAN = env.bool("MEMORY_LEAN", default=False)
+REPORT_PEAK_MEMORY = env.bool("REPORT_PEAK_MEMORY", default=False)
+if REPORT_PEAK_MEMORY:
+    MIDDLEWARE.insert(0, "core.middleware.PeakMemoryMiddleware")
+
+# Chart output resolution; thumbnails use the same layout at a lower DPI
+CHART_DPI = env.int("CHART_DPI", default=100)
+CHART_THUMBNAIL_DPI = env.int("CHART_THUMBNAIL_DPI", default=30)
+
+# OpenMP threads per LightGBM fit on the request path. -1 uses every core,
+# which oversubscribes the CPU when gthread workers train concurrently;
+# set it to 1 or 2 alongside GUNICORN_THREADS (see gunicorn.conf.py)
+LIGHTGBM_REQUEST_N_JOBS = env.int("LIGHTGBM_REQUEST_N_JOBS", default=-1)
+
+# Per-ticker LightGBM parameters written by ``python manage.py tune_models``
+TUNED_PARAMS_PATH = env(
+    "TUNED_PARAMS_PATH", default=str(BASE_DIR / "models" / "tuned_params.json")
+)
+
+# Per-ticker models maintained by ``python manage.py update_models``: each run
+# with newly labeled rows adds up to MODEL_UPDATE_TREES trees fitted on the
+# last MODEL_UPDATE_WINDOW labeled rows, and the model is rebuilt after
+# MODEL_REBUILD_EVERY updates or once its log loss on new rows exceeds the
+# build-time baseline by more than MODEL_DRIFT_TOLERANCE
+TICKER_MODEL_DIR = env(
+    "TICKER_MODEL_DIR", default=str(BASE_DIR / "models" / "tickers")
+)
+MODEL_UPDATE_TREES = env.int("MODEL_UPDATE_TREES", default=10)
+MODEL_UPDATE_WINDOW = env.int("MODEL_UPDATE_WINDOW", default=250)
+MODEL_REBUILD_EVERY = env.int("MODEL_REBUILD_EVERY", default=20)
+MODEL_DRIFT_TOLERANCE = env.float("MODEL_DRIFT_TOLERANCE", default=0.1)
+
+# Popularity-driven precompute: request counts are buffered per worker and
+# written every POPULARITY_FLUSH_SECONDS; ``python manage.py
+# precompute_popular`` ranks tickers over POPULARITY_WINDOW_DAYS and
+# snapshots the top PRECOMPUTE_TOP_N after the close
+POPULARITY_FLUSH_SECONDS = env.int("POPULARITY_FLUSH_SECONDS", default=60)
+POPULARITY_WINDOW_DAYS = env.int("POPULARITY_WINDOW_DAYS", default=7)
+PRECOMPUTE_TOP_N = env.int("PRECOMPUTE_TOP_N", default=300)
+PRECOMPUTE_WORKERS = env.int("PRECOMPUTE_WORKERS", default=4)
+
+# Analysis page snapshots (stale-while-revalidate): the last computed page
+# is served immediately and recomputed in the background once it is older
+# than SNAPSHOT_MAX_AGE_SECONDS. A refresh lease older than
+# SNAPSHOT_REFRESH_LEASE_SECONDS is assumed dead and may be taken over
+ANALYSIS_SNAPSHOTS = env.bool("ANALYSIS_SNAPSHOTS", default=True)
+SNAPSHOT_MAX_AGE_SECONDS = env.int("SNAPSHOT_MAX_AGE_SECONDS", default=900)
+SNAPSHOT_REFRESH_LEASE_SECONDS = env.int("SNAPSHOT_REFRESH_LEASE_SECONDS", default=300)
+SNAPSHOT_REFRESH_WORKERS = env.int("SNAPSHOT_REFRESH_WORKERS", default=2)
+
+# TSE calendar: caches of daily data live PRICE_CACHE_SECONDS (and the other
+# *_CACHE_SECONDS values) only while prices can move, i.e. during sessions
+# plus TSE_DATA_DELAY_MINUTES of quote delay; otherwise they last until the
+# next session opens. Ad hoc closures and morning-only sessions are ISO dates
+PRICE_CACHE_SECONDS = env.int("PRICE_CACHE_SECONDS", default=300)
+TSE_DATA_DELAY_MINUTES = env.int("TSE_DATA_DELAY_MINUTES", default=20)
+TSE_EXTRA_HOLIDAYS = env.list("TSE_EXTRA_HOLIDAYS", default=[])
+TSE_HALF_DAYS = env.list("TSE_HALF_DAYS", default=[])
+
+# Single-flight upstream loads: identical concurrent downloads share one
+# request. Workers on the host coordinate with lock files in
+# SINGLE_FLIGHT_DIR and wait up to SINGLE_FLIGHT_WAIT_SECONDS for the
+# worker that is fetching before fetching themselves. The directory must be
+# private to the app's user (it is created with mode 0700)
+SINGLE_FLIGHT = env.bool("SINGLE_FLIGHT", default=True)
+SINGLE_FLIGHT_DIR = env(
+    "SINGLE_FLIGHT_DIR", default=str(BASE_DIR / "tmp" / "single-flight")
+)
+SINGLE_FLIGHT_WAIT_SECONDS = env.int("SINGLE_FLIGHT_WAIT_SECONDS", default=30)
+
+# Async (ASGI) serving path: upstream HTTP calls share a pool of at most
+# UPSTREAM_MAX_CONNECTIONS connections per worker, and blocking analysis
+# stages run on ASYNC_BLOCKING_THREADS threads
+UPSTREAM_MAX_CONNECTIONS = env.int("UPSTREAM_MAX_CONNECTIONS", default=50)
+UPSTREAM_TIMEOUT_SECONDS = env.int("UPSTREAM_TIMEOUT_SECONDS", default=15)
+ASYNC_BLOCKING_THREADS = env.int("ASYNC_BLOCKING_THREADS", default=8)
+
+# Upstream endpoints, normally left unset. ``python manage.py load_test``
+# points them at its local stand-in (core.stub_upstream); GEMINI_API_ENDPOINT
+# is read from the environment by core.gemini_analyzer
+YAHOO_API_ENDPOINT = env("YAHOO_API_ENDPOINT", default="")
+
+# Similar stocks: ``python manage.py build_similarity_index`` keeps each
+# ticker's SIMILAR_TICKERS_K most return-correlated peers over
+# SIMILARITY_PERIOD, skipping tickers with fewer than SIMILARITY_MIN_DAYS
+# returns; rerun it (e.g. weekly) to refresh the index
+SIMILARITY_INDEX_PATH = env(
+    "SIMILARITY_INDEX_PATH",
+    default=str(BASE_DIR / "models" / "similarity_index.joblib"),
+)
+SIMILAR_TICKERS_K = env.int("SIMILAR_TICKERS_K", default=5)
+SIMILARITY_PERIOD = env("SIMILARITY_PERIOD", default="1y")
+SIMILARITY_MIN_DAYS = env.int("SIMILARITY_MIN_DAYS", default=120)
+
+# Bulk export: ``python manage.py export_universe`` processes tickers
+# EXPORT_CHUNK_SIZE at a time on EXPORT_WORKERS threads and writes
+# EXPORT_DIR/universe.<format>, the file /api/v1/export/ serves
+EXPORT_DIR = env("EXPORT_DIR", default=str(BASE_DIR / "exports"))
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=100)
+EXPORT_WORKERS = env.int("EXPORT_WORKERS", default=4)
+
+# Watchlists: each open page's server-sent event stream receives changes of
+# its tickers; a ticker's state is recomputed every WATCH_POLL_SECONDS by one
+# shared task per worker however many pages watch it
+WATCHLIST_MAX_TICKERS = env.int("WATCHLIST_MAX_TICKERS", default=30)
+WATCH_POLL_SECONDS = env.int("WATCH_POLL_SECONDS", default=60)
+WATCH_HEARTBEAT_SECONDS = env.int("WATCH_HEARTBEAT_SECONDS", default=20)
+
+# Chart budgets: line charts keep at most CHART_MAX_POINTS points (LTTB) and
+# candlestick charts switch to weekly, monthly or quarterly candles beyond
+# CHART_MAX_CANDLES bars, so long ranges cost about as much as short ones
+CHART_MAX_POINTS = env.int("CHART_MAX_POINTS", default=500)
+CHART_MAX_CANDLES = env.int("CHART_MAX_CANDLES", default=300)
+
+# Ticker resolution: input is checked against the Ticker table (reloaded
+# every TICKER_TABLE_SECONDS) and codes whose price history came back empty
+# are rejected without network calls for TICKER_EMPTY_HISTORY_SECONDS. An
+# empty history may be a rate limit or network error, so keep that short
+TICKER_TABLE_SECONDS = env.int("TICKER_TABLE_SECONDS", default=300)
+TICKER_EMPTY_HISTORY_SECONDS = env.int("TICKER_EMPTY_HISTORY_SECONDS", default=60)